@@ -0,0 +1,43 @@
+"""Background summary job queue
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'summary_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('exchange', postgresql.JSON(astext_type=sa.Text()), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['session_id'], ['sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_summary_jobs_id'), 'summary_jobs', ['id'], unique=False)
+    op.create_index('ix_summary_jobs_status_id', 'summary_jobs', ['status', 'id'], unique=False)
+    op.create_index('ix_summary_jobs_session_status', 'summary_jobs', ['session_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_summary_jobs_session_status', table_name='summary_jobs')
+    op.drop_index('ix_summary_jobs_status_id', table_name='summary_jobs')
+    op.drop_index(op.f('ix_summary_jobs_id'), table_name='summary_jobs')
+    op.drop_table('summary_jobs')
@@ -0,0 +1,26 @@
+"""Indexes for keyset pagination of the admin session list
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_sessions_started_at_id', 'sessions', ['started_at', 'id'], unique=False)
+    op.create_index('ix_sessions_status_started_at_id', 'sessions', ['status', 'started_at', 'id'], unique=False)
+    op.create_index('ix_session_messages_session_id', 'session_messages', ['session_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_session_messages_session_id', table_name='session_messages')
+    op.drop_index('ix_sessions_status_started_at_id', table_name='sessions')
+    op.drop_index('ix_sessions_started_at_id', table_name='sessions')
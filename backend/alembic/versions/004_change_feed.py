@@ -0,0 +1,38 @@
+"""Change feed watermarks: summary updated_at and (timestamp, id) indexes
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'session_summaries',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True)
+    )
+    op.execute("UPDATE session_summaries SET updated_at = created_at")
+
+    op.create_index('ix_sessions_completed_at_id', 'sessions', ['completed_at', 'id'], unique=False)
+    op.create_index('ix_responses_answered_at_id', 'responses', ['answered_at', 'id'], unique=False)
+    op.create_index('ix_conversation_turns_timestamp_id', 'conversation_turns', ['timestamp', 'id'], unique=False)
+    op.create_index('ix_session_summaries_updated_at_session_id', 'session_summaries', ['updated_at', 'session_id'], unique=False)
+    op.create_index('ix_model_calls_created_at_id', 'model_calls', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_model_calls_created_at_id', table_name='model_calls')
+    op.drop_index('ix_session_summaries_updated_at_session_id', table_name='session_summaries')
+    op.drop_index('ix_conversation_turns_timestamp_id', table_name='conversation_turns')
+    op.drop_index('ix_responses_answered_at_id', table_name='responses')
+    op.drop_index('ix_sessions_completed_at_id', table_name='sessions')
+    op.drop_column('session_summaries', 'updated_at')
@@ -0,0 +1,49 @@
+"""Running cost ledger in micro-dollars and global daily spend
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('model_calls', sa.Column('cost_micro_usd', sa.BigInteger(), nullable=True))
+    op.add_column(
+        'sessions',
+        sa.Column('cost_micro_usd', sa.BigInteger(), server_default=sa.text('0'), nullable=False)
+    )
+
+    # Best effort for existing rows: only the rounded cents were stored
+    op.execute("UPDATE model_calls SET cost_micro_usd = COALESCE(cost_usd, 0) * 10000")
+    op.execute("""
+        UPDATE sessions SET cost_micro_usd = totals.cost
+        FROM (
+            SELECT session_id, SUM(cost_micro_usd) AS cost
+            FROM model_calls GROUP BY session_id
+        ) AS totals
+        WHERE totals.session_id = sessions.id
+    """)
+
+    op.create_table(
+        'llm_daily_spend',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('cost_micro_usd', sa.BigInteger(), nullable=False),
+        sa.Column('call_count', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('day')
+    )
+
+
+def downgrade():
+    op.drop_table('llm_daily_spend')
+    op.drop_column('sessions', 'cost_micro_usd')
+    op.drop_column('model_calls', 'cost_micro_usd')
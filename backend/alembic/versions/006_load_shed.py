@@ -0,0 +1,23 @@
+"""Record load-shedding decisions per session
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('sessions', sa.Column('load_shed', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('sessions', 'load_shed')
@@ -0,0 +1,37 @@
+"""Persistent tier of the follow-up decision cache
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'followup_decisions',
+        sa.Column('cache_key', sa.String(length=64), nullable=False),
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('decision', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index('ix_followup_decisions_question_id', 'followup_decisions', ['question_id'])
+    op.create_index('ix_followup_decisions_expires_at', 'followup_decisions', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_followup_decisions_expires_at', table_name='followup_decisions')
+    op.drop_index('ix_followup_decisions_question_id', table_name='followup_decisions')
+    op.drop_table('followup_decisions')
@@ -0,0 +1,44 @@
+"""Precomputed first-probe follow-ups per single-choice option
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'precomputed_followups',
+        sa.Column('option_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('survey_version_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('decision', sa.JSON(), nullable=False),
+        sa.Column('prompt_version', sa.String(), nullable=False),
+        sa.Column('latency_ms', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['option_id'], ['question_options.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['survey_version_id'], ['survey_versions.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('option_id')
+    )
+    op.create_index('ix_precomputed_followups_survey_version_id', 'precomputed_followups', ['survey_version_id'])
+
+    # Ingest-time generation happens outside any session
+    op.alter_column('model_calls', 'session_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM model_calls WHERE session_id IS NULL")
+    op.alter_column('model_calls', 'session_id', existing_type=sa.Integer(), nullable=False)
+    op.drop_index('ix_precomputed_followups_survey_version_id', table_name='precomputed_followups')
+    op.drop_table('precomputed_followups')
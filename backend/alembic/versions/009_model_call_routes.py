@@ -0,0 +1,23 @@
+"""Record the model router's choice on follow-up model calls
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('model_calls', sa.Column('route', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('model_calls', 'route')
@@ -0,0 +1,25 @@
+"""Record prompt cache reads and writes on model calls
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('model_calls', sa.Column('cache_creation_input_tokens', sa.Integer(), nullable=True))
+    op.add_column('model_calls', sa.Column('cache_read_input_tokens', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('model_calls', 'cache_read_input_tokens')
+    op.drop_column('model_calls', 'cache_creation_input_tokens')
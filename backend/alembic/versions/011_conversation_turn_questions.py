@@ -0,0 +1,44 @@
+"""Tag conversation turns with their question
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('conversation_turns', sa.Column('question_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.create_foreign_key(
+        'fk_conversation_turns_question_id', 'conversation_turns', 'questions',
+        ['question_id'], ['id'], ondelete='CASCADE'
+    )
+    # Existing turns belong to the latest answer given at or before them
+    op.execute("""
+        UPDATE conversation_turns t SET question_id = (
+            SELECT r.question_id FROM responses r
+            WHERE r.session_id = t.session_id AND r.answered_at <= t.timestamp
+            ORDER BY r.answered_at DESC, r.id DESC
+            LIMIT 1
+        )
+        WHERE t.question_id IS NULL
+    """)
+    op.create_index(
+        'ix_conversation_turns_session_question_id', 'conversation_turns',
+        ['session_id', 'question_id', 'id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_conversation_turns_session_question_id', table_name='conversation_turns')
+    op.drop_constraint('fk_conversation_turns_question_id', 'conversation_turns', type_='foreignkey')
+    op.drop_column('conversation_turns', 'question_id')
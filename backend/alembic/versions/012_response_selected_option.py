@@ -0,0 +1,29 @@
+"""Record the chosen option on responses
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('responses', sa.Column('selected_option_id', sa.String(), nullable=True))
+    # Option-only answers stored the option id as the answer
+    op.execute("""
+        UPDATE responses r SET selected_option_id = r.answer
+        FROM question_options o
+        WHERE o.question_id = r.question_id AND o.id::text = r.answer
+    """)
+
+
+def downgrade():
+    op.drop_column('responses', 'selected_option_id')
@@ -1,30 +1,92 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Deque
+from collections import Counter, deque
+from contextlib import aclosing
+import asyncio
 import json
+import time
 from sqlalchemy.orm import Session
 from anthropic import APIError, RateLimitError, APITimeoutError
 
 
+from app.database import SessionLocal
 from app.services.llm_client import LLMClient
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.decision_cache import decision_cache
+from app.services.fast_path import fast_path, DecisionInput
+from app.services.model_router import model_router, Route, RouteFeatures, CASCADE_ESCALATED_ROUTE
 from app.agents.prompts import (
     FOLLOWUP_AGENT_SYSTEM_PROMPT,
+    FOLLOWUP_PROMPT_VERSION,
     render_followup_prompt
 )
 from app.utils.logger import setup_logger
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.json_stream import IncrementalJSONParser
 from app.config import settings
 
 logger = setup_logger(__name__)
 
+# Streaming progress callback: (event name, payload)
+EventCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class FallbackMonitor:
+    """
+    Share of model-bound follow-up decisions that fell back to move_on
+    (deadline, open circuit, errors) over the last `window` decisions.
+    Respondents just see the next question, so while the share is above
+    `alert_rate` an error naming the likely cause is logged, at most once
+    per `report_seconds`.
+    """
+
+    def __init__(self, alert_rate: float, window: int = 200, report_seconds: float = 60.0):
+        self.alert_rate = alert_rate
+        self.report_seconds = report_seconds
+        self._recent: Deque[Optional[str]] = deque(maxlen=window)
+        self._reported_at = float("-inf")
+        self.totals: Dict[str, int] = {}
+
+    def record(self, fallback: Optional[str]):
+        """One decision: None if the model decided, else the fallback reason."""
+        self._recent.append(fallback)
+        if fallback is None:
+            return
+        self.totals[fallback] = self.totals.get(fallback, 0) + 1
+
+        rate = self.rate()
+        now = time.monotonic()
+        if self.alert_rate and rate >= self.alert_rate and now - self._reported_at >= self.report_seconds:
+            self._reported_at = now
+            recent = Counter(reason for reason in self._recent if reason)
+            logger.error(
+                f"{rate:.0%} of the last {len(self._recent)} follow-up decisions fell back to "
+                f"move_on ({dict(recent)}); respondents are not being probed. Deadline fallbacks "
+                f"usually mean FOLLOWUP_DEADLINE_SECONDS={settings.followup_deadline_seconds} is "
+                f"spent queueing for LLM_REQUESTS_PER_MINUTE={settings.llm_requests_per_minute} "
+                f"(see llm_governor.wait_seconds in /admin/metrics)"
+            )
+
+    def rate(self) -> float:
+        if not self._recent:
+            return 0.0
+        return sum(1 for reason in self._recent if reason) / len(self._recent)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "recent_decisions": len(self._recent),
+            "recent_fallback_rate": round(self.rate(), 4),
+            "alert_rate": self.alert_rate,
+            "fallbacks": dict(self.totals)
+        }
+
+
+followup_fallbacks = FallbackMonitor(alert_rate=settings.followup_fallback_alert_rate)
+
 
 class FollowUpAgent:
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
         self.max_probes = settings.max_followup_probes
-    def _extract_text(self, response: dict) -> str:
-        content0 = response["content"][0]
-        if isinstance(content0, dict):
-            return content0.get("text")
-        return content0.text
-
     
     async def should_ask_followup(
         self,
@@ -35,9 +97,31 @@ class FollowUpAgent:
         conversation_history: List[Dict[str, str]],
         probe_count: int,
         session_id: str,
-        db: Session
+        db: Session,
+        deadline: Optional[Deadline] = None,
+        on_event: Optional[EventCallback] = None,
+        question_id: Optional[str] = None,
+        use_cache: bool = False,
+        precomputed: Optional[Dict[str, Any]] = None,
+        max_probes: Optional[int] = None,
+        model: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Determine if a follow-up question should be asked."""
+        """
+        Determine if a follow-up question should be asked. If the deadline
+        runs out first, move on so the respondent gets the next question.
+        The decision is read from a stream and returned as soon as it is
+        settled, so `reason` and `confidence` are usually None. With
+        `on_event`, "moving_on" is emitted once the action is known and
+        "followup_delta" with each piece of the follow-up question as it is
+        generated.
+        A `precomputed` decision (generated ahead of time for exactly these
+        inputs) is returned without calling the model. With `use_cache`, a
+        decision already made for the same normalized inputs to this
+        question is reused. Otherwise the local fast path may settle obvious
+        answers; only the rest reach the model, which the model router
+        picks per call. `max_probes` and `model` come from the question's
+        probing policy (defaults: MAX_FOLLOWUP_PROBES, and a routed model).
+        """
         
         if "prefer not to answer" in user_answer.lower():
             logger.info(f"Skipping follow-up: user opted not to answer")
@@ -49,8 +133,9 @@ class FollowUpAgent:
                 "probe_count": probe_count
             }
         
-        if probe_count >= self.max_probes:
-            logger.info(f"Skipping follow-up: max probes ({self.max_probes}) reached")
+        max_probes = self.max_probes if max_probes is None else max_probes
+        if probe_count >= max_probes:
+            logger.info(f"Skipping follow-up: max probes ({max_probes}) reached")
             return {
                 "action": "move_on",
                 "followup_question": None,
@@ -59,41 +144,99 @@ class FollowUpAgent:
                 "probe_count": probe_count
             }
         
-        user_message = render_followup_prompt(
-            question_text=question_text,
+        if precomputed is not None:
+            logger.info(f"FollowUpAgent decision precomputed: action={precomputed['action']}")
+            if on_event:
+                await self._replay(precomputed, on_event)
+            return dict(precomputed)
+        
+        cache_key = None
+        if use_cache and question_id:
+            cache_key = decision_cache.key(
+                question_id, user_answer, selected_option_text,
+                conversation_history, probe_count, FOLLOWUP_PROMPT_VERSION
+            )
+            cached = decision_cache.get(db, cache_key, question_id)
+            if cached is not None:
+                logger.info(f"FollowUpAgent decision from cache: action={cached['action']}")
+                if on_event:
+                    await self._replay(cached, on_event)
+                return cached
+        
+        decision_input = DecisionInput(
             question_type=question_type,
             user_answer=user_answer,
             selected_option_text=selected_option_text,
-            conversation_history=conversation_history,
+            conversation_history=tuple((t["role"], t["content"]) for t in conversation_history),
             probe_count=probe_count
         )
+        shortcut, fast_path_confidence = fast_path.decide(decision_input)
+        if shortcut is not None:
+            logger.info(f"FollowUpAgent fast path ({shortcut.source}): action={shortcut.action}")
+            result = {
+                "action": shortcut.action,
+                "followup_question": shortcut.followup_question,
+                "reason": f"Fast path: {shortcut.source}",
+                "confidence": "high" if shortcut.confidence >= 0.9 else "medium",
+                "probe_count": probe_count + 1 if shortcut.action == "ask_followup" else probe_count
+            }
+            if on_event:
+                await self._replay(result, on_event)
+            return result
+        
+        route = model_router.route(
+            RouteFeatures(
+                question_type=question_type,
+                answer_words=len(decision_input.words),
+                probe_count=probe_count,
+                fast_path_confidence=fast_path_confidence
+            ),
+            pinned_model=model
+        )
         
         try:
-            response = await self.llm_client.complete(
-                model="claude-sonnet-4-20250514",
-                system=FOLLOWUP_AGENT_SYSTEM_PROMPT,
-                messages=[{"role": "user", "content": user_message}],
-                max_tokens=150,
-                temperature=0.7,
-                agent_type="follow_up",
+            result = await self._routed_decide(
+                route,
+                deadline,
+                on_event,
+                question_text=question_text,
+                question_type=question_type,
+                user_answer=user_answer,
+                selected_option_text=selected_option_text,
+                conversation_history=conversation_history,
+                probe_count=probe_count,
                 session_id=session_id,
-                db=db
-            )
-            
-            content0 = response["content"][0]
-
-            text = self._extract_text(response)
-            result = json.loads(text)
-
-            
-            logger.info(
-                f"FollowUpAgent decision: action={result['action']}, "
-                f"confidence={result['confidence']}, probe_count={result['probe_count']}"
+                db=db,
+                max_probes=max_probes
             )
+            if cache_key:
+                decision_cache.put(db, cache_key, question_id, result)
             
+            followup_fallbacks.record(None)
             return result
         
+        except CircuitOpenError as e:
+            followup_fallbacks.record("circuit_open")
+            logger.warning(f"FollowUpAgent short-circuited, moving on: {e}")
+            return {
+                "action": "move_on",
+                "followup_question": None,
+                "reason": "System temporarily unavailable",
+                "confidence": "low",
+                "probe_count": probe_count
+            }
+        except DeadlineExceeded as e:
+            followup_fallbacks.record("deadline")
+            logger.warning(f"FollowUpAgent deadline exceeded, moving on: {e}")
+            return {
+                "action": "move_on",
+                "followup_question": None,
+                "reason": "Deadline exceeded",
+                "confidence": "low",
+                "probe_count": probe_count
+            }
         except json.JSONDecodeError as e:
+            followup_fallbacks.record("parse_error")
             logger.error(f"JSON parsing error: {e}")
             return {
                 "action": "move_on",
@@ -103,6 +246,7 @@ class FollowUpAgent:
                 "probe_count": probe_count
             }
         except Exception as e:
+            followup_fallbacks.record("error")
             logger.error(f"FollowUpAgent error: {e}")
             # Instead of raising, return a safe fallback
             return {
@@ -111,4 +255,182 @@ class FollowUpAgent:
                 "reason": "System temporarily unavailable",
                 "confidence": "low",
                 "probe_count": probe_count
-            }
\ No newline at end of file
+            }
+    
+    async def decide(
+        self,
+        question_text: str,
+        question_type: str,
+        user_answer: str,
+        selected_option_text: Optional[str],
+        conversation_history: List[Dict[str, str]],
+        probe_count: int,
+        session_id: Optional[str],
+        db: Optional[Session],
+        deadline: Optional[Deadline] = None,
+        on_event: Optional[EventCallback] = None,
+        agent_type: str = "follow_up",
+        model: Optional[str] = None,
+        route: Optional[str] = None,
+        until: Optional[str] = None,
+        max_probes: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Ask the model for a decision. Unlike should_ask_followup() there is
+        no fallback: LLM, deadline and parse errors propagate. With `until`,
+        the stream is read past the settled decision until that member is
+        complete (e.g. "confidence" for a cascade). `max_probes` is the
+        question's follow-up limit the model is told (default
+        MAX_FOLLOWUP_PROBES).
+        """
+        user_message = render_followup_prompt(
+            question_text=question_text,
+            question_type=question_type,
+            user_answer=user_answer,
+            selected_option_text=selected_option_text,
+            conversation_history=conversation_history,
+            probe_count=probe_count,
+            max_probes=self.max_probes if max_probes is None else max_probes,
+            history_token_budget=settings.followup_history_token_budget
+        )
+        request = dict(
+            model=model or settings.followup_model_tiers[settings.followup_default_model_tier],
+            system=FOLLOWUP_AGENT_SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": user_message}],
+            max_tokens=150,
+            temperature=0.7,
+            agent_type=agent_type,
+            session_id=session_id,
+            db=db,
+            deadline=deadline,
+            route=route
+        )
+        if deadline:
+            # The stream's own deadline only covers the first token; this bounds the rest
+            try:
+                values = await asyncio.wait_for(self._decide(request, on_event, until), timeout=deadline.remaining())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded("Follow-up decision not complete within the request deadline")
+        else:
+            values = await self._decide(request, on_event, until)
+        result = {
+            "action": values["action"],
+            "followup_question": values.get("followup_question"),
+            "reason": values.get("reason"),
+            "confidence": values.get("confidence"),
+            "probe_count": values.get("probe_count", probe_count)
+        }
+        
+        logger.info(
+            f"FollowUpAgent decision: action={result['action']}, "
+            f"confidence={result['confidence']}, probe_count={result['probe_count']}, "
+            f"model={request['model']}, route={route}"
+        )
+        return result
+    
+    async def _routed_decide(
+        self,
+        route: Route,
+        deadline: Optional[Deadline],
+        on_event: Optional[EventCallback],
+        **inputs
+    ) -> Dict[str, Any]:
+        """
+        decide() on the routed model. A cascade route asks the small model
+        first, reading on to its confidence, and keeps its decision if the
+        router accepts that confidence; otherwise (or if the small model
+        fails) the large model decides with whatever deadline is left.
+        """
+        if not route.escalate_to:
+            return await self.decide(
+                **inputs, deadline=deadline, on_event=on_event, model=route.model, route=route.name
+            )
+        
+        # The small call is logged in a short transaction of its own, so its
+        # ModelCall and session spend are committed before the escalated
+        # call's round trip instead of waiting on it in the caller's.
+        call_log_db = SessionLocal() if inputs.get("db") is not None else None
+        try:
+            try:
+                result = await self.decide(
+                    **{**inputs, "db": call_log_db},
+                    deadline=deadline, model=route.model, route=route.name, until="confidence"
+                )
+            finally:
+                self._commit_call_log(call_log_db)
+            if model_router.accepts(result):
+                model_router.record_cascade("accepted")
+                if on_event:
+                    await self._replay(result, on_event)
+                return result
+            model_router.record_cascade("escalated_low_confidence")
+        except (CircuitOpenError, APIError, json.JSONDecodeError) as e:
+            logger.warning(f"Cascade small model failed, escalating: {e}")
+            model_router.record_cascade("escalated_error")
+        
+        return await self.decide(
+            **inputs, deadline=deadline, on_event=on_event, model=route.escalate_to, route=CASCADE_ESCALATED_ROUTE
+        )
+    
+    @staticmethod
+    def _commit_call_log(db: Optional[Session]):
+        """Commit and close a session holding only model-call accounting."""
+        if db is None:
+            return
+        try:
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to log cascade model call: {e}")
+        finally:
+            db.close()
+    
+    async def _decide(
+        self,
+        request: Dict[str, Any],
+        on_event: Optional[EventCallback],
+        until: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream the decision through an incremental parser and stop as soon
+        as it is settled (and `until` is complete): when `action` is
+        move_on, or when an ask_followup's `followup_question` is complete.
+        Leaving the stream closes it, so the model stops generating the
+        fields after them. Returns the members parsed so far.
+        """
+        parser = IncrementalJSONParser()
+        forwarded = 0  # characters of the follow-up question already sent to on_event
+        async with aclosing(self.llm_client.stream(**request)) as deltas:
+            async for delta in deltas:
+                parser.feed(delta)
+                action = parser.values.get("action")
+
+                waiting = until is not None and until not in parser.values and not parser.done
+
+                if action == "move_on" and not waiting:
+                    if on_event:
+                        await on_event("moving_on", {})
+                    return parser.values
+
+                if on_event:
+                    if parser.key == "followup_question":
+                        question = parser.partial
+                    else:
+                        question = parser.values.get("followup_question")
+                    if question and len(question) > forwarded:
+                        await on_event("followup_delta", {"text": question[forwarded:]})
+                        forwarded = len(question)
+
+                if action is not None and "followup_question" in parser.values and not waiting:
+                    return parser.values
+
+        if "action" not in parser.values or not parser.done:
+            raise json.JSONDecodeError("Decision ended before it was complete", parser.buffer, len(parser.buffer))
+        return parser.values
+    
+    async def _replay(self, decision: Dict[str, Any], on_event: EventCallback):
+        """Emit the streaming events for a decision that didn't come from a stream."""
+        if decision["action"] == "move_on":
+            await on_event("moving_on", {})
+        elif decision.get("followup_question"):
+            await on_event("followup_delta", {"text": decision["followup_question"]})
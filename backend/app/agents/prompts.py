@@ -1,4 +1,13 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
+import re
+
+# Part of the follow-up decision cache key: bump whenever the follow-up
+# system prompt or render_followup_prompt changes what the model is asked
+FOLLOWUP_PROMPT_VERSION = "4"
+
+CHARS_PER_TOKEN = 4  # rough English average, as in LLMClient estimates
+# Older turns that don't fit the history budget whole are shortened to this
+COMPACT_TURN_CHARS = 160
 
 FOLLOWUP_AGENT_SYSTEM_PROMPT = """You are a neutral survey moderator conducting structured polling interviews. Your role is to understand respondents' true opinions through careful probing, never to persuade or debate.
 
@@ -39,15 +48,17 @@ QUESTION QUALITY:
 - Mirror respondent's language when appropriate
 - Never introduce topics the respondent didn't mention
 
-OUTPUT FORMAT (JSON only, no markdown):
+OUTPUT FORMAT (JSON only, no markdown), fields in exactly this order:
 {
   "action": "ask_followup" | "move_on",
   "followup_question": "your question here" | null,
-  "reason": "brief internal justification (1 sentence)",
+  "probe_count": <current probe number for this baseline question>,
   "confidence": "low" | "medium" | "high",
-  "probe_count": <current probe number for this baseline question>
+  "reason": "brief internal justification (1 sentence)"
 }
 
+Decide the action first and write it before anything else. The decision is read as it is generated and acted on as soon as "action" is "move_on" or "followup_question" is complete, so never put reasoning before them.
+
 CONFIDENCE LEVELS:
 - low: unclear if more probing would help; answer seems complete but shallow
 - medium: some clarity but gaps remain in motivation OR policy preference
@@ -95,9 +106,16 @@ def render_followup_prompt(
     user_answer: str,
     selected_option_text: Optional[str],
     conversation_history: List[Dict[str, str]],
-    probe_count: int
+    probe_count: int,
+    max_probes: int,
+    history_token_budget: Optional[int] = None
 ) -> str:
-    """Render the follow-up agent user prompt."""
+    """
+    Render the follow-up agent user prompt. `max_probes` is the question's
+    follow-up limit, shown next to the probe count. With `history_token_budget`,
+    the follow-up exchange is fitted to roughly that many tokens (see
+    budget_history()).
+    """
     
     options_context = ""
     if question_type == "single_choice" and selected_option_text:
@@ -109,6 +127,8 @@ def render_followup_prompt(
         for turn in conversation_history:
             speaker = "Follow-up Q" if turn['role'] == "assistant" else "Response"
             history_lines.append(f"{speaker}: {turn['content']}")
+        if history_token_budget:
+            history_lines = budget_history(history_lines, history_token_budget)
         history_text = "PREVIOUS FOLLOW-UP EXCHANGE:\n" + "\n".join(history_lines)
     
     prompt = f"""BASELINE SURVEY QUESTION:
@@ -121,13 +141,80 @@ RESPONDENT'S ANSWER:
 
 {history_text}
 
-CURRENT PROBE COUNT: {probe_count}/3
+CURRENT PROBE COUNT: {probe_count}/{max_probes}
 
 Analyze the respondent's answer and determine whether to ask a follow-up question or move on to the next survey question."""
     
     return prompt.strip()
 
 
+def budget_history(lines: List[str], token_budget: int) -> List[str]:
+    """
+    Fit history lines to about `token_budget` tokens, newest first: the
+    latest line is always kept (cut to the budget if it alone exceeds it),
+    older lines are kept whole while they fit, then shortened to
+    COMPACT_TURN_CHARS, and the oldest that still don't fit are replaced
+    by a count of omitted turns.
+    """
+    budget = token_budget * CHARS_PER_TOKEN
+    kept: List[str] = []
+    omitted = 0
+    for index, line in enumerate(reversed(lines)):
+        if index == 0 and len(line) > budget:
+            line = _shorten(line, budget)
+        elif len(line) > budget:
+            line = _shorten(line, COMPACT_TURN_CHARS)
+        if omitted or len(line) > budget:
+            omitted += 1
+            continue
+        kept.append(line)
+        budget -= len(line) + 1
+    if omitted:
+        kept.append(f"[{omitted} earlier turn{'s' if omitted > 1 else ''} omitted]")
+    return kept[::-1]
+
+
+def _shorten(line: str, chars: int) -> str:
+    return line if len(line) <= chars else line[:max(chars - 1, 0)].rstrip() + "…"
+
+
+_FOLLOWUP_PROMPT = re.compile(
+    r"BASELINE SURVEY QUESTION:\n(?P<question>.*?)\n\n"
+    r"(?:SELECTED OPTION: (?P<option>.*?))?\n\n"
+    r"RESPONDENT'S ANSWER:\n(?P<answer>.*?)\n\n"
+    r"(?:PREVIOUS FOLLOW-UP EXCHANGE:\n(?P<history>.*?))?\n\n"
+    r"CURRENT PROBE COUNT: (?P<probe_count>\d+)/",
+    re.DOTALL
+)
+
+
+def parse_followup_prompt(prompt: str) -> Optional[Dict[str, Any]]:
+    """
+    Recover the render_followup_prompt() arguments from a logged prompt
+    (ModelCall.prompt_text), or None if it doesn't match the template.
+    question_type is inferred from the presence of a selected option.
+    """
+    match = _FOLLOWUP_PROMPT.search(prompt or "")
+    if not match:
+        return None
+    
+    history = []
+    for line in (match.group("history") or "").splitlines():
+        speaker, _, content = line.partition(": ")
+        if speaker in ("Follow-up Q", "Response"):
+            history.append({"role": "assistant" if speaker == "Follow-up Q" else "user", "content": content})
+    
+    option = match.group("option")
+    return {
+        "question_text": match.group("question"),
+        "question_type": "single_choice" if option else "free_text",
+        "user_answer": match.group("answer"),
+        "selected_option_text": option,
+        "conversation_history": history,
+        "probe_count": int(match.group("probe_count"))
+    }
+
+
 def render_summary_prompt(
     current_summary: str,
     question_text: str,
@@ -137,25 +224,52 @@ def render_summary_prompt(
 ) -> str:
     """Render the summary agent user prompt."""
     
-    followup_text = ""
-    if followup_questions:
-        exchanges = []
-        for fq, fa in zip(followup_questions, followup_answers):
-            exchanges.append(f"Follow-up: {fq}")
-            exchanges.append(f"Response: {fa}")
-        followup_text = "\n".join(exchanges)
+    return render_summary_batch_prompt(
+        current_summary=current_summary,
+        exchanges=[{
+            "question_text": question_text,
+            "user_answer": user_answer,
+            "followup_questions": followup_questions,
+            "followup_answers": followup_answers
+        }]
+    )
+
+
+def render_summary_batch_prompt(
+    current_summary: str,
+    exchanges: List[Dict[str, Any]]
+) -> str:
+    """Render the summary agent user prompt for one or more coalesced exchanges."""
+    
+    exchange_blocks = []
+    for exchange in exchanges:
+        followup_text = ""
+        if exchange.get("followup_questions"):
+            lines = []
+            for fq, fa in zip(exchange["followup_questions"], exchange.get("followup_answers") or []):
+                lines.append(f"Follow-up: {fq}")
+                lines.append(f"Response: {fa}")
+            followup_text = "\n".join(lines)
+        
+        exchange_blocks.append(
+            f"Survey Question: {exchange['question_text']}\n"
+            f"Answer: {exchange['user_answer']}\n"
+            f"{followup_text if followup_text else '[No follow-up questions asked]'}"
+        )
     
     if not current_summary or current_summary == "Session started. No responses yet.":
         current_summary = "[No summary yet - this is the first response]"
     
+    exchanges_text = "\n\n".join(exchange_blocks)
+    header = "NEW EXCHANGE:" if len(exchange_blocks) == 1 else "NEW EXCHANGES:"
+    noun = "this new exchange" if len(exchange_blocks) == 1 else "these new exchanges"
+    
     prompt = f"""CURRENT SUMMARY:
 {current_summary}
 
-NEW EXCHANGE:
-Survey Question: {question_text}
-Answer: {user_answer}
-{followup_text if followup_text else "[No follow-up questions asked]"}
+{header}
+{exchanges_text}
 
-Update the summary to incorporate insights from this new exchange. Keep it under 80 words."""
+Update the summary to incorporate insights from {noun}. Keep it under 80 words."""
     
     return prompt.strip()
\ No newline at end of file
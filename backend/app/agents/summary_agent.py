@@ -5,9 +5,11 @@ from anthropic import APIError, RateLimitError, APITimeoutError
 
 
 from app.services.llm_client import LLMClient
+from app.services.circuit_breaker import CircuitOpenError
 from app.agents.prompts import (
     SUMMARY_AGENT_SYSTEM_PROMPT,
-    render_summary_prompt
+    render_summary_prompt,
+    render_summary_batch_prompt
 )
 from app.utils.logger import setup_logger
 
@@ -17,6 +19,12 @@ logger = setup_logger(__name__)
 class SummaryAgent:
     def __init__(self, llm_client: LLMClient):
         self.llm_client = llm_client
+
+    def _extract_text(self, response: dict) -> str:
+        content0 = response["content"][0]
+        if isinstance(content0, dict):
+            return content0.get("text")
+        return content0.text
     
     async def update_summary(
         self,
@@ -38,6 +46,31 @@ class SummaryAgent:
             followup_answers=followup_answers
         )
         
+        return await self._complete(user_message, current_summary, session_id, db)
+    
+    async def summarize_exchanges(
+        self,
+        current_summary: str,
+        exchanges: List[Dict[str, Any]],
+        session_id: str,
+        db: Session
+    ) -> Dict[str, Any]:
+        """Fold one or more queued exchanges into the summary with a single call."""
+        
+        user_message = render_summary_batch_prompt(
+            current_summary=current_summary,
+            exchanges=exchanges
+        )
+        
+        return await self._complete(user_message, current_summary, session_id, db)
+    
+    async def _complete(
+        self,
+        user_message: str,
+        current_summary: str,
+        session_id: str,
+        db: Session
+    ) -> Dict[str, Any]:
         try:
             response = await self.llm_client.complete(
                 model="claude-3-haiku-20240307",
@@ -50,23 +83,32 @@ class SummaryAgent:
                 db=db
             )
             
-            result = json.loads(response["content"][0].text)
+            result = json.loads(self._extract_text(response))
             
             logger.info(f"SummaryAgent updated: themes={result.get('key_themes', [])}")
             
             return result
         
+        except CircuitOpenError as e:
+            logger.warning(f"SummaryAgent short-circuited: {e}")
+            return {
+                "summary": current_summary,
+                "key_themes": [],
+                "error": "circuit_open"
+            }
         except json.JSONDecodeError as e:
             logger.error(f"JSON parsing error in SummaryAgent: {e}")
             return {
                 "summary": current_summary,
-                "key_themes": []
+                "key_themes": [],
+                "error": "invalid_json"
             }
         except Exception as e:
             logger.error(f"SummaryAgent error: {e}")
             return {
                 "summary": current_summary,
-                "key_themes": []
+                "key_themes": [],
+                "error": "temporary_issue"
                 }
         except APIError as e:
             logger.error(f"API error in SummaryAgent: {e.status_code} - {e.message}")
@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, func, text, tuple_
 from sqlalchemy.orm import Session
 from uuid import UUID
-from typing import List
+from datetime import datetime
+from typing import List, Optional, Tuple
+import base64
+import json
 
 from app.database import get_db
 from app.models import (
@@ -9,9 +13,23 @@ from app.models import (
     SessionMessage,
     SessionSummary,
     ModelCall,
+    Survey,
     SurveyVersion
 )
 from app.schemas import SessionListItem, SessionDetail
+from app.services.survey_cache import survey_cache
+from app.services.session_state import session_state_store
+from app.services.cost_ledger import MICRO, daily_spend
+from app.services.llm_governor import llm_governor
+from app.services.llm_client import latency_tracker
+from app.services.circuit_breaker import circuit_breakers
+from app.services.load_shedder import load_shedder
+from app.services.decision_cache import decision_cache
+from app.services.followup_precompute import precomputed_followups
+from app.services.fast_path import fast_path
+from app.services.model_router import model_router, route_metrics
+from app.agents.followup_agent import followup_fallbacks
+from app.utils.db_metrics import db_metrics
 from app.utils.logger import setup_logger
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -20,42 +38,116 @@ logger = setup_logger(__name__)
 
 @router.get("/sessions", response_model=List[SessionListItem])
 def list_sessions(
+    response: Response,
     status: str = None,
-    limit: int = 50,
-    offset: int = 0,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """List all sessions with pagination."""
+    """
+    List sessions, newest first, with keyset pagination on (started_at, id).
+    Pass the X-Next-Cursor header of one page as `cursor` to get the next;
+    `include_total` adds a planner-estimated X-Total-Estimate header.
+    """
     
-    query = db.query(SessionModel)
+    # One page of sessions, resolved with an index range scan instead of OFFSET
+    page = select(
+        SessionModel.id,
+        SessionModel.survey_version_id,
+        SessionModel.status,
+        SessionModel.started_at,
+        SessionModel.completed_at
+    )
     
     if status:
-        query = query.filter(SessionModel.status == status)
-    
-    sessions = query.order_by(
-        SessionModel.started_at.desc()
-    ).limit(limit).offset(offset).all()
-    
-    result = []
-    for session in sessions:
-        message_count = db.query(SessionMessage).filter(
-            SessionMessage.session_id == session.id
-        ).count()
-        
-        survey_version = db.query(SurveyVersion).filter(
-            SurveyVersion.id == session.survey_version_id
-        ).first()
-        
-        result.append({
-            "session_id": session.id,
-            "survey_name": survey_version.survey.name if survey_version else "Unknown",
-            "status": session.status,
-            "started_at": session.started_at,
-            "completed_at": session.completed_at,
-            "message_count": message_count
-        })
-    
-    return result
+        page = page.where(SessionModel.status == status)
+    
+    if cursor:
+        started_at, session_id = _decode_cursor(cursor)
+        page = page.where(
+            tuple_(SessionModel.started_at, SessionModel.id) < tuple_(started_at, session_id)
+        )
+    
+    page = page.order_by(
+        SessionModel.started_at.desc(), SessionModel.id.desc()
+    ).limit(limit).subquery()
+    
+    # Message counts aggregated for the page's sessions only
+    message_counts = select(
+        SessionMessage.session_id,
+        func.count().label("message_count")
+    ).where(
+        SessionMessage.session_id.in_(select(page.c.id))
+    ).group_by(SessionMessage.session_id).subquery()
+    
+    rows = db.execute(
+        select(
+            page,
+            func.coalesce(Survey.name, "Unknown").label("survey_name"),
+            func.coalesce(message_counts.c.message_count, 0).label("message_count")
+        ).select_from(page).outerjoin(
+            SurveyVersion, SurveyVersion.id == page.c.survey_version_id
+        ).outerjoin(
+            Survey, Survey.id == SurveyVersion.survey_id
+        ).outerjoin(
+            message_counts, message_counts.c.session_id == page.c.id
+        ).order_by(page.c.started_at.desc(), page.c.id.desc())
+    ).all()
+    
+    if len(rows) == limit:
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.started_at, last.id)
+    
+    if include_total:
+        total = _estimate_session_count(db, status)
+        if total is not None:
+            response.headers["X-Total-Estimate"] = str(total)
+    
+    return [
+        {
+            "session_id": row.id,
+            "survey_name": row.survey_name,
+            "status": row.status,
+            "started_at": row.started_at,
+            "completed_at": row.completed_at,
+            "message_count": row.message_count
+        }
+        for row in rows
+    ]
+
+
+def _encode_cursor(started_at: datetime, session_id: int) -> str:
+    raw = json.dumps([started_at.isoformat(), session_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        started_at, session_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(started_at), int(session_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _estimate_session_count(db: Session, status: Optional[str]) -> Optional[int]:
+    """Row estimate from the Postgres planner statistics - no table scan."""
+    if db.bind.dialect.name != "postgresql":
+        return None
+    
+    if status:
+        plan = db.execute(
+            text("EXPLAIN (FORMAT JSON) SELECT 1 FROM sessions WHERE status = :status"),
+            {"status": status}
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'sessions'")
+    ).scalar()
+    return max(int(estimate), 0) if estimate is not None else None
 
 
 @router.get("/sessions/{session_id}", response_model=SessionDetail)
@@ -101,7 +193,7 @@ def get_session_detail(
         for mc in model_calls
     )
     
-    total_cost = sum(mc.cost_usd or 0 for mc in model_calls)
+    total_cost = (session.cost_micro_usd or 0) / MICRO
     
     survey_version = db.query(SurveyVersion).filter(
         SurveyVersion.id == session.survey_version_id
@@ -118,5 +210,39 @@ def get_session_detail(
         "messages": messages_data,
         "llm_calls_count": len(model_calls), #changed from model
         "total_tokens": total_tokens,
-        "total_cost_usd": total_cost
-    }
\ No newline at end of file
+        "total_cost_usd": total_cost,
+        "load_shed": session.load_shed
+    }
+
+
+@router.get("/metrics")
+def get_metrics():
+    """In-process cache and runtime counters for this API worker."""
+    return {
+        "survey_cache": survey_cache.stats(),
+        "session_state": session_state_store.stats(),
+        "database": db_metrics.stats(),
+        "llm_spend": daily_spend.stats(),
+        "llm_governor": llm_governor.stats(),
+        "llm_latency": latency_tracker.stats(),
+        "llm_circuits": circuit_breakers.stats(),
+        "load_shedding": load_shedder.stats(),
+        "followup_cache": decision_cache.stats(),
+        "precomputed_followups": precomputed_followups.stats(),
+        "fast_path": fast_path.stats(),
+        "model_routing": model_router.stats(),
+        "followup_fallbacks": followup_fallbacks.stats()
+    }
+
+
+@router.get("/model-routes")
+def get_model_routes(
+    hours: float = Query(default=24.0, gt=0, le=24 * 90),
+    db: Session = Depends(get_db)
+):
+    """Follow-up decision latency and cost per model route, from logged model calls."""
+    return {
+        "mode": model_router.mode,
+        "hours": hours,
+        "routes": route_metrics(db, hours)
+    }
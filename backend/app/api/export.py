@@ -1,108 +1,180 @@
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from typing import Iterator, Callable, List, Optional
+from uuid import UUID
 import json
 import csv
 import io
 
-from app.database import get_db
-from app.models import (
-    Session as SessionModel,
-    SessionMessage,
-    SessionSummary,
-    SurveyVersion
-)
+from app.database import SessionLocal, get_db
+from app.models import SurveyVersion
+from app.services.export_service import iter_session_exports
+from app.services.columnar_export import TABLES, FORMATS, iter_table_export, iter_response_matrix
+from app.services.change_feed import FEEDS, WatermarkError, decode_watermark, encode_watermark, read_changes
 from app.utils.logger import setup_logger
 
 router = APIRouter(prefix="/export", tags=["export"])
 logger = setup_logger(__name__)
 
+CSV_COLUMNS = [
+    "session_id", "survey_name", "status", "started_at", "completed_at",
+    "summary", "key_themes", "message_count", "load_shed"
+]
+
+
+# Exports stream after the request's dependencies have exited, so each
+# generator opens (and closes) its own DB session instead of using get_db.
+
+def _stream_json() -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        yield "["
+        first = True
+        for record in iter_session_exports(db):
+            yield ("\n" if first else ",\n") + json.dumps(record)
+            first = False
+        yield "\n]\n"
+    finally:
+        db.close()
+
+
+def _stream_ndjson() -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        for record in iter_session_exports(db):
+            yield json.dumps(record) + "\n"
+    finally:
+        db.close()
+
+
+def _stream_csv() -> Iterator[str]:
+    db = SessionLocal()
+    try:
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(CSV_COLUMNS)
+
+        for i, record in enumerate(iter_session_exports(db, include_messages=False), start=1):
+            writer.writerow([
+                record["session_id"],
+                record["survey_name"] or "",
+                record["status"],
+                record["started_at"] or "",
+                record["completed_at"] or "",
+                record["summary"] or "",
+                ", ".join(record["key_themes"]),
+                record["message_count"],
+                json.dumps(record["load_shed"]) if record["load_shed"] else ""
+            ])
+            if i % 100 == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+
+        yield output.getvalue()
+    finally:
+        db.close()
+
+
+def _stream_columnar(export: Callable[[Session], Iterator[bytes]]) -> Iterator[bytes]:
+    db = SessionLocal()
+    try:
+        yield from export(db)
+    finally:
+        db.close()
+
+
+def _check_format(format: str):
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(FORMATS)}")
+
 
 @router.get("/sessions.json")
-def export_sessions_json(db: Session = Depends(get_db)):
-    """Export all sessions as JSON."""
-    
-    sessions = db.query(SessionModel).all()
-    
-    export_data = []
-    for session in sessions:
-        messages = db.query(SessionMessage).filter(
-            SessionMessage.session_id == session.id
-        ).order_by(SessionMessage.sequence_number).all()
-        
-        summary = db.query(SessionSummary).filter(
-            SessionSummary.session_id == session.id
-        ).first()
-        
-        survey_version = db.query(SurveyVersion).filter(
-            SurveyVersion.id == session.survey_version_id
-        ).first()
-        
-        export_data.append({
-            "session_id": str(session.id),
-            "survey_name": survey_version.survey.name if survey_version else None,
-            "status": session.status,
-            "started_at": session.started_at.isoformat(),
-            "completed_at": session.completed_at.isoformat() if session.completed_at else None,
-            "summary": summary.summary_text if summary else None,
-            "key_themes": summary.key_themes if summary else [],
-            "messages": [
-                {
-                    "sequence": msg.sequence_number,
-                    "type": msg.message_type,
-                    "text": msg.message_text,
-                    "is_follow_up": msg.is_follow_up
-                }
-                for msg in messages
-            ]
-        })
-    
-    return Response(
-        content=json.dumps(export_data, indent=2),
+def export_sessions_json():
+    """Export all sessions as a JSON array (streamed)."""
+    return StreamingResponse(
+        _stream_json(),
         media_type="application/json",
         headers={"Content-Disposition": "attachment; filename=sessions.json"}
     )
 
 
+@router.get("/sessions.ndjson")
+def export_sessions_ndjson():
+    """Export all sessions as newline-delimited JSON, one session per line."""
+    return StreamingResponse(
+        _stream_ndjson(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=sessions.ndjson"}
+    )
+
+
 @router.get("/sessions.csv")
-def export_sessions_csv(db: Session = Depends(get_db)):
-    """Export all sessions as CSV (flattened)."""
+def export_sessions_csv():
+    """Export all sessions as CSV (flattened, streamed)."""
+    return StreamingResponse(
+        _stream_csv(),
+        media_type="text/csv",
+        headers={"Content-Disposition": "attachment; filename=sessions.csv"}
+    )
+
+
+@router.get("/tables/{table}")
+def export_table(table: str, format: str = "parquet"):
+    """Export a raw table (responses, conversation_turns, session_summaries, model_calls) as Parquet or Arrow."""
+    if table not in TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table '{table}'")
+    _check_format(format)
     
-    sessions = db.query(SessionModel).all()
+    extension, media_type = FORMATS[format]
+    return StreamingResponse(
+        _stream_columnar(lambda db: iter_table_export(db, table, format)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={table}.{extension}"}
+    )
+
+
+@router.get("/survey_versions/{version_id}/matrix")
+def export_response_matrix(version_id: UUID, format: str = "parquet", db: Session = Depends(get_db)):
+    """Export the respondent x question answer matrix of a survey version."""
+    _check_format(format)
+    if not db.query(SurveyVersion.id).filter(SurveyVersion.id == version_id).first():
+        raise HTTPException(status_code=404, detail="Survey version not found")
     
-    output = io.StringIO()
-    writer = csv.writer(output)
+    extension, media_type = FORMATS[format]
+    return StreamingResponse(
+        _stream_columnar(lambda db: iter_response_matrix(db, version_id, format)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=matrix_{version_id}.{extension}"}
+    )
+
+
+@router.get("/changes")
+def export_changes(
+    since: Optional[str] = None,
+    entities: Optional[List[str]] = Query(default=None),
+    limit: int = Query(default=None, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Rows added or updated since a watermark (sessions by completed_at,
+    responses, conversation_turns, session_summaries, model_calls). Pass the
+    returned watermark as `since` on the next call; repeat while has_more.
+    """
+    unknown = [name for name in entities or [] if name not in FEEDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown entities: {', '.join(unknown)}")
     
-    writer.writerow([
-        "session_id", "survey_name", "status", "started_at", "completed_at",
-        "summary", "key_themes", "message_count"
-    ])
+    try:
+        watermark = decode_watermark(since)
+    except WatermarkError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    for session in sessions:
-        message_count = db.query(SessionMessage).filter(
-            SessionMessage.session_id == session.id
-        ).count()
-        
-        summary = db.query(SessionSummary).filter(
-            SessionSummary.session_id == session.id
-        ).first()
-        
-        survey_version = db.query(SurveyVersion).filter(
-            SurveyVersion.id == session.survey_version_id
-        ).first()
-        
-        writer.writerow([
-            str(session.id),
-            survey_version.survey.name if survey_version else "",
-            session.status,
-            session.started_at.isoformat(),
-            session.completed_at.isoformat() if session.completed_at else "",
-            summary.summary_text if summary else "",
-            ", ".join(summary.key_themes) if summary and summary.key_themes else "",
-            message_count
-        ])
+    changes, new_watermark, has_more = read_changes(db, watermark, entities, limit)
     
-    return Response(
-        content=output.getvalue(),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=sessions.csv"}
-    )
\ No newline at end of file
+    return {
+        "watermark": encode_watermark(new_watermark),
+        "has_more": has_more,
+        "changes": changes
+    }
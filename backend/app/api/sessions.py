@@ -1,7 +1,11 @@
+from typing import Any, AsyncIterator, Dict
+import asyncio
+import json
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from uuid import UUID
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.schemas import (
     SessionStartRequest,
     SessionStartResponse,
@@ -11,6 +15,9 @@ from app.schemas import (
     SessionEndResponse
 )
 from app.services.session_service import SessionService
+from app.services.llm_registry import get_followup_agent, get_summary_workers
+from app.services.summary_queue import SummaryWorkerPool
+from app.agents.followup_agent import FollowUpAgent
 from app.utils.logger import setup_logger
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
@@ -44,11 +51,13 @@ def start_session(
 async def submit_answer(
     session_id: int,
     answer: AnswerRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    followup_agent: FollowUpAgent = Depends(get_followup_agent),
+    summary_workers: SummaryWorkerPool = Depends(get_summary_workers)
 ):
     """Submit an answer and get next question or follow-up."""
     try:
-        service = SessionService(db)
+        service = SessionService(db, followup_agent, summary_workers)
         
         result = await service.submit_answer(
             session_id=session_id,
@@ -66,15 +75,86 @@ async def submit_answer(
         logger.exception("Failed to submit answer")
         raise HTTPException(status_code=400, detail=str(e))
 
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _answer_events(
+    session_id: int,
+    answer: AnswerRequest,
+    followup_agent: FollowUpAgent,
+    summary_workers: SummaryWorkerPool
+) -> AsyncIterator[str]:
+    """
+    Run submit_answer with a streaming follow-up decision and relay its
+    events as SSE. Opens its own DB session: the body streams after the
+    request's dependencies have exited.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def on_event(event: str, data: Dict[str, Any]):
+        events.put_nowait((event, data))
+
+    db = SessionLocal()
+    service = SessionService(db, followup_agent, summary_workers)
+    task = asyncio.create_task(service.submit_answer(
+        session_id=session_id,
+        question_id=answer.question_id,
+        answer_type=answer.answer_type,
+        text=answer.text,
+        selected_option_id=answer.selected_option_id,
+        on_event=on_event
+    ))
+    task.add_done_callback(lambda _: events.put_nowait(None))
+
+    try:
+        while (item := await events.get()) is not None:
+            yield _sse(*item)
+
+        try:
+            result = task.result()
+            yield _sse("result", result.model_dump(mode="json"))
+        except Exception as e:
+            logger.exception("Failed to submit answer")
+            yield _sse("error", {"detail": str(e)})
+    finally:
+        # A client that disconnects mid-stream doesn't cancel the answer itself
+        if task.done():
+            db.close()
+        else:
+            task.add_done_callback(lambda _: db.close())
+
+
+@router.post("/{session_id}/answer/stream")
+async def submit_answer_stream(
+    session_id: int,
+    answer: AnswerRequest,
+    followup_agent: FollowUpAgent = Depends(get_followup_agent),
+    summary_workers: SummaryWorkerPool = Depends(get_summary_workers)
+):
+    """
+    Streaming variant of /answer over Server-Sent Events. Emits `moving_on`
+    as soon as the agent decides not to probe, `followup_delta` events with
+    the follow-up question text as it is generated, then a single `result`
+    event carrying the NextQuestionResponse (or `error`).
+    """
+    return StreamingResponse(
+        _answer_events(session_id, answer, followup_agent, summary_workers),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/{session_id}/end", response_model=SessionEndResponse)
 def end_session(
     session_id: int,
     request_data: SessionEndRequest,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    summary_workers: SummaryWorkerPool = Depends(get_summary_workers)
 ):
     """End interview gracefully."""
     try:
-        service = SessionService(db)
+        service = SessionService(db, summary_workers=summary_workers)
         result = service.end_session(session_id, request_data.reason)
         return result
     
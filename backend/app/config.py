@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import Optional, Dict, List
 
 
 class Settings(BaseSettings):
@@ -20,6 +21,8 @@ class Settings(BaseSettings):
         default=False,
         validation_alias="USE_MOCK_LLM",
     )
+    # Simulated latency per model, [min_ms, max_ms] (default 50-150ms for every model)
+    mock_llm_latency_ms: Dict[str, List[float]] = Field(default_factory=dict, validation_alias="MOCK_LLM_LATENCY_MS")
 
     # Application
     app_env: str = Field(default="development", validation_alias="APP_ENV")
@@ -30,11 +33,119 @@ class Settings(BaseSettings):
     # Session Config
     session_timeout_minutes: int = Field(default=30, validation_alias="SESSION_TIMEOUT_MINUTES")
     max_followup_probes: int = Field(default=3, validation_alias="MAX_FOLLOWUP_PROBES")
+    followup_history_token_budget: int = Field(default=300, validation_alias="FOLLOWUP_HISTORY_TOKEN_BUDGET")  # 0 = no limit
 
     # API Safety Settings
     api_timeout_seconds: float = Field(default=30.0, validation_alias="API_TIMEOUT_SECONDS")
     api_max_retries: int = Field(default=3, validation_alias="API_MAX_RETRIES")
     max_cost_per_session_usd: float = Field(default=0.50, validation_alias="MAX_COST_PER_SESSION_USD")
+    max_daily_cost_usd: float = Field(default=0.0, validation_alias="MAX_DAILY_COST_USD")  # 0 = no global limit
+    daily_spend_refresh_seconds: float = Field(default=10.0, validation_alias="DAILY_SPEND_REFRESH_SECONDS")
+    daily_spend_flush_seconds: float = Field(default=5.0, validation_alias="DAILY_SPEND_FLUSH_SECONDS")
+
+    # LLM Connection Pool (shared by every request in the process)
+    anthropic_base_url: Optional[str] = Field(default=None, validation_alias="ANTHROPIC_BASE_URL")
+    llm_pool_max_connections: int = Field(default=100, validation_alias="LLM_POOL_MAX_CONNECTIONS")
+    llm_pool_max_keepalive: int = Field(default=20, validation_alias="LLM_POOL_MAX_KEEPALIVE")
+    llm_pool_keepalive_expiry_seconds: float = Field(default=30.0, validation_alias="LLM_POOL_KEEPALIVE_EXPIRY_SECONDS")
+    llm_prewarm_connections: int = Field(default=0, validation_alias="LLM_PREWARM_CONNECTIONS")
+    llm_max_in_flight: int = Field(default=32, validation_alias="LLM_MAX_IN_FLIGHT")
+
+    # Prompt Caching (system prompts sent as a cached prefix; the beta header is
+    # needed by SDKs that predate prompt caching, empty to leave it out)
+    llm_prompt_caching: bool = Field(default=True, validation_alias="LLM_PROMPT_CACHING")
+    llm_prompt_cache_beta: str = Field(default="prompt-caching-2024-07-31", validation_alias="LLM_PROMPT_CACHE_BETA")
+
+    # LLM Rate Governor (process-wide token buckets per model)
+    llm_requests_per_minute: int = Field(default=50, validation_alias="LLM_REQUESTS_PER_MINUTE")
+    llm_tokens_per_minute: int = Field(default=40000, validation_alias="LLM_TOKENS_PER_MINUTE")
+    llm_model_rate_limits: Dict[str, Dict[str, int]] = Field(default_factory=dict, validation_alias="LLM_MODEL_RATE_LIMITS")
+    llm_priority_aging_seconds: float = Field(default=10.0, validation_alias="LLM_PRIORITY_AGING_SECONDS")
+    llm_rate_limit_default_pause_seconds: float = Field(default=5.0, validation_alias="LLM_RATE_LIMIT_DEFAULT_PAUSE_SECONDS")
+
+    # Follow-up Deadlines (respondent-facing time budget per answer)
+    followup_deadline_seconds: float = Field(default=2.5, validation_alias="FOLLOWUP_DEADLINE_SECONDS")  # 0 = no deadline
+    followup_fallback_alert_rate: float = Field(default=0.2, validation_alias="FOLLOWUP_FALLBACK_ALERT_RATE")  # 0 = never alert
+    llm_hedge_requests: bool = Field(default=False, validation_alias="LLM_HEDGE_REQUESTS")
+    llm_hedge_percentile: float = Field(default=0.95, validation_alias="LLM_HEDGE_PERCENTILE")
+    llm_hedge_min_delay_seconds: float = Field(default=0.5, validation_alias="LLM_HEDGE_MIN_DELAY_SECONDS")
+
+    # LLM Circuit Breaker (per model)
+    llm_circuit_breaker_enabled: bool = Field(default=True, validation_alias="LLM_CIRCUIT_BREAKER_ENABLED")
+    llm_circuit_failure_rate: float = Field(default=0.5, validation_alias="LLM_CIRCUIT_FAILURE_RATE")
+    llm_circuit_slow_call_rate: float = Field(default=0.8, validation_alias="LLM_CIRCUIT_SLOW_CALL_RATE")
+    llm_circuit_slow_call_seconds: float = Field(default=5.0, validation_alias="LLM_CIRCUIT_SLOW_CALL_SECONDS")
+    llm_circuit_min_calls: int = Field(default=10, validation_alias="LLM_CIRCUIT_MIN_CALLS")
+    llm_circuit_window_seconds: float = Field(default=60.0, validation_alias="LLM_CIRCUIT_WINDOW_SECONDS")
+    llm_circuit_open_seconds: float = Field(default=30.0, validation_alias="LLM_CIRCUIT_OPEN_SECONDS")
+    llm_circuit_half_open_probes: int = Field(default=3, validation_alias="LLM_CIRCUIT_HALF_OPEN_PROBES")
+
+    # Load Shedding (degrade the answer path under pressure)
+    load_shed_enabled: bool = Field(default=True, validation_alias="LOAD_SHED_ENABLED")
+    load_shed_max_in_flight: int = Field(default=24, validation_alias="LOAD_SHED_MAX_IN_FLIGHT")
+    load_shed_max_queue_wait_seconds: float = Field(default=1.0, validation_alias="LOAD_SHED_MAX_QUEUE_WAIT_SECONDS")
+    load_shed_max_loop_lag_ms: float = Field(default=100.0, validation_alias="LOAD_SHED_MAX_LOOP_LAG_MS")
+    load_shed_level_steps: List[float] = Field(default=[1.0, 1.5, 2.0], validation_alias="LOAD_SHED_LEVEL_STEPS")
+    load_shed_recovery_seconds: float = Field(default=15.0, validation_alias="LOAD_SHED_RECOVERY_SECONDS")
+
+    # Follow-up Decision Cache (surveys/questions opt out with "cache_followups": false)
+    followup_cache_enabled: bool = Field(default=True, validation_alias="FOLLOWUP_CACHE_ENABLED")
+    followup_cache_max_entries: int = Field(default=10000, validation_alias="FOLLOWUP_CACHE_MAX_ENTRIES")
+    followup_cache_ttl_seconds: float = Field(default=21600.0, validation_alias="FOLLOWUP_CACHE_TTL_SECONDS")
+    followup_cache_persistent: bool = Field(default=False, validation_alias="FOLLOWUP_CACHE_PERSISTENT")
+
+    # Precomputed First-Probe Follow-ups (single-choice options, generated at ingest)
+    followup_precompute_enabled: bool = Field(default=True, validation_alias="FOLLOWUP_PRECOMPUTE_ENABLED")
+    followup_precompute_on_ingest: bool = Field(default=False, validation_alias="FOLLOWUP_PRECOMPUTE_ON_INGEST")  # paid LLM calls at ingest
+    followup_precompute_concurrency: int = Field(default=4, validation_alias="FOLLOWUP_PRECOMPUTE_CONCURRENCY")
+    followup_precompute_refresh_seconds: float = Field(default=60.0, validation_alias="FOLLOWUP_PRECOMPUTE_REFRESH_SECONDS")
+
+    # Fast Path (local pre-decision ahead of the follow-up LLM call)
+    fast_path_enabled: bool = Field(default=False, validation_alias="FAST_PATH_ENABLED")
+    fast_path_min_confidence: float = Field(default=0.85, validation_alias="FAST_PATH_MIN_CONFIDENCE")
+    fast_path_model_path: str = Field(default="fast_path_model.json", validation_alias="FAST_PATH_MODEL_PATH")
+    fast_path_long_answer_words: int = Field(default=80, validation_alias="FAST_PATH_LONG_ANSWER_WORDS")
+
+    # Follow-up Models (a question picks its tier with "probing": {"model_tier": ...})
+    followup_model_tiers: Dict[str, str] = Field(
+        default={"standard": "claude-sonnet-4-20250514", "fast": "claude-3-haiku-20240307"},
+        validation_alias="FOLLOWUP_MODEL_TIERS",
+    )
+    followup_default_model_tier: str = Field(default="standard", validation_alias="FOLLOWUP_DEFAULT_MODEL_TIER")
+
+    # Follow-up Model Routing ("fixed": default tier, "routed": per-call tier from
+    # answer features, "cascade": small tier first, escalating on low confidence)
+    followup_routing_mode: str = Field(default="fixed", validation_alias="FOLLOWUP_ROUTING_MODE")
+    followup_route_small_tier: str = Field(default="fast", validation_alias="FOLLOWUP_ROUTE_SMALL_TIER")
+    followup_route_large_tier: str = Field(default="standard", validation_alias="FOLLOWUP_ROUTE_LARGE_TIER")
+    followup_route_short_answer_words: int = Field(default=12, validation_alias="FOLLOWUP_ROUTE_SHORT_ANSWER_WORDS")
+    followup_route_small_question_types: List[str] = Field(default=["single_choice"], validation_alias="FOLLOWUP_ROUTE_SMALL_QUESTION_TYPES")
+    followup_route_small_from_probe: int = Field(default=2, validation_alias="FOLLOWUP_ROUTE_SMALL_FROM_PROBE")
+    followup_route_fast_path_confidence: float = Field(default=0.7, validation_alias="FOLLOWUP_ROUTE_FAST_PATH_CONFIDENCE")
+    followup_cascade_accept_confidence: List[str] = Field(default=["high"], validation_alias="FOLLOWUP_CASCADE_ACCEPT_CONFIDENCE")
+
+    # Background Summaries
+    summary_worker_count: int = Field(default=2, validation_alias="SUMMARY_WORKER_COUNT")
+    summary_poll_interval_seconds: float = Field(default=1.0, validation_alias="SUMMARY_POLL_INTERVAL_SECONDS")
+    summary_job_max_attempts: int = Field(default=3, validation_alias="SUMMARY_JOB_MAX_ATTEMPTS")
+    summary_job_stale_seconds: int = Field(default=300, validation_alias="SUMMARY_JOB_STALE_SECONDS")
+    summary_requeue_interval_seconds: float = Field(default=60.0, validation_alias="SUMMARY_REQUEUE_INTERVAL_SECONDS")
+    summary_completion_wait_seconds: float = Field(default=2.0, validation_alias="SUMMARY_COMPLETION_WAIT_SECONDS")
+
+    # Survey Definition Cache
+    survey_cache_max_versions: int = Field(default=64, validation_alias="SURVEY_CACHE_MAX_VERSIONS")
+    survey_cache_current_ttl_seconds: float = Field(default=30.0, validation_alias="SURVEY_CACHE_CURRENT_TTL_SECONDS")
+
+    # Session State Cache
+    session_state_cache_size: int = Field(default=10000, validation_alias="SESSION_STATE_CACHE_SIZE")
+    session_state_backend: str = Field(default="local", validation_alias="SESSION_STATE_BACKEND")
+    session_state_backend_max_entries: int = Field(default=100000, validation_alias="SESSION_STATE_BACKEND_MAX_ENTRIES")
+
+    # Exports
+    export_batch_size: int = Field(default=1000, validation_alias="EXPORT_BATCH_SIZE")
+    export_row_group_rows: int = Field(default=100000, validation_alias="EXPORT_ROW_GROUP_ROWS")
+    change_feed_page_size: int = Field(default=1000, validation_alias="CHANGE_FEED_PAGE_SIZE")
+    change_feed_safety_lag_seconds: float = Field(default=5.0, validation_alias="CHANGE_FEED_SAFETY_LAG_SECONDS")
 
     class Config:
         env_file = ".env"
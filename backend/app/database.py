@@ -2,8 +2,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
+from app.utils.db_metrics import db_metrics
 
 engine = create_engine(settings.database_url, pool_pre_ping=True, echo=settings.app_env == "development")
+db_metrics.install(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
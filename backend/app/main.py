@@ -1,8 +1,23 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api import sessions, admin, export, respondents
+from .services.llm_registry import LLMRegistry
 
-app = FastAPI(title="Polling Survey API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled LLM client + agents for the whole process
+    registry = LLMRegistry()
+    await registry.start()
+    app.state.llm_registry = registry
+    try:
+        yield
+    finally:
+        await registry.close()
+
+
+app = FastAPI(title="Polling Survey API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -11,6 +26,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Estimate"],
 )
 
 # Include routers with proper prefixes
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, JSON, Float
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Date, ForeignKey, Boolean, JSON, Float, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -79,17 +79,28 @@ class Session(Base):
     current_question_index = Column(Integer, default=0)
     status = Column(String, default="in_progress")
     summary = Column(Text, nullable=True)  # ADD THIS LINE
+    cost_micro_usd = Column(BigInteger, nullable=False, default=0, server_default="0")  # running LLM cost ledger
+    load_shed = Column(JSON, nullable=True)  # shed decisions under load, e.g. {"skip_summary": 2, "no_probe": 1}
     
     # ... relationships ...
     survey_version = relationship("SurveyVersion", back_populates="sessions")
     responses = relationship("Response", back_populates="session", cascade="all, delete-orphan")
     conversation_history = relationship("ConversationTurn", back_populates="session", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        # Keyset pagination in the admin session list
+        Index("ix_sessions_started_at_id", "started_at", "id"),
+        Index("ix_sessions_status_started_at_id", "status", "started_at", "id"),
+        # Change feed watermarks
+        Index("ix_sessions_completed_at_id", "completed_at", "id"),
+    )
 
 class ConversationTurn(Base):
     __tablename__ = "conversation_turns"
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), nullable=True)  # Set on every new turn; backfilled by migration 011
     parent_message_id = Column(UUID(as_uuid=True), nullable=True)  # ADD THIS LINE
     respondent_id = Column(String, nullable=False, index=True)
     speaker = Column(String, nullable=False)
@@ -97,6 +108,12 @@ class ConversationTurn(Base):
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
     session = relationship("Session", back_populates="conversation_history")
+    
+    __table_args__ = (
+        Index("ix_conversation_turns_timestamp_id", "timestamp", "id"),
+        Index("ix_conversation_turns_session_question_id", "session_id", "question_id", "id"),
+    )
+
 class Response(Base):
     """Individual question response"""
     __tablename__ = "responses"
@@ -106,10 +123,15 @@ class Response(Base):
     question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
     respondent_id = Column(String, nullable=False, index=True)
     answer = Column(Text, nullable=False)
+    selected_option_id = Column(String, nullable=True)  # Chosen option of a single-choice answer (added by migration 012)
     answered_at = Column(DateTime(timezone=True), server_default=func.now())
     
     session = relationship("Session", back_populates="responses")
     question = relationship("Question", back_populates="responses")
+    
+    __table_args__ = (
+        Index("ix_responses_answered_at_id", "answered_at", "id"),
+    )
 
 
 class SessionMessage(Base):
@@ -126,6 +148,10 @@ class SessionMessage(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     session = relationship("Session", foreign_keys=[session_id])
+    
+    __table_args__ = (
+        Index("ix_session_messages_session_id", "session_id"),
+    )
 
 
 class SessionSummary(Base):
@@ -137,8 +163,13 @@ class SessionSummary(Base):
     summary_text = Column(Text, nullable=False)
     key_themes = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     session = relationship("Session", foreign_keys=[session_id])
+    
+    __table_args__ = (
+        Index("ix_session_summaries_updated_at_session_id", "updated_at", "session_id"),
+    )
 
 
 class ModelCall(Base):
@@ -146,9 +177,10 @@ class ModelCall(Base):
     __tablename__ = "model_calls"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=True)  # None outside a session (ingest-time precompute)
     agent_type = Column(String, nullable=True)  # ADD THIS
     model_name = Column(String, nullable=False)
+    route = Column(String, nullable=True)  # Model router's choice for follow-up decisions
     provider = Column(String, nullable=True)  # ADD THIS
     prompt_text = Column(Text, nullable=True)  # ADD THIS
     system_prompt = Column(Text, nullable=True)  # ADD THIS
@@ -158,8 +190,69 @@ class ModelCall(Base):
     finish_reason = Column(String, nullable=True)  # ADD THIS
     input_tokens = Column(Integer)
     output_tokens = Column(Integer)
+    cache_creation_input_tokens = Column(Integer, nullable=True)  # Prompt cache writes
+    cache_read_input_tokens = Column(Integer, nullable=True)  # Prompt cache hits
     latency_ms = Column(Integer, nullable=True)  # ADD THIS
-    cost_usd = Column(Integer)
+    cost_usd = Column(Integer)  # cents (rounded) - use cost_micro_usd
+    cost_micro_usd = Column(BigInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    session = relationship("Session", foreign_keys=[session_id])
\ No newline at end of file
+    session = relationship("Session", foreign_keys=[session_id])
+    
+    __table_args__ = (
+        Index("ix_model_calls_created_at_id", "created_at", "id"),
+    )
+
+class LLMDailySpend(Base):
+    """Global LLM spend per UTC day, updated with every ModelCall insert"""
+    __tablename__ = "llm_daily_spend"
+    
+    day = Column(Date, primary_key=True)
+    cost_micro_usd = Column(BigInteger, nullable=False, default=0)
+    call_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class SummaryJob(Base):
+    """Queued session summary update, drained by the in-process summary workers"""
+    __tablename__ = "summary_jobs"
+    __table_args__ = (
+        Index("ix_summary_jobs_status_id", "status", "id"),
+        Index("ix_summary_jobs_session_status", "session_id", "status"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("sessions.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False, default="pending")  # 'deferred', 'pending', 'running', 'done', 'failed'
+    exchange = Column(JSON, nullable=False)  # question_text, user_answer, followup_questions, followup_answers
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    
+    session = relationship("Session", foreign_keys=[session_id])
+
+
+class FollowUpDecision(Base):
+    """Persistent tier of the follow-up decision cache, keyed by a hash of the prompt inputs"""
+    __tablename__ = "followup_decisions"
+    
+    cache_key = Column(String(64), primary_key=True)  # sha256 hex
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), nullable=False, index=True)
+    decision = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class PrecomputedFollowUp(Base):
+    """First-probe follow-up decision generated at ingest for one single-choice option"""
+    __tablename__ = "precomputed_followups"
+    
+    option_id = Column(UUID(as_uuid=True), ForeignKey("question_options.id", ondelete="CASCADE"), primary_key=True)
+    survey_version_id = Column(UUID(as_uuid=True), ForeignKey("survey_versions.id", ondelete="CASCADE"), nullable=False, index=True)
+    question_id = Column(UUID(as_uuid=True), ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    decision = Column(JSON, nullable=False)
+    prompt_version = Column(String, nullable=False)  # FOLLOWUP_PROMPT_VERSION it was generated with
+    latency_ms = Column(Integer, nullable=True)  # what serving it live would have taken
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
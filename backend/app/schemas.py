@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from uuid import UUID
@@ -23,14 +23,28 @@ class OptionDefinition(BaseModel):
     score: Optional[int] = None
 
 
+class ProbingPolicyDefinition(BaseModel):
+    """Per-question follow-up policy (compiled by app.services.probing_policy)"""
+    probe: bool = True  # False: never ask follow-ups on this question
+    max_probes: Optional[int] = Field(default=None, ge=0)  # None = MAX_FOLLOWUP_PROBES
+    model_tier: Optional[str] = None  # Key of FOLLOWUP_MODEL_TIERS
+    include_in_summary: bool = True
+    
+    # Unknown keys are typos (e.g. "max_probs"), not something to drop silently;
+    # protected_namespaces allows the model_tier field name
+    model_config = ConfigDict(extra="forbid", protected_namespaces=())
+
+
 class QuestionDefinition(BaseModel):
     """Survey question definition for ingestion"""
+    id: Optional[str] = None  # Stable key referenced by skip_logic.target_question
     type: str  # 'multiple_choice', 'text', 'scale', etc.
     prompt: str
     required: bool = True
     allow_prefer_not_to_answer: bool = False
     options: Optional[List[OptionDefinition]] = None
     skip_logic: Optional[SkipLogic] = None
+    probing: Optional[ProbingPolicyDefinition] = None
     metadata: Optional[Dict[str, Any]] = None
 
 
@@ -38,6 +52,8 @@ class SurveyMetadata(BaseModel):
     """Survey metadata for ingestion"""
     name: str
     description: Optional[str] = None
+    summary_strategy: str = "per_answer"  # 'per_answer', 'every_n', 'on_completion'
+    summary_every_n: int = Field(default=3, ge=1)
 
 
 class SurveyDefinition(BaseModel):
@@ -187,6 +203,7 @@ class SessionDetail(BaseModel):
     llm_calls_count: int
     total_tokens: int
     total_cost_usd: float
+    load_shed: Optional[Dict[str, int]] = None
 
 
 # ============================================================================
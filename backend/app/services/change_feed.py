@@ -0,0 +1,123 @@
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import base64
+import json
+from sqlalchemy import select, tuple_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    Session as SessionModel,
+    Response,
+    ConversationTurn,
+    SessionSummary,
+    ModelCall
+)
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class WatermarkError(ValueError):
+    """Malformed change feed watermark token."""
+
+
+@dataclass(frozen=True)
+class Feed:
+    model: Any
+    changed_at: Any  # monotonic-ish change timestamp column
+    key: Any  # tie-breaker, unique within the table
+    parse_key: Any  # watermark JSON value -> key value
+
+
+# Each feed is read with a range scan on its (changed_at, key) index.
+FEEDS: Dict[str, Feed] = {
+    "sessions": Feed(SessionModel, SessionModel.completed_at, SessionModel.id, int),
+    "responses": Feed(Response, Response.answered_at, Response.id, int),
+    "conversation_turns": Feed(ConversationTurn, ConversationTurn.timestamp, ConversationTurn.id, int),
+    "session_summaries": Feed(SessionSummary, SessionSummary.updated_at, SessionSummary.session_id, int),
+    "model_calls": Feed(ModelCall, ModelCall.created_at, ModelCall.id, UUID),
+}
+
+Watermark = Dict[str, Tuple[datetime, Any]]
+
+
+def encode_watermark(watermark: Watermark) -> str:
+    raw = json.dumps({
+        name: [changed_at.isoformat(), str(key)]
+        for name, (changed_at, key) in watermark.items()
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_watermark(token: Optional[str]) -> Watermark:
+    """Decode a watermark token; an empty token starts from the beginning."""
+    if not token:
+        return {}
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return {
+            name: (datetime.fromisoformat(changed_at), FEEDS[name].parse_key(key))
+            for name, (changed_at, key) in raw.items()
+            if name in FEEDS
+        }
+    except (ValueError, TypeError, AttributeError):
+        raise WatermarkError("Invalid watermark token")
+
+
+def read_changes(
+    db: Session,
+    watermark: Watermark,
+    entities: Optional[List[str]] = None,
+    limit: Optional[int] = None
+) -> Tuple[Dict[str, List[Dict[str, Any]]], Watermark, bool]:
+    """
+    Rows changed after the watermark, per entity, oldest first.
+
+    Returns (changes, new_watermark, has_more). Rows newer than
+    now - CHANGE_FEED_SAFETY_LAG_SECONDS are held back so a transaction
+    that commits late with an earlier timestamp isn't skipped.
+    """
+    limit = limit or settings.change_feed_page_size
+    upper = datetime.now(timezone.utc) - timedelta(seconds=settings.change_feed_safety_lag_seconds)
+
+    changes: Dict[str, List[Dict[str, Any]]] = {}
+    new_watermark: Watermark = dict(watermark)
+    has_more = False
+
+    for name in entities or list(FEEDS):
+        feed = FEEDS[name]
+        stmt = select(feed.model).where(
+            feed.changed_at.is_not(None),
+            feed.changed_at < upper
+        )
+        if name in watermark:
+            stmt = stmt.where(tuple_(feed.changed_at, feed.key) > tuple_(*watermark[name]))
+        stmt = stmt.order_by(feed.changed_at, feed.key).limit(limit)
+
+        rows = db.execute(stmt).scalars().all()
+        changes[name] = [_row_dict(row) for row in rows]
+        if rows:
+            last = rows[-1]
+            new_watermark[name] = (
+                getattr(last, feed.changed_at.key),
+                getattr(last, feed.key.key)
+            )
+        has_more = has_more or len(rows) == limit
+
+    db.expunge_all()
+    return changes, new_watermark, has_more
+
+
+def _row_dict(row) -> Dict[str, Any]:
+    data = {}
+    for column in row.__table__.columns:
+        value = getattr(row, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, UUID):
+            value = str(value)
+        data[column.name] = value
+    return data
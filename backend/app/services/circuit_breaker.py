@@ -0,0 +1,183 @@
+from typing import Dict, Any, Optional, Deque, Tuple
+from collections import deque
+import time
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """The model's circuit is open; the call was rejected without reaching the API."""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open breaker for one model.
+
+    Closed: outcomes go into a sliding time window; once it holds at least
+    `min_calls`, the circuit opens if the error rate or the slow-call rate
+    reaches its threshold. Open: every call is rejected for `open_seconds`.
+    Half-open: up to `probes` calls go through; if they all succeed quickly
+    the circuit closes, the first failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        failure_rate: float,
+        slow_call_rate: float,
+        slow_call_seconds: float,
+        min_calls: int,
+        window_seconds: float,
+        open_seconds: float,
+        probes: int
+    ):
+        self.model = model
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.probes = probes
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool, bool]] = deque()  # (time, failed, slow)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {}
+
+    def check(self):
+        """Raise CircuitOpenError if a call would be rejected right now (reserves nothing)."""
+        if self.state == OPEN and time.monotonic() - self.opened_at < self.open_seconds:
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {self.model}")
+
+    def before_call(self) -> bool:
+        """Admit one API attempt. Returns True if the attempt is a half-open probe."""
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit open for {self.model}")
+            self._transition(HALF_OPEN)
+
+        if self.state == HALF_OPEN:
+            if self._probes_in_flight >= self.probes:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit half-open for {self.model}, probes in flight")
+            self._probes_in_flight += 1
+            return True
+        return False
+
+    def on_result(self, probe: bool, failed: bool, latency_seconds: float):
+        """Record the outcome of an attempt admitted by before_call()."""
+        slow = latency_seconds >= self.slow_call_seconds
+
+        if probe:
+            if self.state != HALF_OPEN:
+                return
+            self._probes_in_flight -= 1
+            if failed or slow:
+                self._transition(OPEN)
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._transition(CLOSED)
+            return
+
+        if self.state != CLOSED:
+            return  # a call from before the circuit opened
+
+        now = time.monotonic()
+        self._outcomes.append((now, failed, slow))
+        self._prune(now)
+
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for _, f, _ in self._outcomes if f)
+        slow_calls = sum(1 for _, _, s in self._outcomes if s)
+        if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+            logger.error(
+                f"Opening circuit for {self.model}: {failures}/{calls} failed, "
+                f"{slow_calls}/{calls} slow in the last {self.window_seconds:.0f}s"
+            )
+            self._transition(OPEN)
+
+    def on_release(self, probe: bool):
+        """An admitted attempt ended without an outcome (e.g. a cancelled hedge)."""
+        if probe and self.state == HALF_OPEN:
+            self._probes_in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(sum(1 for _, f, _ in self._outcomes if f) / calls, 3) if calls else None,
+            "slow_call_rate": round(sum(1 for _, _, s in self._outcomes if s) / calls, 3) if calls else None,
+            "rejected": self.rejected,
+            "transitions": dict(self.transitions)
+        }
+
+    def _transition(self, state: str):
+        key = f"{self.state}->{state}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        logger.warning(f"Circuit for {self.model}: {key}")
+
+        self.state = state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+    def _prune(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+
+class CircuitBreakerRegistry:
+    """One breaker per model, created on first use."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> Optional[CircuitBreaker]:
+        """The model's breaker, or None when circuit breaking is disabled."""
+        if not self.enabled:
+            return None
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                model,
+                failure_rate=settings.llm_circuit_failure_rate,
+                slow_call_rate=settings.llm_circuit_slow_call_rate,
+                slow_call_seconds=settings.llm_circuit_slow_call_seconds,
+                min_calls=settings.llm_circuit_min_calls,
+                window_seconds=settings.llm_circuit_window_seconds,
+                open_seconds=settings.llm_circuit_open_seconds,
+                probes=settings.llm_circuit_half_open_probes
+            )
+            self._breakers[model] = breaker
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "models": {model: breaker.stats() for model, breaker in self._breakers.items()}
+        }
+
+
+circuit_breakers = CircuitBreakerRegistry(enabled=settings.llm_circuit_breaker_enabled)
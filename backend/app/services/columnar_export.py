@@ -0,0 +1,313 @@
+from typing import Dict, Any, List, Iterator, Optional, Callable
+from dataclasses import dataclass
+from uuid import UUID
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select, func, cast, String
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.config import settings
+from app.models import (
+    Session as SessionModel,
+    Response,
+    ConversationTurn,
+    SessionSummary,
+    ModelCall,
+    Question,
+    QuestionOption
+)
+from app.services.survey_cache import survey_cache
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FORMATS = {
+    # format -> (file extension, media type)
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrows", "application/vnd.apache.arrow.stream"),
+}
+
+# Low-cardinality text (question text, options, models, speakers...) is
+# dictionary-encoded so it loads as pandas categoricals / duckdb enums.
+DICT = pa.dictionary(pa.int32(), pa.string())
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+
+@dataclass(frozen=True)
+class TableExport:
+    query: Callable[[], Select]  # rows ordered by a stable key, labelled like the schema
+    schema: pa.Schema
+
+
+def _responses_query() -> Select:
+    return select(
+        Response.id,
+        Response.session_id,
+        Response.respondent_id,
+        cast(SessionModel.survey_version_id, String).label("survey_version_id"),
+        cast(Response.question_id, String).label("question_id"),
+        Question.position.label("question_position"),
+        Question.question_text,
+        Response.answer,
+        func.coalesce(QuestionOption.option_text, Response.answer).label("answer_text"),
+        Response.answered_at
+    ).join(
+        SessionModel, SessionModel.id == Response.session_id
+    ).join(
+        Question, Question.id == Response.question_id
+    ).outerjoin(
+        # Choice answers store the option id; resolve it to the option text
+        QuestionOption, cast(QuestionOption.id, String) == Response.answer
+    ).order_by(Response.id)
+
+
+def _conversation_turns_query() -> Select:
+    return select(
+        ConversationTurn.id,
+        ConversationTurn.session_id,
+        ConversationTurn.respondent_id,
+        ConversationTurn.speaker,
+        ConversationTurn.message_text,
+        ConversationTurn.timestamp
+    ).order_by(ConversationTurn.id)
+
+
+def _session_summaries_query() -> Select:
+    return select(
+        SessionSummary.session_id,
+        SessionSummary.summary_text,
+        SessionSummary.key_themes,
+        SessionSummary.created_at
+    ).order_by(SessionSummary.session_id)
+
+
+def _model_calls_query() -> Select:
+    return select(
+        cast(ModelCall.id, String).label("id"),
+        ModelCall.session_id,
+        ModelCall.agent_type,
+        ModelCall.model_name,
+        ModelCall.provider,
+        ModelCall.system_prompt,
+        ModelCall.prompt_text,
+        ModelCall.response_text,
+        ModelCall.finish_reason,
+        ModelCall.temperature,
+        ModelCall.max_tokens,
+        ModelCall.input_tokens,
+        ModelCall.output_tokens,
+        ModelCall.latency_ms,
+        ModelCall.cost_micro_usd,
+        ModelCall.created_at
+    ).order_by(ModelCall.created_at, ModelCall.id)
+
+
+TABLES: Dict[str, TableExport] = {
+    "responses": TableExport(_responses_query, pa.schema([
+        ("id", pa.int64()),
+        ("session_id", pa.int64()),
+        ("respondent_id", pa.string()),
+        ("survey_version_id", DICT),
+        ("question_id", DICT),
+        ("question_position", pa.int32()),
+        ("question_text", DICT),
+        ("answer", pa.string()),
+        ("answer_text", DICT),
+        ("answered_at", TIMESTAMP),
+    ])),
+    "conversation_turns": TableExport(_conversation_turns_query, pa.schema([
+        ("id", pa.int64()),
+        ("session_id", pa.int64()),
+        ("respondent_id", pa.string()),
+        ("speaker", DICT),
+        ("message_text", pa.string()),
+        ("timestamp", TIMESTAMP),
+    ])),
+    "session_summaries": TableExport(_session_summaries_query, pa.schema([
+        ("session_id", pa.int64()),
+        ("summary_text", pa.string()),
+        ("key_themes", pa.list_(pa.string())),
+        ("created_at", TIMESTAMP),
+    ])),
+    "model_calls": TableExport(_model_calls_query, pa.schema([
+        ("id", pa.string()),
+        ("session_id", pa.int64()),
+        ("agent_type", DICT),
+        ("model_name", DICT),
+        ("provider", DICT),
+        ("system_prompt", DICT),
+        ("prompt_text", pa.string()),
+        ("response_text", pa.string()),
+        ("finish_reason", DICT),
+        ("temperature", pa.float64()),
+        ("max_tokens", pa.int32()),
+        ("input_tokens", pa.int64()),
+        ("output_tokens", pa.int64()),
+        ("latency_ms", pa.int64()),
+        ("cost_micro_usd", pa.int64()),
+        ("created_at", TIMESTAMP),
+    ])),
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands the bytes written so far back to a generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_table_export(
+    db: Session,
+    table: str,
+    fmt: str = "parquet",
+    batch_size: Optional[int] = None,
+    row_group_rows: Optional[int] = None
+) -> Iterator[bytes]:
+    """Stream one table as Parquet or Arrow IPC bytes."""
+    spec = TABLES[table]
+    batches = _record_batches(db, spec.query(), spec.schema, batch_size)
+    return _write_batches(batches, spec.schema, fmt, row_group_rows)
+
+
+def iter_response_matrix(
+    db: Session,
+    version_id: UUID,
+    fmt: str = "parquet",
+    batch_size: Optional[int] = None,
+    row_group_rows: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Stream the respondent x question matrix for one survey version: one row
+    per session, one dictionary-encoded answer column per question (named by
+    the question's id in the survey JSON). A re-answered question keeps the
+    latest answer.
+    """
+    version = survey_cache.get_version(db, version_id)
+    columns = {
+        question.id: question.definition_id or f"q{question.position + 1}"
+        for question in version.questions
+    }
+    schema = pa.schema(
+        [("session_id", pa.int64()), ("respondent_id", pa.string()), ("status", DICT)]
+        + [(name, DICT) for name in columns.values()]
+    )
+
+    stmt = select(
+        Response.session_id,
+        SessionModel.respondent_id,
+        SessionModel.status,
+        Response.question_id,
+        Response.answer
+    ).join(
+        SessionModel, SessionModel.id == Response.session_id
+    ).where(
+        SessionModel.survey_version_id == version_id
+    ).order_by(Response.session_id, Response.id)
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        current: Optional[Dict[str, Any]] = None
+        result = db.execute(stmt.execution_options(yield_per=batch_size or settings.export_batch_size))
+        for partition in result.partitions():
+            for row in partition:
+                if current is None or current["session_id"] != row.session_id:
+                    if current is not None:
+                        yield current
+                    current = {"session_id": row.session_id, "respondent_id": row.respondent_id, "status": row.status}
+                column = columns.get(row.question_id)
+                if column:
+                    question = version.questions_by_id[row.question_id]
+                    current[column] = question.option_text(row.answer) or row.answer
+        if current is not None:
+            yield current
+
+    batches = _batched(rows(), schema, batch_size or settings.export_batch_size)
+    return _write_batches(batches, schema, fmt, row_group_rows)
+
+
+def _record_batches(
+    db: Session,
+    stmt: Select,
+    schema: pa.Schema,
+    batch_size: Optional[int]
+) -> Iterator[pa.RecordBatch]:
+    """Read a query through a server-side cursor, one RecordBatch per fetch."""
+    result = db.execute(stmt.execution_options(yield_per=batch_size or settings.export_batch_size))
+    for partition in result.partitions():
+        yield pa.RecordBatch.from_pylist([dict(row._mapping) for row in partition], schema=schema)
+
+
+def _batched(rows: Iterator[Dict[str, Any]], schema: pa.Schema, batch_size: int) -> Iterator[pa.RecordBatch]:
+    pending: List[Dict[str, Any]] = []
+    for row in rows:
+        pending.append(row)
+        if len(pending) >= batch_size:
+            yield pa.RecordBatch.from_pylist(pending, schema=schema)
+            pending = []
+    if pending:
+        yield pa.RecordBatch.from_pylist(pending, schema=schema)
+
+
+def _write_batches(
+    batches: Iterator[pa.RecordBatch],
+    schema: pa.Schema,
+    fmt: str,
+    row_group_rows: Optional[int]
+) -> Iterator[bytes]:
+    """
+    Encode record batches as they arrive. Parquet buffers at most one row
+    group (row_group_rows) before writing it out; Arrow IPC streams every
+    batch straight through.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    row_group_rows = row_group_rows or settings.export_row_group_rows
+
+    sink = _ChunkSink()
+    if fmt == "arrow":
+        # The stream format (unlike the file format) allows each batch its own dictionaries
+        writer = pa.ipc.new_stream(sink, schema)
+        for batch in batches:
+            writer.write_batch(batch)
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+        return
+
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    pending: List[pa.RecordBatch] = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        if pending_rows >= row_group_rows:
+            writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=row_group_rows)
+            pending, pending_rows = [], 0
+            yield sink.drain()
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending, schema), row_group_size=row_group_rows)
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,226 @@
+from typing import Dict, Any, List, Optional
+from datetime import date, datetime, timezone
+import asyncio
+import threading
+import time
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import Session as SessionModel, LLMDailySpend
+from app.services.session_state import session_state_store
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MICRO = 1_000_000
+
+# Session.info key for session ledger updates waiting for the caller's commit
+PENDING_SESSION_SPEND = "pending_session_spend"
+
+
+class BudgetExceededError(Exception):
+    """An LLM call would take a session (or today's global spend) over budget."""
+
+
+def to_micro(usd: float) -> int:
+    return int(round(usd * MICRO))
+
+
+class DailySpendCounter:
+    """
+    In-process view of today's global LLM spend. Seeded from (and
+    periodically re-read from) the llm_daily_spend row so spend by other
+    processes is picked up; local calls are added immediately. Local spend
+    is buffered and written to the row by flush() in its own short
+    transaction (every DAILY_SPEND_FLUSH_SECONDS while started, and on
+    stop), so answer transactions never lock that one shared row.
+    """
+
+    def __init__(self, refresh_seconds: float, flush_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._day: Optional[date] = None
+        self._cost_micro_usd = 0
+        self._loaded_at = 0.0
+        self._unflushed: Dict[date, List[int]] = {}  # day -> [cost_micro_usd, call_count] not yet written
+        self._flusher: Optional[asyncio.Task] = None
+        self.rejections = 0
+        self.flush_failures = 0
+
+    async def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_periodically(), name="daily-spend-flush")
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        self.flush()
+
+    def current(self, db: Session) -> int:
+        """Today's spend in micro-dollars (at most one single-row read per refresh interval)."""
+        today = _today()
+        with self._lock:
+            fresh = self._day == today and time.monotonic() - self._loaded_at < self.refresh_seconds
+            if fresh:
+                return self._cost_micro_usd
+
+        stored = db.execute(
+            select(LLMDailySpend.cost_micro_usd).where(LLMDailySpend.day == today)
+        ).scalar() or 0
+
+        with self._lock:
+            # The row has every process's flushed spend; ours since the last flush is still buffered
+            self._cost_micro_usd = stored + self._unflushed.get(today, [0, 0])[0]
+            self._day = today
+            self._loaded_at = time.monotonic()
+            return self._cost_micro_usd
+
+    def add(self, cost_micro_usd: int):
+        today = _today()
+        with self._lock:
+            if self._day != today:
+                self._day = today
+                self._cost_micro_usd = 0
+                self._loaded_at = 0.0  # re-read on the next check
+            self._cost_micro_usd += cost_micro_usd
+            unflushed = self._unflushed.setdefault(today, [0, 0])
+            unflushed[0] += cost_micro_usd
+            unflushed[1] += 1
+
+    def flush(self) -> int:
+        """
+        Add buffered spend to llm_daily_spend with one upsert per day, in a
+        transaction of its own that commits straight away. Returns the
+        number of calls written; on failure the spend stays buffered.
+        """
+        with self._lock:
+            batch = {day: tuple(totals) for day, totals in self._unflushed.items() if totals[1]}
+        if not batch:
+            return 0
+
+        db = SessionLocal()
+        try:
+            insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+            for day, (cost_micro_usd, call_count) in batch.items():
+                stmt = insert(LLMDailySpend).values(day=day, cost_micro_usd=cost_micro_usd, call_count=call_count)
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=[LLMDailySpend.day],
+                    set_={
+                        "cost_micro_usd": LLMDailySpend.cost_micro_usd + cost_micro_usd,
+                        "call_count": LLMDailySpend.call_count + call_count,
+                        "updated_at": datetime.now(timezone.utc)
+                    }
+                ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.flush_failures += 1
+            logger.error(f"Failed to flush daily LLM spend, keeping it buffered: {e}")
+            return 0
+        finally:
+            db.close()
+
+        with self._lock:
+            for day, (cost_micro_usd, call_count) in batch.items():
+                unflushed = self._unflushed[day]
+                unflushed[0] -= cost_micro_usd
+                unflushed[1] -= call_count
+                if not unflushed[1] and day != self._day:
+                    del self._unflushed[day]
+        return sum(call_count for _, call_count in batch.values())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "day": self._day.isoformat() if self._day else None,
+                "spend_usd": round(self._cost_micro_usd / MICRO, 6),
+                "limit_usd": settings.max_daily_cost_usd or None,
+                "rejections": self.rejections,
+                "unflushed_calls": sum(call_count for _, call_count in self._unflushed.values()),
+                "flush_failures": self.flush_failures
+            }
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            self.flush()
+
+
+def check_budget(db: Session, session_id: Optional[int], estimate_micro_usd: int):
+    """
+    Raise BudgetExceededError if a call estimated at `estimate_micro_usd`
+    would exceed the session or daily budget. Reads the running totals
+    (session state cache or one sessions row; daily counter), never an
+    aggregate over model_calls.
+    """
+    if session_id is not None:
+        spent = session_state_store.cost_for(session_id)
+        if spent is None:
+            spent = db.execute(
+                select(SessionModel.cost_micro_usd).where(SessionModel.id == session_id)
+            ).scalar() or 0
+
+        limit = to_micro(settings.max_cost_per_session_usd)
+        if spent + estimate_micro_usd > limit:
+            daily_spend.rejections += 1
+            logger.error(
+                f"Session {session_id} over cost limit: spent ${spent / MICRO:.6f} "
+                f"+ estimated ${estimate_micro_usd / MICRO:.6f} > ${limit / MICRO:.4f}"
+            )
+            raise BudgetExceededError(f"Session cost limit exceeded: ${spent / MICRO:.4f}")
+
+    if settings.max_daily_cost_usd:
+        spent_today = daily_spend.current(db)
+        limit = to_micro(settings.max_daily_cost_usd)
+        if spent_today + estimate_micro_usd > limit:
+            daily_spend.rejections += 1
+            logger.error(f"Daily LLM budget exhausted: ${spent_today / MICRO:.4f} of ${limit / MICRO:.4f}")
+            raise BudgetExceededError(f"Daily cost limit exceeded: ${spent_today / MICRO:.4f}")
+
+
+def record_spend(db: Session, session_id: Optional[int], cost_micro_usd: int):
+    """
+    Add a call's cost to the session ledger and to today's global counter.
+    The sessions row is updated by the caller's commit, like the ModelCall
+    insert it goes with, so no write (and no row lock) is held while the
+    caller goes on awaiting; today's counter buffers it in process until
+    its next flush.
+    """
+    if session_id is not None:
+        pending = db.info.setdefault(PENDING_SESSION_SPEND, {})
+        pending[session_id] = pending.get(session_id, 0) + cost_micro_usd
+        session_state_store.add_cost(session_id, cost_micro_usd)
+
+    daily_spend.add(cost_micro_usd)
+
+
+@event.listens_for(SessionLocal, "before_commit")
+def _write_session_spend(db: Session):
+    for session_id, cost_micro_usd in db.info.pop(PENDING_SESSION_SPEND, {}).items():
+        db.execute(
+            update(SessionModel)
+            .where(SessionModel.id == session_id)
+            .values(cost_micro_usd=SessionModel.cost_micro_usd + cost_micro_usd)
+            .execution_options(synchronize_session=False)
+        )
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _drop_session_spend(db: Session):
+    db.info.pop(PENDING_SESSION_SPEND, None)
+
+
+def _today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+daily_spend = DailySpendCounter(
+    refresh_seconds=settings.daily_spend_refresh_seconds,
+    flush_seconds=settings.daily_spend_flush_seconds
+)
@@ -0,0 +1,204 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+import hashlib
+import json
+import threading
+import time
+from sqlalchemy import select, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import FollowUpDecision
+from app.services.skip_logic import normalize_answer
+from app.services.survey_cache import CachedQuestion, CachedSurveyVersion
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Survey definition flag (question `metadata`, or the `survey` block as a
+# default for every question) that turns decision reuse on or off
+CACHE_FLAG = "cache_followups"
+
+
+def reuse_allowed(version: CachedSurveyVersion, question: CachedQuestion) -> bool:
+    """Whether one decision may serve many respondents (question flag, then survey flag)."""
+    flag = (question.metadata or {}).get(CACHE_FLAG)
+    if flag is None:
+        flag = version.survey_meta.get(CACHE_FLAG, True)
+    return bool(flag)
+
+
+class FollowUpDecisionCache:
+    """
+    Reuses follow-up decisions across respondents who reach the same point
+    of a question the same way: same question, same normalized answer and
+    follow-up history, same probe count, same prompt version. For
+    single-choice questions without free text that is often every
+    respondent who picked a given option.
+
+    Entries live in an in-process LRU (bounded by max_entries, expiring
+    after ttl_seconds). With `persistent`, decisions are also written to the
+    followup_decisions table so other workers and restarts share them.
+    Hits and misses are counted per question.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, ttl_seconds: float, persistent: bool):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._questions: Dict[str, List[int]] = {}  # question id -> [hits, misses]
+        self.persistent_hits = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def enabled_for(self, version: CachedSurveyVersion, question: CachedQuestion) -> bool:
+        return self.enabled and reuse_allowed(version, question)
+
+    @staticmethod
+    def key(
+        question_id: str,
+        user_answer: str,
+        selected_option_text: Optional[str],
+        conversation_history: List[Dict[str, str]],
+        probe_count: int,
+        prompt_version: str
+    ) -> str:
+        """Hash of everything that goes into the follow-up prompt, normalized."""
+        material = json.dumps([
+            prompt_version,
+            question_id,
+            normalize_answer(user_answer),
+            normalize_answer(selected_option_text) if selected_option_text else None,
+            [[turn["role"], normalize_answer(turn["content"])] for turn in conversation_history],
+            probe_count
+        ], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, db: Optional[Session], key: str, question_id: str) -> Optional[Dict[str, Any]]:
+        """A cached decision (a copy), or None. Counts the lookup for the question."""
+        decision = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.monotonic() < entry[1]:
+                    self._entries.move_to_end(key)
+                    decision = dict(entry[0])
+                else:
+                    del self._entries[key]
+                    self.expired += 1
+
+        if decision is None and self.persistent and db is not None:
+            decision = self._load(key)
+            if decision is not None:
+                with self._lock:
+                    self.persistent_hits += 1
+                self._remember(key, decision)
+
+        with self._lock:
+            counts = self._questions.setdefault(question_id, [0, 0])
+            counts[0 if decision is not None else 1] += 1
+        return decision
+
+    def put(self, db: Optional[Session], key: str, question_id: str, decision: Dict[str, Any]):
+        """
+        Cache a decision. The persistent write is executed in the caller's
+        transaction and committed with the answer.
+        """
+        self._remember(key, decision)
+        if self.persistent and db is not None:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+            insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+            stmt = insert(FollowUpDecision).values(
+                cache_key=key,
+                question_id=UUID(question_id),
+                decision=decision,
+                expires_at=expires_at
+            )
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=[FollowUpDecision.cache_key],
+                set_={"decision": stmt.excluded.decision, "expires_at": stmt.excluded.expires_at}
+            ))
+
+    def purge_expired(self):
+        """Delete expired rows from the persistent tier (run at startup)."""
+        if not self.persistent:
+            return
+        db = SessionLocal()
+        try:
+            count = db.execute(
+                delete(FollowUpDecision).where(FollowUpDecision.expires_at < datetime.now(timezone.utc))
+            ).rowcount
+            db.commit()
+            if count:
+                logger.info(f"Purged {count} expired follow-up decisions")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to purge expired follow-up decisions: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(h for h, _ in self._questions.values())
+            lookups = hits + sum(m for _, m in self._questions.values())
+            return {
+                "enabled": self.enabled,
+                "persistent": self.persistent,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": hits,
+                "misses": lookups - hits,
+                "hit_rate": round(hits / lookups, 4) if lookups else None,
+                "persistent_hits": self.persistent_hits,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "questions": {
+                    question_id: {
+                        "hits": h,
+                        "misses": m,
+                        "hit_rate": round(h / (h + m), 4)
+                    }
+                    for question_id, (h, m) in self._questions.items()
+                }
+            }
+
+    def _remember(self, key: str, decision: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (dict(decision), time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read from the persistent tier in a short session of its own, so the
+        caller's transaction is neither committed nor kept open through the
+        LLM call on a miss.
+        """
+        db = SessionLocal()
+        try:
+            decision = db.execute(
+                select(FollowUpDecision.decision).where(
+                    FollowUpDecision.cache_key == key,
+                    FollowUpDecision.expires_at > datetime.now(timezone.utc)
+                )
+            ).scalar()
+        finally:
+            db.close()
+        return dict(decision) if decision is not None else None
+
+
+decision_cache = FollowUpDecisionCache(
+    enabled=settings.followup_cache_enabled,
+    max_entries=settings.followup_cache_max_entries,
+    ttl_seconds=settings.followup_cache_ttl_seconds,
+    persistent=settings.followup_cache_persistent
+)
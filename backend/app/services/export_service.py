@@ -0,0 +1,103 @@
+from typing import Dict, Any, List, Iterator, Optional
+from collections import defaultdict
+from uuid import UUID
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import (
+    Session as SessionModel,
+    SessionMessage,
+    SessionSummary,
+    Survey,
+    SurveyVersion
+)
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def survey_names(db: Session) -> Dict[UUID, str]:
+    """Survey name for every version (a handful of rows, loaded once per export)."""
+    rows = db.execute(
+        select(SurveyVersion.id, Survey.name).join(Survey, Survey.id == SurveyVersion.survey_id)
+    ).all()
+    return {row.id: row.name for row in rows}
+
+
+def iter_session_exports(
+    db: Session,
+    include_messages: bool = True,
+    batch_size: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield one export record per session, ordered by id.
+
+    Sessions are read through a server-side cursor (yield_per), and the
+    messages, summaries and counts for each batch are loaded with one
+    IN query each, so memory is bounded by the batch size rather than
+    the table size.
+    """
+    batch_size = batch_size or settings.export_batch_size
+    names = survey_names(db)
+
+    result = db.execute(
+        select(
+            SessionModel.id,
+            SessionModel.survey_version_id,
+            SessionModel.status,
+            SessionModel.started_at,
+            SessionModel.completed_at,
+            SessionModel.load_shed
+        ).order_by(SessionModel.id).execution_options(yield_per=batch_size)
+    )
+
+    for partition in result.partitions():
+        session_ids = [row.id for row in partition]
+
+        summaries = {
+            summary.session_id: summary
+            for summary in db.query(SessionSummary).filter(
+                SessionSummary.session_id.in_(session_ids)
+            )
+        }
+
+        messages: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        message_counts: Dict[int, int] = {}
+        if include_messages:
+            for msg in db.query(SessionMessage).filter(
+                SessionMessage.session_id.in_(session_ids)
+            ).order_by(SessionMessage.session_id, SessionMessage.sequence_number):
+                messages[msg.session_id].append({
+                    "sequence": msg.sequence_number,
+                    "type": msg.message_type,
+                    "text": msg.message_text,
+                    "is_follow_up": msg.is_follow_up
+                })
+        else:
+            message_counts = dict(db.execute(
+                select(SessionMessage.session_id, func.count()).where(
+                    SessionMessage.session_id.in_(session_ids)
+                ).group_by(SessionMessage.session_id)
+            ).all())
+
+        for row in partition:
+            summary = summaries.get(row.id)
+            record = {
+                "session_id": str(row.id),
+                "survey_name": names.get(row.survey_version_id),
+                "status": row.status,
+                "started_at": row.started_at.isoformat() if row.started_at else None,
+                "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+                "summary": summary.summary_text if summary else None,
+                "key_themes": summary.key_themes if summary and summary.key_themes else [],
+                "load_shed": row.load_shed or {}
+            }
+            if include_messages:
+                record["messages"] = messages.get(row.id, [])
+            else:
+                record["message_count"] = message_counts.get(row.id, 0)
+            yield record
+
+        # Drop the batch's ORM objects before fetching the next one
+        db.expunge_all()
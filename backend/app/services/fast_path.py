@@ -0,0 +1,322 @@
+from typing import Dict, Any, List, Optional, Iterable, Iterator, Tuple
+from dataclasses import dataclass, field
+import json
+import math
+import os
+import random
+import re
+import threading
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ModelCall
+from app.agents.prompts import parse_followup_prompt
+from app.services.skip_logic import normalize_answer
+from app.utils.json_stream import IncrementalJSONParser
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MOVE_ON = "move_on"
+ASK_FOLLOWUP = "ask_followup"
+
+# Answers that carry no opinion to probe
+NON_ANSWERS = frozenset({
+    "idk", "i don't know", "i dont know", "don't know", "dont know", "not sure", "no idea",
+    "no comment", "no opinion", "n/a", "na", "none", "nothing", "pass", "skip", "no", "nope"
+})
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+@dataclass(frozen=True)
+class DecisionInput:
+    """What the follow-up decision is made from (the render_followup_prompt arguments)."""
+    question_type: str
+    user_answer: str
+    selected_option_text: Optional[str] = None
+    conversation_history: Tuple[Tuple[str, str], ...] = ()  # (role, content)
+    probe_count: int = 0
+
+    @classmethod
+    def from_prompt_args(cls, args: Dict[str, Any]) -> "DecisionInput":
+        return cls(
+            question_type=args["question_type"],
+            user_answer=args["user_answer"] or "",
+            selected_option_text=args.get("selected_option_text"),
+            conversation_history=tuple((t["role"], t["content"]) for t in args.get("conversation_history") or ()),
+            probe_count=args.get("probe_count", 0)
+        )
+
+    @property
+    def words(self) -> List[str]:
+        return _WORD.findall(self.user_answer.lower())
+
+
+@dataclass(frozen=True)
+class FastPathDecision:
+    action: str
+    confidence: float  # 0..1
+    source: str  # "rule:<name>" or "model"
+    followup_question: Optional[str] = None
+
+
+class PreDecisionStage:
+    """One stage of the fast path: returns a decision, or None to pass the answer on."""
+    name = "stage"
+
+    def decide(self, inp: DecisionInput) -> Optional[FastPathDecision]:
+        raise NotImplementedError
+
+
+class RuleStage(PreDecisionStage):
+    """Hand-written rules for answers whose decision is obvious from the text alone."""
+    name = "rules"
+
+    def __init__(self, long_answer_words: int):
+        self.long_answer_words = long_answer_words
+
+    def decide(self, inp: DecisionInput) -> Optional[FastPathDecision]:
+        answer = normalize_answer(inp.user_answer).strip(" .!")
+
+        # Checked first: an option such as "None" or "Not sure" is still an
+        # answer, and whether to probe a bare option is the LLM's call
+        if (inp.question_type == "single_choice" and inp.selected_option_text
+                and answer == normalize_answer(inp.selected_option_text).strip(" .!")):
+            return None
+
+        if not answer or answer in NON_ANSWERS:
+            return FastPathDecision(MOVE_ON, 0.95, "rule:non_answer")
+
+        # A follow-up answer is already the last turn of the history; compare with earlier ones
+        history = inp.conversation_history
+        if history and history[-1] == ("user", inp.user_answer):
+            history = history[:-1]
+        previous = [content for role, content in history if role == "user"]
+        if previous and _overlap(answer, normalize_answer(previous[-1])) >= 0.8:
+            return FastPathDecision(MOVE_ON, 0.9, "rule:repetition")
+
+        if len(inp.words) >= self.long_answer_words:
+            return FastPathDecision(MOVE_ON, 0.85, "rule:long_answer")
+
+        return None
+
+
+class LogisticModel:
+    """
+    Binary logistic regression over sparse named features, trained with
+    plain SGD. Small enough to train and score without numeric libraries;
+    predicts the probability that the LLM would ask a follow-up.
+    """
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, bias: float = 0.0):
+        self.weights = weights or {}
+        self.bias = bias
+
+    def predict(self, features: Dict[str, float]) -> float:
+        z = self.bias + sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+        return 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+
+    @classmethod
+    def train(
+        cls,
+        examples: List[Tuple[Dict[str, float], int]],
+        epochs: int = 20,
+        learning_rate: float = 0.1,
+        l2: float = 1e-4,
+        min_feature_count: int = 2,
+        seed: int = 0
+    ) -> "LogisticModel":
+        counts: Dict[str, int] = {}
+        for features, _ in examples:
+            for name in features:
+                counts[name] = counts.get(name, 0) + 1
+        keep = {name for name, count in counts.items() if count >= min_feature_count}
+
+        model = cls()
+        rows = [({k: v for k, v in features.items() if k in keep}, label) for features, label in examples]
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(rows)
+            rate = learning_rate / (1 + epoch * 0.5)
+            for features, label in rows:
+                error = model.predict(features) - label
+                model.bias -= rate * error
+                for name, value in features.items():
+                    weight = model.weights.get(name, 0.0)
+                    model.weights[name] = weight - rate * (error * value + l2 * weight)
+        return model
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"bias": self.bias, "weights": self.weights}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogisticModel":
+        return cls(weights=dict(data["weights"]), bias=float(data["bias"]))
+
+
+def features(inp: DecisionInput) -> Dict[str, float]:
+    """Sparse features of a decision input for LogisticModel."""
+    words = inp.words
+    result = {f"w:{word}": 1.0 for word in set(words)}
+    result[f"len:{_length_bucket(len(words))}"] = 1.0
+    result[f"probe:{min(inp.probe_count, 3)}"] = 1.0
+    result[f"type:{inp.question_type}"] = 1.0
+    result[f"history:{min(len(inp.conversation_history), 4)}"] = 1.0
+    if inp.selected_option_text and normalize_answer(inp.user_answer) == normalize_answer(inp.selected_option_text):
+        result["option_only"] = 1.0
+    return result
+
+
+class ModelStage(PreDecisionStage):
+    """The trained local model; the classifier's threshold decides whether it is trusted."""
+    name = "model"
+
+    def __init__(self, model: LogisticModel):
+        self.model = model
+
+    def decide(self, inp: DecisionInput) -> Optional[FastPathDecision]:
+        p_ask = self.model.predict(features(inp))
+        if p_ask >= 0.5:
+            return FastPathDecision(ASK_FOLLOWUP, p_ask, "model")
+        return FastPathDecision(MOVE_ON, 1.0 - p_ask, "model")
+
+
+@dataclass
+class FastPathClassifier:
+    """
+    Pre-decision stages run in order ahead of the LLM. The first decision
+    at or above `min_confidence` resolves the answer locally. An
+    ask_followup also needs the question to ask, so it is only taken when
+    the stage supplies one (the model stage doesn't); everything else
+    escalates to the LLM.
+    """
+    stages: List[PreDecisionStage]
+    min_confidence: float
+    enabled: bool = True
+    counts: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def decide(self, inp: DecisionInput) -> Tuple[Optional[FastPathDecision], Optional[float]]:
+        """
+        (decision, confidence): the decision when the answer is resolved
+        locally, else None; and the confidence of the first stage with an
+        opinion, threshold or not (a routing signal for answers that
+        escalate). (None, None) while disabled.
+        """
+        if not self.enabled:
+            return None, None
+        decision, confidence = self.classify(inp)
+        self._count(decision.source if decision else "escalated")
+        return decision, confidence
+
+    def classify(self, inp: DecisionInput) -> Tuple[Optional[FastPathDecision], Optional[float]]:
+        """decide() without the counters (used by offline evaluation)."""
+        confidence = None
+        for stage in self.stages:
+            decision = stage.decide(inp)
+            if decision is None:
+                continue
+            if confidence is None:
+                confidence = decision.confidence
+            if decision.confidence < self.min_confidence:
+                continue
+            if decision.action == ASK_FOLLOWUP and not decision.followup_question:
+                return None, confidence
+            return decision, confidence
+        return None, confidence
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self.counts.values())
+            escalated = self.counts.get("escalated", 0)
+            return {
+                "enabled": self.enabled,
+                "stages": [stage.name for stage in self.stages],
+                "min_confidence": self.min_confidence,
+                "decisions": dict(self.counts),
+                "llm_calls_avoided_rate": round((total - escalated) / total, 4) if total else None
+            }
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def build_classifier(
+    enabled: bool = True,
+    model_path: Optional[str] = None,
+    min_confidence: Optional[float] = None
+) -> FastPathClassifier:
+    """Rules, plus the trained model if one is saved at `model_path`."""
+    stages: List[PreDecisionStage] = [RuleStage(settings.fast_path_long_answer_words)]
+    model = load_model(model_path if model_path is not None else settings.fast_path_model_path)
+    if model is not None:
+        stages.append(ModelStage(model))
+    return FastPathClassifier(
+        stages=stages,
+        min_confidence=settings.fast_path_min_confidence if min_confidence is None else min_confidence,
+        enabled=enabled
+    )
+
+
+def load_model(path: str) -> Optional[LogisticModel]:
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return LogisticModel.from_dict(json.load(f))
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"Ignoring fast-path model at {path}: {e}")
+        return None
+
+
+def save_model(model: LogisticModel, path: str):
+    with open(path, "w") as f:
+        json.dump(model.to_dict(), f)
+
+
+def logged_decisions(db: Session, batch_size: int = 1000) -> Iterator[Tuple[DecisionInput, str]]:
+    """
+    (input, action) pairs from logged follow-up ModelCalls, oldest first.
+    Calls whose prompt or response can't be parsed (errors, deadlines,
+    streams closed before the action) are skipped.
+    """
+    query = db.query(ModelCall.prompt_text, ModelCall.response_text).filter(
+        ModelCall.agent_type.in_(["follow_up", "follow_up_precompute"])
+    ).order_by(ModelCall.created_at, ModelCall.id).yield_per(batch_size)
+
+    for prompt_text, response_text in query:
+        args = parse_followup_prompt(prompt_text)
+        action = _logged_action(response_text)
+        if args is not None and action in (MOVE_ON, ASK_FOLLOWUP):
+            yield DecisionInput.from_prompt_args(args), action
+
+
+def training_examples(decisions: Iterable[Tuple[DecisionInput, str]]) -> List[Tuple[Dict[str, float], int]]:
+    return [(features(inp), 1 if action == ASK_FOLLOWUP else 0) for inp, action in decisions]
+
+
+def _logged_action(response_text: Optional[str]) -> Optional[str]:
+    # Early-terminated decisions are logged as a JSON prefix
+    parser = IncrementalJSONParser()
+    try:
+        parser.feed(response_text or "")
+    except json.JSONDecodeError:
+        return None
+    return parser.values.get("action")
+
+
+def _overlap(a: str, b: str) -> float:
+    """Share of the answer's words already in the previous answer."""
+    words_a, words_b = set(_WORD.findall(a)), set(_WORD.findall(b))
+    return len(words_a & words_b) / len(words_a) if words_a else 0.0
+
+
+def _length_bucket(count: int) -> str:
+    for limit in (0, 3, 9, 29, 79):
+        if count <= limit:
+            return f"<={limit}"
+    return ">79"
+
+
+fast_path = build_classifier(enabled=settings.fast_path_enabled)
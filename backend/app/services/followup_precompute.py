@@ -0,0 +1,247 @@
+from typing import Dict, Any, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import threading
+import time
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import PrecomputedFollowUp
+from app.agents.followup_agent import FollowUpAgent
+from app.agents.prompts import FOLLOWUP_PROMPT_VERSION
+from app.services.decision_cache import reuse_allowed
+from app.services.survey_cache import survey_cache, CachedSurveyVersion, CachedQuestion
+from app.services.skip_logic import normalize_answer
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Not an interactive priority class, so the rate governor treats it as batch
+PRECOMPUTE_AGENT_TYPE = "follow_up_precompute"
+
+
+def eligible_questions(version: CachedSurveyVersion) -> List[CachedQuestion]:
+    """Probed single-choice questions whose first probe may be shared by every respondent."""
+    return [
+        q for q in version.questions
+        if q.question_type == "single_choice" and q.options
+        and q.probing.allows_probe(0) and reuse_allowed(version, q)
+    ]
+
+
+class PrecomputedFollowUps:
+    """
+    Runtime view of precomputed_followups: first-probe decisions for
+    single-choice options, loaded per survey version on first use and
+    re-read every `refresh_seconds` so rows written by precompute runs in
+    another process (load_survey.py, precompute_followups.py) are picked
+    up. Rows generated with another prompt version are ignored.
+    """
+
+    def __init__(self, enabled: bool, refresh_seconds: float):
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[UUID, Tuple[Dict[str, Tuple[Dict[str, Any], Optional[int]]], float]] = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.missing = 0
+        self.latency_saved_ms = 0
+
+    def get(
+        self,
+        db: Session,
+        version: CachedSurveyVersion,
+        question: CachedQuestion,
+        option_id: Optional[str],
+        user_answer: Optional[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        The precomputed first-probe decision for an answer, or None. Only
+        answers that are exactly the chosen option qualify; any free text
+        changes the prompt and needs a live decision.
+        """
+        if not self.enabled or not option_id or question.question_type != "single_choice":
+            return None
+        option_text = question.option_text(option_id)
+        if option_text is None or normalize_answer(user_answer or "") != normalize_answer(option_text):
+            return None
+        if not reuse_allowed(version, question):
+            return None
+
+        entry = self._decisions(db, version.version_id).get(option_id)
+        with self._lock:
+            if entry is None:
+                self.missing += 1
+                return None
+            self.served += 1
+            self.latency_saved_ms += entry[1] or 0
+        return dict(entry[0])
+
+    def invalidate(self, version_id: UUID):
+        with self._lock:
+            self._versions.pop(version_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "versions_loaded": len(self._versions),
+                "served": self.served,
+                "missing": self.missing,
+                "latency_saved_ms": self.latency_saved_ms,
+                "avg_latency_saved_ms": round(self.latency_saved_ms / self.served) if self.served else None
+            }
+
+    def _decisions(self, db: Session, version_id: UUID) -> Dict[str, Tuple[Dict[str, Any], Optional[int]]]:
+        with self._lock:
+            entry = self._versions.get(version_id)
+            if entry is not None and time.monotonic() - entry[1] < self.refresh_seconds:
+                return entry[0]
+
+        rows = db.execute(
+            select(PrecomputedFollowUp.option_id, PrecomputedFollowUp.decision, PrecomputedFollowUp.latency_ms).where(
+                PrecomputedFollowUp.survey_version_id == version_id,
+                PrecomputedFollowUp.prompt_version == FOLLOWUP_PROMPT_VERSION
+            )
+        ).all()
+        decisions = {str(row.option_id): (row.decision, row.latency_ms) for row in rows}
+
+        with self._lock:
+            self._versions[version_id] = (decisions, time.monotonic())
+        return decisions
+
+
+async def precompute_version(
+    agent: FollowUpAgent,
+    version_id: UUID,
+    concurrency: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Generate and store the first-probe decision for every option of every
+    eligible question in a survey version, replacing earlier rows. Runs
+    `concurrency` workers; each call goes through the LLM client (rate
+    governor, circuit breaker, budgets, ModelCall logging) with no session.
+    Returns one report entry per option.
+    """
+    concurrency = concurrency or settings.followup_precompute_concurrency
+    db = SessionLocal()
+    try:
+        version = survey_cache.get_version(db, version_id)
+    finally:
+        db.close()
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for question in eligible_questions(version):
+        for option in question.options:
+            queue.put_nowait((queue.qsize(), question, option))
+    total = queue.qsize()
+    report: List[Dict[str, Any]] = [{} for _ in range(total)]  # in survey order
+
+    async def worker():
+        db = SessionLocal()
+        try:
+            while True:
+                try:
+                    index, question, option = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                entry = {
+                    "question_position": question.position,
+                    "option_id": str(option.id),
+                    "option_text": option.text
+                }
+                started = time.perf_counter()
+                try:
+                    decision = await agent.decide(
+                        question_text=question.question_text,
+                        question_type=question.question_type,
+                        user_answer=option.text,
+                        selected_option_text=option.text,
+                        conversation_history=[],
+                        probe_count=0,
+                        session_id=None,
+                        db=db,
+                        agent_type=PRECOMPUTE_AGENT_TYPE,
+                        model=question.probing.model,
+                        max_probes=question.probing.max_probes
+                    )
+                    latency_ms = int((time.perf_counter() - started) * 1000)
+                    _store(db, version.version_id, question.id, option.id, decision, latency_ms)
+                    db.commit()
+                    entry.update(decision=decision, latency_ms=latency_ms)
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"Precompute failed for option {option.id}: {e}")
+                    entry["error"] = str(e)
+                report[index] = entry
+        finally:
+            db.close()
+
+    logger.info(
+        f"Precomputing first probes for {total} options of survey version {version_id} "
+        f"({concurrency} workers)"
+    )
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+    precomputed_followups.invalidate(version.version_id)
+
+    failed = sum(1 for entry in report if "error" in entry)
+    logger.info(f"Precomputed {total - failed}/{total} first probes for survey version {version_id}")
+    return report
+
+
+def load_report(db: Session, version_id: UUID) -> List[Dict[str, Any]]:
+    """Stored decisions for a version, one entry per option (no generation)."""
+    version = survey_cache.get_version(db, version_id)
+    rows = {
+        str(row.option_id): row
+        for row in db.query(PrecomputedFollowUp).filter(PrecomputedFollowUp.survey_version_id == version_id)
+    }
+    report = []
+    for question in eligible_questions(version):
+        for option in question.options:
+            entry = {
+                "question_position": question.position,
+                "option_id": str(option.id),
+                "option_text": option.text
+            }
+            row = rows.get(str(option.id))
+            if row is None:
+                entry["error"] = "not precomputed"
+            elif row.prompt_version != FOLLOWUP_PROMPT_VERSION:
+                entry["error"] = f"stale (prompt version {row.prompt_version})"
+            else:
+                entry.update(decision=row.decision, latency_ms=row.latency_ms)
+            report.append(entry)
+    return report
+
+
+def _store(
+    db: Session,
+    version_id: UUID,
+    question_id: UUID,
+    option_id: UUID,
+    decision: Dict[str, Any],
+    latency_ms: int
+):
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    values = dict(
+        survey_version_id=version_id,
+        question_id=question_id,
+        decision=decision,
+        prompt_version=FOLLOWUP_PROMPT_VERSION,
+        latency_ms=latency_ms
+    )
+    stmt = insert(PrecomputedFollowUp).values(option_id=option_id, **values)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[PrecomputedFollowUp.option_id],
+        set_=values
+    ))
+
+
+precomputed_followups = PrecomputedFollowUps(
+    enabled=settings.followup_precompute_enabled,
+    refresh_seconds=settings.followup_precompute_refresh_seconds
+)
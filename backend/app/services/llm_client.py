@@ -1,26 +1,101 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Deque, AsyncIterator, Tuple
+from collections import deque
+from contextlib import aclosing
 import time
 import asyncio
-from anthropic import Anthropic, APIError, RateLimitError, APITimeoutError
+import httpx
+from anthropic import AsyncAnthropic, APIError, RateLimitError, APITimeoutError
 from app.config import settings
 from app.utils.logger import setup_logger
 from app.models import ModelCall
+from app.services.cost_ledger import MICRO, check_budget, record_spend
+from app.services.llm_governor import llm_governor
+from app.services.circuit_breaker import circuit_breakers, CircuitOpenError
+from app.utils.deadline import Deadline, DeadlineExceeded
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 
 logger = setup_logger(__name__)
 
+CHARS_PER_TOKEN = 4  # rough English average, used for pre-call estimates
+
+
+class LatencyTracker:
+    """
+    Recent API latencies per model (a sliding window), used to pick the
+    hedge delay, plus deadline and hedging counters for /admin/metrics.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def record(self, model: str, seconds: float):
+        samples = self._samples.get(model)
+        if samples is None:
+            samples = self._samples[model] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, model: str, q: float) -> Optional[float]:
+        samples = self._samples.get(model)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self, model: str) -> float:
+        observed = self.percentile(model, settings.llm_hedge_percentile)
+        return max(observed or 0.0, settings.llm_hedge_min_delay_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": {
+                model: {
+                    "samples": len(samples),
+                    "p50_ms": _ms(self.percentile(model, 0.5)),
+                    "p95_ms": _ms(self.percentile(model, 0.95)),
+                    "hedge_delay_ms": _ms(self.hedge_delay(model))
+                }
+                for model, samples in self._samples.items()
+            },
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "deadline_exceeded": self.deadline_exceeded
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[int]:
+    return round(seconds * 1000) if seconds is not None else None
+
+
+latency_tracker = LatencyTracker()
+
 
 class LLMClient:
-    def __init__(self):
-        self.client = Anthropic(
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        # Pass a shared http_client to reuse pooled keep-alive connections
+        # across requests instead of opening a new pool per client.
+        self.client = AsyncAnthropic(
             api_key=settings.anthropic_api_key,
-            timeout=settings.api_timeout_seconds
+            base_url=settings.anthropic_base_url,
+            timeout=settings.api_timeout_seconds,
+            http_client=http_client,
+            max_retries=0  # retries go back through the governor (see complete)
         )
+        # Caps in-flight API calls per process; backoff sleeps don't hold a slot
+        self.in_flight = asyncio.Semaphore(settings.llm_max_in_flight)
+        # Prompt cache writes cost 1.25x the input price, reads 0.1x
         self.pricing = {
-            "claude-sonnet-4-20250514": {"input": 3.00, "output": 15.00},
-            "claude-3-haiku-20240307": {"input": 0.25, "output": 1.25},
+            "claude-sonnet-4-20250514": {"input": 3.00, "output": 15.00, "cache_write": 3.75, "cache_read": 0.30},
+            "claude-3-haiku-20240307": {"input": 0.25, "output": 1.25, "cache_write": 0.30, "cache_read": 0.03},
         }
+        self.cache_headers = (
+            {"anthropic-beta": settings.llm_prompt_cache_beta}
+            if settings.llm_prompt_caching and settings.llm_prompt_cache_beta else None
+        )
     
     async def complete(
         self,
@@ -32,125 +107,580 @@ class LLMClient:
         agent_type: str = "unknown",
         session_id: Optional[str] = None,
         db: Optional[Session] = None,
-        max_retries: int = None
+        max_retries: int = None,
+        deadline: Optional[Deadline] = None,
+        route: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Call Anthropic API and log to database."""
+        """
+        Call Anthropic API and log to database. With a deadline, every
+        attempt, governor wait and backoff sleep spends from it; when it runs
+        out DeadlineExceeded is raised and the timeout is logged as a
+        ModelCall with finish_reason "deadline_exceeded", charged the
+        estimated input of any request still in flight. Raises
+        CircuitOpenError without calling the API while the model's circuit
+        is open. `route` (the model router's choice) is recorded on the
+        ModelCall for per-route metrics.
+        """
         logger.info(f"🔵 REAL LLM CLIENT called: model={model}, agent={agent_type}")  # ADD THIS LINE
 
+        # Fail fast while the model's circuit is open (no DB or network work)
+        circuit = circuit_breakers.get(model)
+        if circuit:
+            circuit.check()
+        
         if max_retries is None:
             max_retries = settings.api_max_retries
             
         start_time = time.time()
         last_exception = None
         
-        # Check session cost budget before making call
-        if db and session_id:
-            total_cost = db.query(func.sum(ModelCall.cost_usd))\
-                .filter(ModelCall.session_id == session_id)\
-                .scalar() or 0.0
-            
-            if total_cost > settings.max_cost_per_session_usd:
-                logger.error(f"Session {session_id} exceeded cost limit: ${total_cost:.4f}")
-                raise Exception(f"Session cost limit exceeded: ${total_cost:.4f}")
-        
-        for attempt in range(max_retries):
-            try:
-                response = self.client.messages.create(
-                    model=model,
-                    system=system,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature
-                )
-                
-                # SUCCESS - Process the response
-                latency_ms = int((time.time() - start_time) * 1000)
-                
-                input_tokens = response.usage.input_tokens
-                output_tokens = response.usage.output_tokens
-                # Around line 50-60
-                cost_usd = self._calculate_cost(model, input_tokens, output_tokens)
-                cost_usd_cents = int(cost_usd * 100)  # ADD THIS - convert to cents
-
-                if db:
-                    model_call = ModelCall(
-                        session_id=session_id,
-                        agent_type=agent_type,
-                        model_name=model,
-                        provider="anthropic",
-                        prompt_text=messages[0]["content"] if messages else "",
-                        system_prompt=system,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        response_text=response.content[0].text,
-                        finish_reason=response.stop_reason,
-                        input_tokens=input_tokens,
-                        output_tokens=output_tokens,
-                        latency_ms=latency_ms,
-                        cost_usd=cost_usd_cents  # CHANGED - store cents not dollars
-                    )                   
-                    db.add(model_call)
-                    db.flush()
-                
-                logger.info(
-                    f"LLM call completed: model={model}, agent={agent_type}, "
-                    f"tokens={input_tokens}/{output_tokens}, latency={latency_ms}ms, "
-                    f"cost=${cost_usd:.6f}"
-                )
-                
-                return {
-                    "content": response.content,
-                    "usage": {
-                        "input_tokens": input_tokens,
-                        "output_tokens": output_tokens
-                    },
-                    "latency_ms": latency_ms,
-                    "cost_usd": cost_usd
-                }
-                
-            except RateLimitError as e:
-                last_exception = e
-                wait_time = min(2 ** attempt, 60)  # Exponential backoff, max 60s
-                logger.warning(f"Rate limit hit, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                await asyncio.sleep(wait_time)
-                continue
-                
-            except APITimeoutError as e:
-                last_exception = e
-                wait_time = min(2 ** attempt, 30)
-                logger.warning(f"API timeout, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                await asyncio.sleep(wait_time)
-                continue
-                
-            except APIError as e:
-                # For other API errors, check if they're retryable
-                if e.status_code >= 500:  # Server errors are retryable
+        # Check session and daily budgets (running totals, no aggregate scan)
+        if db:
+            check_budget(
+                db,
+                int(session_id) if session_id else None,
+                self._estimate_cost_micro(model, system, messages, max_tokens)
+            )
+            self._release_connection(db)
+        
+        estimated_tokens = self._estimate_input_tokens(system, messages) + max_tokens
+        usage: Dict[str, Any] = {}  # requests in flight, kept up to date by the attempts
+        
+        try:
+            for attempt in range(max_retries):
+                try:
+                    if deadline:
+                        deadline.check()
+                    response = await self._send(
+                        model, system, messages, max_tokens, temperature,
+                        agent_type, estimated_tokens, deadline, usage
+                    )
+                    
+                    # SUCCESS - Process the response
+                    latency_ms = int((time.time() - start_time) * 1000)
+                    
+                    input_tokens = response.usage.input_tokens
+                    output_tokens = response.usage.output_tokens
+                    cache_write, cache_read = self._cache_usage(response.usage)
+                    cost_usd = self._log_call(
+                        db, session_id, agent_type, model, system, messages, temperature, max_tokens,
+                        response.content[0].text, response.stop_reason, input_tokens, output_tokens, latency_ms,
+                        route, cache_write, cache_read
+                    ) / MICRO
+                    
+                    logger.info(
+                        f"LLM call completed: model={model}, agent={agent_type}, "
+                        f"tokens={input_tokens}/{output_tokens}, cache={cache_read} read/{cache_write} written, "
+                        f"latency={latency_ms}ms, cost=${cost_usd:.6f}"
+                    )
+                    
+                    return {
+                        "content": response.content,
+                        "usage": {
+                            "input_tokens": input_tokens,
+                            "output_tokens": output_tokens,
+                            "cache_creation_input_tokens": cache_write,
+                            "cache_read_input_tokens": cache_read
+                        },
+                        "latency_ms": latency_ms,
+                        "cost_usd": cost_usd
+                    }
+                    
+                except RateLimitError as e:
+                    # Pause the model's lane for every caller; the retry queues again
+                    last_exception = e
+                    llm_governor.rate_limited(model, self._retry_after(e))
+                    logger.warning(f"Rate limit hit, requeueing (attempt {attempt + 1}/{max_retries})")
+                    continue
+                    
+                except APITimeoutError as e:
                     last_exception = e
                     wait_time = min(2 ** attempt, 30)
-                    logger.warning(f"API error {e.status_code}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                    await asyncio.sleep(wait_time)
+                    logger.warning(f"API timeout, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                    await self._backoff(wait_time, deadline)
                     continue
-                else:
-                    # Client errors (400, 401, 403) should not be retried
-                    logger.error(f"LLM call failed with non-retryable error: {e}")
-                    raise
                     
-            except Exception as e:
-                logger.error(f"LLM call failed with unexpected error: {e}")
-                raise
+                except APIError as e:
+                    # For other API errors, check if they're retryable
+                    status_code = getattr(e, "status_code", None)
+                    if status_code is None or status_code >= 500:  # Connection and server errors are retryable
+                        last_exception = e
+                        wait_time = min(2 ** attempt, 30)
+                        logger.warning(f"API error {status_code}, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                        await self._backoff(wait_time, deadline)
+                        continue
+                    else:
+                        # Client errors (400, 401, 403) should not be retried
+                        logger.error(f"LLM call failed with non-retryable error: {e}")
+                        raise
+                        
+                except (DeadlineExceeded, CircuitOpenError):
+                    raise
+                        
+                except Exception as e:
+                    logger.error(f"LLM call failed with unexpected error: {e}")
+                    raise
+        
+        except DeadlineExceeded:
+            latency_ms = int((time.time() - start_time) * 1000)
+            latency_tracker.deadline_exceeded += 1
+            logger.warning(
+                f"LLM call abandoned at deadline: model={model}, agent={agent_type}, "
+                f"latency={latency_ms}ms, last error={last_exception}"
+            )
+            if session_id:
+                self._log_call(
+                    db, session_id, agent_type, model, system, messages, temperature, max_tokens,
+                    "", "deadline_exceeded", self._unreported_input_tokens(usage, system, messages), 0,
+                    latency_ms, route
+                )
+            raise
         
         # If we've exhausted all retries
         logger.error(f"LLM call failed after {max_retries} attempts: {last_exception}")
         raise last_exception
     
-    def _calculate_cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
-        """Calculate cost in USD."""
+    async def stream(
+        self,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        agent_type: str = "unknown",
+        session_id: Optional[str] = None,
+        db: Optional[Session] = None,
+        max_retries: int = None,
+        deadline: Optional[Deadline] = None,
+        route: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Streaming variant of complete(): yields text deltas as the model
+        generates them. The deadline bounds the wait for the first delta;
+        failed attempts are retried only until a delta has been yielded.
+        The ModelCall is logged when the stream ends, or when the caller
+        closes it early (finish_reason "client_closed", output tokens
+        estimated from the text received so far).
+        """
+        circuit = circuit_breakers.get(model)
+        if circuit:
+            circuit.check()
+        
+        if max_retries is None:
+            max_retries = settings.api_max_retries
+        
+        start_time = time.time()
+        last_exception = None
+        
+        if db:
+            check_budget(
+                db,
+                int(session_id) if session_id else None,
+                self._estimate_cost_micro(model, system, messages, max_tokens)
+            )
+            self._release_connection(db)
+        
+        estimated_tokens = self._estimate_input_tokens(system, messages) + max_tokens
+        received: List[str] = []
+        usage: Dict[str, Any] = {}  # filled in by the attempt as events arrive
+        
+        def log(finish_reason: Optional[str]):
+            latency_ms = int((time.time() - start_time) * 1000)
+            text = "".join(received)
+            input_tokens = usage.get("input_tokens") or self._unreported_input_tokens(usage, system, messages)
+            output_tokens = max(usage.get("output_tokens") or 0, len(text) // CHARS_PER_TOKEN)
+            cache_write = usage.get("cache_creation_input_tokens", 0)
+            cache_read = usage.get("cache_read_input_tokens", 0)
+            cost_micro_usd = self._log_call(
+                db, session_id, agent_type, model, system, messages, temperature, max_tokens,
+                text, finish_reason, input_tokens, output_tokens, latency_ms, route, cache_write, cache_read
+            )
+            logger.info(
+                f"LLM stream {finish_reason}: model={model}, agent={agent_type}, "
+                f"tokens={input_tokens}/{output_tokens}, cache={cache_read} read/{cache_write} written, "
+                f"latency={latency_ms}ms, cost=${cost_micro_usd / MICRO:.6f}"
+            )
+        
+        try:
+            for attempt in range(max_retries):
+                try:
+                    if deadline:
+                        deadline.check()
+                    async with aclosing(self._stream_attempt(
+                        model, system, messages, max_tokens, temperature,
+                        agent_type, estimated_tokens, deadline, usage
+                    )) as deltas:
+                        async for delta in deltas:
+                            received.append(delta)
+                            yield delta
+                    log(usage.get("stop_reason"))
+                    return
+                
+                except RateLimitError as e:
+                    if received:
+                        raise
+                    last_exception = e
+                    llm_governor.rate_limited(model, self._retry_after(e))
+                    logger.warning(f"Rate limit hit, requeueing stream (attempt {attempt + 1}/{max_retries})")
+                
+                except APIError as e:
+                    status_code = getattr(e, "status_code", None)
+                    if received or not (status_code is None or status_code >= 500):
+                        logger.error(f"LLM stream failed: {e}")
+                        raise
+                    last_exception = e
+                    wait_time = min(2 ** attempt, 30)
+                    logger.warning(f"API error {status_code} before first token, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
+                    await self._backoff(wait_time, deadline)
+        
+        except GeneratorExit:
+            # The caller has what it needs; the attempt's stream is already closed
+            log("client_closed")
+            raise
+        
+        except asyncio.CancelledError:
+            log("deadline_exceeded" if deadline and deadline.expired else "cancelled")
+            raise
+        
+        except DeadlineExceeded:
+            latency_tracker.deadline_exceeded += 1
+            logger.warning(f"LLM stream abandoned at deadline: model={model}, agent={agent_type}, last error={last_exception}")
+            log("deadline_exceeded")
+            raise
+        
+        logger.error(f"LLM stream failed after {max_retries} attempts: {last_exception}")
+        raise last_exception
+    
+    async def _stream_attempt(
+        self,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        agent_type: str,
+        estimated_tokens: int,
+        deadline: Optional[Deadline],
+        usage: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """One streamed attempt under the circuit breaker, governor and in-flight cap."""
+        circuit = circuit_breakers.get(model)
+        probe = circuit.before_call() if circuit else False
+        sent_at = None
+        first_token = None  # seconds to the first delta, the stream's latency signal
+        generated = 0  # characters received, for settling a stream closed early
+        try:
+            async with llm_governor.admit(model, agent_type, estimated_tokens) as settle:
+                try:
+                    async with self.in_flight:
+                        sent_at = time.monotonic()
+                        usage["requests_in_flight"] = usage.get("requests_in_flight", 0) + 1
+                        async with self.client.messages.stream(
+                            model=model,
+                            system=self._system_param(system),
+                            messages=messages,
+                            max_tokens=max_tokens,
+                            temperature=temperature,
+                            extra_headers=self.cache_headers
+                        ) as stream:
+                            deltas = stream.text_stream.__aiter__()
+                            while True:
+                                try:
+                                    if first_token is None and deadline:
+                                        delta = await asyncio.wait_for(deltas.__anext__(), timeout=deadline.remaining())
+                                    else:
+                                        delta = await deltas.__anext__()
+                                except StopAsyncIteration:
+                                    break
+                                except asyncio.TimeoutError:
+                                    raise DeadlineExceeded(f"No output from {model} within the request deadline")
+                                if first_token is None:
+                                    first_token = time.monotonic() - sent_at
+                                if "input_tokens" not in usage:  # from message_start
+                                    snapshot = stream.current_message_snapshot.usage
+                                    usage["input_tokens"] = snapshot.input_tokens
+                                    usage["cache_creation_input_tokens"], usage["cache_read_input_tokens"] = self._cache_usage(snapshot)
+                                generated += len(delta)
+                                yield delta
+                            message = await stream.get_final_message()
+                            usage["input_tokens"] = message.usage.input_tokens
+                            usage["output_tokens"] = message.usage.output_tokens
+                            usage["stop_reason"] = message.stop_reason
+                            usage["requests_in_flight"] -= 1
+                finally:
+                    settle(usage.get("input_tokens", 0) + usage.get("output_tokens", generated // CHARS_PER_TOKEN))
+        except DeadlineExceeded:
+            if circuit:
+                elapsed = time.monotonic() - sent_at if sent_at is not None else 0.0
+                circuit.on_result(probe, failed=True, latency_seconds=elapsed)
+            raise
+        except APIError as e:
+            if sent_at is not None:
+                usage["requests_in_flight"] -= 1  # failed requests aren't billed
+            if circuit:
+                status_code = getattr(e, "status_code", None)
+                if status_code is None or status_code >= 500:
+                    elapsed = time.monotonic() - sent_at if sent_at is not None else 0.0
+                    circuit.on_result(probe, failed=True, latency_seconds=elapsed)
+                else:
+                    circuit.on_release(probe)
+            raise
+        except (GeneratorExit, asyncio.CancelledError):
+            if circuit:
+                if first_token is not None:
+                    circuit.on_result(probe, failed=False, latency_seconds=first_token)
+                else:
+                    circuit.on_release(probe)
+            raise
+        if circuit:
+            circuit.on_result(probe, failed=False, latency_seconds=first_token or 0.0)
+    
+    async def _send(
+        self,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        agent_type: str,
+        estimated_tokens: int,
+        deadline: Optional[Deadline],
+        usage: Dict[str, Any]
+    ):
+        """One attempt, bounded by the deadline and optionally hedged."""
+        def attempt():
+            return self._create(
+                model, system, messages, max_tokens, temperature, agent_type, estimated_tokens, deadline, usage
+            )
+
+        if deadline is None:
+            return await attempt()
+
+        call = self._hedged(model, attempt) if settings.llm_hedge_requests else attempt()
+        try:
+            return await asyncio.wait_for(call, timeout=deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(f"No response from {model} within the request deadline")
+    
+    async def _create(
+        self,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+        agent_type: str,
+        estimated_tokens: int,
+        deadline: Optional[Deadline] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ):
+        """One request. `usage["requests_in_flight"]` counts it while it is sent but unanswered."""
+        usage = {} if usage is None else usage
+        circuit = circuit_breakers.get(model)
+        probe = circuit.before_call() if circuit else False
+        sent_at = None
+        try:
+            # Shared per-model rate limits and priority queue, then the in-flight cap
+            async with llm_governor.admit(model, agent_type, estimated_tokens) as settle:
+                async with self.in_flight:
+                    sent_at = time.monotonic()
+                    usage["requests_in_flight"] = usage.get("requests_in_flight", 0) + 1
+                    response = await self.client.messages.create(
+                        model=model,
+                        system=self._system_param(system),
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        extra_headers=self.cache_headers
+                    )
+                    usage["requests_in_flight"] -= 1
+                    latency = time.monotonic() - sent_at
+                    latency_tracker.record(model, latency)
+                settle(response.usage.input_tokens + response.usage.output_tokens)
+        except asyncio.CancelledError:
+            if circuit:
+                if sent_at is not None and deadline is not None and deadline.expired:
+                    # No answer within the request deadline counts against the backend
+                    circuit.on_result(probe, failed=True, latency_seconds=time.monotonic() - sent_at)
+                else:
+                    circuit.on_release(probe)  # hedge loser or caller gave up
+            raise
+        except APIError as e:
+            if sent_at is not None:
+                usage["requests_in_flight"] -= 1  # failed requests aren't billed
+            if circuit:
+                status_code = getattr(e, "status_code", None)
+                if status_code is None or status_code >= 500:  # connection errors, timeouts, 5xx
+                    elapsed = time.monotonic() - sent_at if sent_at is not None else 0.0
+                    circuit.on_result(probe, failed=True, latency_seconds=elapsed)
+                else:
+                    circuit.on_release(probe)  # 429s and client errors say nothing about backend health
+            raise
+        if circuit:
+            circuit.on_result(probe, failed=False, latency_seconds=latency)
+        return response
+    
+    async def _hedged(self, model: str, attempt):
+        """
+        Start a second, identical request if the first hasn't answered within
+        the model's recent latency percentile; return whichever finishes
+        first and cancel the other.
+        """
+        first = asyncio.ensure_future(attempt())
+        done, _ = await asyncio.wait({first}, timeout=latency_tracker.hedge_delay(model))
+        if done:
+            return first.result()
+
+        latency_tracker.hedged += 1
+        logger.info(f"Hedging slow {model} request")
+        second = asyncio.ensure_future(attempt())
+        pending = {first, second}
+        try:
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            latency_tracker.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _backoff(self, wait_time: float, deadline: Optional[Deadline]):
+        """Sleep before a retry, unless the retry couldn't finish inside the deadline anyway."""
+        if deadline and wait_time >= deadline.remaining():
+            raise DeadlineExceeded("Not enough time left in the request deadline to retry")
+        await asyncio.sleep(wait_time)
+    
+    def _log_call(
+        self,
+        db: Optional[Session],
+        session_id: Optional[str],
+        agent_type: str,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        response_text: str,
+        finish_reason: Optional[str],
+        input_tokens: int,
+        output_tokens: int,
+        latency_ms: int,
+        route: Optional[str] = None,
+        cache_creation_tokens: int = 0,
+        cache_read_tokens: int = 0
+    ) -> int:
+        """Add the ModelCall and its session ledger update to the caller's transaction; returns the cost in micro-dollars."""
+        cost_micro_usd = self._calculate_cost_micro(
+            model, input_tokens, output_tokens, cache_creation_tokens, cache_read_tokens
+        )
+        if db:
+            db.add(ModelCall(
+                session_id=session_id,
+                agent_type=agent_type,
+                model_name=model,
+                route=route,
+                provider="anthropic",
+                prompt_text=messages[0]["content"] if messages else "",
+                system_prompt=system,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_text=response_text,
+                finish_reason=finish_reason,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cache_creation_input_tokens=cache_creation_tokens,
+                cache_read_input_tokens=cache_read_tokens,
+                latency_ms=latency_ms,
+                cost_usd=round(cost_micro_usd / MICRO * 100),  # legacy cents column
+                cost_micro_usd=cost_micro_usd
+            ))  # Flushed with the caller's commit
+            # The session ledger update rides in the same transaction as the insert
+            record_spend(db, int(session_id) if session_id else None, cost_micro_usd)
+        return cost_micro_usd
+    
+    def _release_connection(self, db: Session):
+        """
+        End the read-only transaction opened by the budget check so the pooled
+        DB connection isn't held while we wait on the network or back off.
+        Pending writes are left for the caller to commit.
+        """
+        if not (db.new or db.dirty or db.deleted):
+            db.commit()
+    
+    def _calculate_cost_micro(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_creation_tokens: int = 0,
+        cache_read_tokens: int = 0
+    ) -> int:
+        """
+        Calculate cost in micro-dollars (pricing is USD per million tokens).
+        `input_tokens` excludes the cached prefix, which is billed separately
+        as cache writes and reads.
+        """
         if model not in self.pricing:
             logger.warning(f"Unknown model '{model}', cost tracking unavailable")
-            return 0.0
+            return 0
         
         pricing = self.pricing[model]
-        input_cost = (input_tokens / 1_000_000) * pricing["input"]
-        output_cost = (output_tokens / 1_000_000) * pricing["output"]
-        
-        return input_cost + output_cost
\ No newline at end of file
+        return round(
+            input_tokens * pricing["input"]
+            + output_tokens * pricing["output"]
+            + cache_creation_tokens * pricing["cache_write"]
+            + cache_read_tokens * pricing["cache_read"]
+        )
+    
+    def _system_param(self, system: str):
+        """
+        The system prompt, as one text block with a cache breakpoint when
+        prompt caching is on. System prompts are identical on every call,
+        so the provider can serve the prefix from its cache (prompts shorter
+        than the model's minimum cacheable length are simply not cached).
+        """
+        if not settings.llm_prompt_caching or not system:
+            return system
+        return [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+    
+    @staticmethod
+    def _cache_usage(usage) -> Tuple[int, int]:
+        """(cache write, cache read) input tokens; absent when caching wasn't used."""
+        return (
+            getattr(usage, "cache_creation_input_tokens", None) or 0,
+            getattr(usage, "cache_read_input_tokens", None) or 0
+        )
+    
+    def _retry_after(self, error: RateLimitError) -> Optional[float]:
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (AttributeError, TypeError, ValueError):
+            return None
+    
+    def _estimate_input_tokens(self, system: str, messages: List[Dict[str, str]]) -> int:
+        prompt_chars = len(system or "") + sum(len(str(m.get("content", ""))) for m in messages)
+        return prompt_chars // CHARS_PER_TOKEN + 1
+    
+    def _unreported_input_tokens(self, usage: Dict[str, Any], system: str, messages: List[Dict[str, str]]) -> int:
+        """
+        Input tokens to charge for a call abandoned before usage was reported:
+        the estimate for each request still in flight (the provider bills
+        those), none for requests that never went out or failed.
+        """
+        return usage.get("requests_in_flight", 0) * self._estimate_input_tokens(system, messages)
+    
+    def _estimate_cost_micro(
+        self,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int
+    ) -> int:
+        """Upper-bound cost of a call: estimated prompt tokens plus max_tokens of output."""
+        return self._calculate_cost_micro(model, self._estimate_input_tokens(system, messages), max_tokens)
@@ -0,0 +1,237 @@
+from typing import Dict, Any, List, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+import asyncio
+import itertools
+import time
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Lower value = admitted first. Interactive follow-ups are on the respondent's
+# critical path; summaries run in the background; anything else is batch.
+PRIORITIES = {
+    "follow_up": 0,
+    "summary": 1,
+    "batch": 2,
+}
+BATCH_PRIORITY = PRIORITIES["batch"]
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute / 60` per second."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)."""
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount: float):
+        self.tokens -= amount
+
+    def drain(self):
+        self.tokens = min(self.tokens, 0.0)
+
+
+@dataclass
+class _Waiter:
+    priority: int
+    seq: int
+    tokens: int
+    enqueued: float
+    future: asyncio.Future
+
+
+@dataclass
+class _Lane:
+    """Admission state for one model."""
+    requests: TokenBucket
+    tokens: TokenBucket
+    waiters: List[_Waiter] = field(default_factory=list)
+    paused_until: float = 0.0
+    timer: Optional[asyncio.TimerHandle] = None
+    admitted: int = 0
+    rate_limited: int = 0
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control in front of the Anthropic API.
+
+    Every call waits in its model's queue until both the requests/min and
+    tokens/min buckets allow it. The queue is ordered by priority class and
+    then arrival; waiters gain one priority class per `aging_seconds` spent
+    queued so batch work can't starve. A 429 pauses the whole lane for the
+    server's retry-after instead of each caller backing off on its own.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        model_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        aging_seconds: float = 10.0
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+        self.aging_seconds = aging_seconds
+        self._lanes: Dict[str, _Lane] = {}
+        self._seq = itertools.count()
+        self._waits: Dict[str, List[float]] = {}  # priority class -> [count, total, max]
+        self.in_flight = 0  # admitted calls that haven't finished yet
+
+    @asynccontextmanager
+    async def admit(self, model: str, agent_type: str, estimated_tokens: int):
+        """Wait for a slot; yields a settle(actual_tokens) callback for usage accounting."""
+        lane = self._lane(model)
+        priority = PRIORITIES.get(agent_type, BATCH_PRIORITY)
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(priority, next(self._seq), estimated_tokens, time.monotonic(), loop.create_future())
+        lane.waiters.append(waiter)
+        self._pump(model)
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                lane.tokens.take(-waiter.tokens)  # admitted but never used
+            self._pump(model)
+            raise
+
+        self._record_wait(agent_type if agent_type in PRIORITIES else "batch", time.monotonic() - waiter.enqueued)
+
+        def settle(actual_tokens: int):
+            # Correct the estimate with the usage the API reported
+            lane.tokens.take(actual_tokens - estimated_tokens)
+
+        self.in_flight += 1
+        try:
+            yield settle
+        finally:
+            self.in_flight -= 1
+
+    def rate_limited(self, model: str, retry_after: Optional[float]):
+        """Pause a model's lane after a 429 and empty its buckets."""
+        lane = self._lane(model)
+        lane.rate_limited += 1
+        pause = retry_after if retry_after is not None else settings.llm_rate_limit_default_pause_seconds
+        lane.paused_until = max(lane.paused_until, time.monotonic() + pause)
+        lane.requests.drain()
+        lane.tokens.drain()
+        logger.warning(f"Rate limited on {model}: pausing admissions for {pause:.1f}s")
+
+    def oldest_wait(self) -> float:
+        """Seconds the longest-queued call has been waiting (0 if none are queued)."""
+        now = time.monotonic()
+        # Waiters are appended on arrival, so each lane's first one is its oldest
+        return max((now - lane.waiters[0].enqueued for lane in self._lanes.values() if lane.waiters), default=0.0)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "in_flight": self.in_flight,
+            "models": {
+                model: {
+                    "queue_depth": len(lane.waiters),
+                    "queued_by_priority": {
+                        name: sum(1 for w in lane.waiters if w.priority == value)
+                        for name, value in PRIORITIES.items()
+                    },
+                    "admitted": lane.admitted,
+                    "rate_limited": lane.rate_limited,
+                    "paused_for_seconds": round(max(0.0, lane.paused_until - now), 2),
+                    "requests_available": round(lane.requests.tokens, 1),
+                    "tokens_available": round(lane.tokens.tokens),
+                }
+                for model, lane in self._lanes.items()
+            },
+            "wait_seconds": {
+                name: {
+                    "count": int(count),
+                    "avg": round(total / count, 4) if count else None,
+                    "max": round(worst, 4)
+                }
+                for name, (count, total, worst) in self._waits.items()
+            }
+        }
+
+    def _lane(self, model: str) -> _Lane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            limits = self.model_limits.get(model, {})
+            lane = _Lane(
+                requests=TokenBucket(limits.get("rpm", self.requests_per_minute)),
+                tokens=TokenBucket(limits.get("tpm", self.tokens_per_minute))
+            )
+            self._lanes[model] = lane
+        return lane
+
+    def _pump(self, model: str):
+        """Admit queued calls in order while the buckets allow; otherwise re-arm a timer."""
+        lane = self._lanes[model]
+        if lane.timer is not None:
+            lane.timer.cancel()
+            lane.timer = None
+
+        now = time.monotonic()
+        lane.requests.refill(now)
+        lane.tokens.refill(now)
+
+        while lane.waiters:
+            if now < lane.paused_until:
+                wait = lane.paused_until - now
+                break
+
+            waiter = min(lane.waiters, key=lambda w: (self._effective_priority(w, now), w.seq))
+            if waiter.future.done():
+                lane.waiters.remove(waiter)
+                continue
+
+            wait = max(lane.requests.wait_time(1), lane.tokens.wait_time(waiter.tokens))
+            if wait > 0:
+                break
+
+            lane.waiters.remove(waiter)
+            lane.requests.take(1)
+            lane.tokens.take(waiter.tokens)
+            lane.admitted += 1
+            waiter.future.set_result(None)
+        else:
+            return
+
+        lane.timer = asyncio.get_running_loop().call_later(wait, self._pump, model)
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> float:
+        if self.aging_seconds <= 0:
+            return waiter.priority
+        return waiter.priority - int((now - waiter.enqueued) / self.aging_seconds)
+
+    def _record_wait(self, name: str, seconds: float):
+        count, total, worst = self._waits.get(name, (0, 0.0, 0.0))
+        self._waits[name] = [count + 1, total + seconds, max(worst, seconds)]
+
+
+llm_governor = LLMGovernor(
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    model_limits=settings.llm_model_rate_limits,
+    aging_seconds=settings.llm_priority_aging_seconds
+)
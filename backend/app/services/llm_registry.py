@@ -0,0 +1,114 @@
+from typing import Optional
+import asyncio
+import httpx
+from fastapi import Request
+
+from app.config import settings
+from app.services.llm_client import LLMClient
+from app.services.mock_llm_client import MockLLMClient
+from app.agents.followup_agent import FollowUpAgent
+from app.agents.summary_agent import SummaryAgent
+from app.services.summary_queue import SummaryWorkerPool
+from app.services.load_shedder import load_shedder
+from app.services.decision_cache import decision_cache
+from app.services.cost_ledger import daily_spend
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DEFAULT_ANTHROPIC_BASE_URL = "https://api.anthropic.com"
+
+
+class LLMRegistry:
+    """
+    Process-wide holder for the LLM client, the agents built on it and
+    the background summary workers. Created once at app startup so every
+    request shares one pooled HTTP client instead of opening new TCP+TLS
+    connections per answer.
+    """
+
+    def __init__(self):
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.llm_client = None
+        self.followup_agent: Optional[FollowUpAgent] = None
+        self.summary_agent: Optional[SummaryAgent] = None
+        self.summary_workers: Optional[SummaryWorkerPool] = None
+
+    async def start(self):
+        """Build the shared client and agents."""
+        if settings.use_mock_llm:
+            logger.info("Using MockLLMClient")
+            self.llm_client = MockLLMClient()
+        else:
+            logger.info("Using real LLMClient with Anthropic API")
+            self.http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.llm_pool_max_connections,
+                    max_keepalive_connections=settings.llm_pool_max_keepalive,
+                    keepalive_expiry=settings.llm_pool_keepalive_expiry_seconds
+                ),
+                timeout=settings.api_timeout_seconds
+            )
+            self.llm_client = LLMClient(http_client=self.http_client)
+            await self._prewarm()
+
+        self.followup_agent = FollowUpAgent(self.llm_client)
+        self.summary_agent = SummaryAgent(self.llm_client)
+        self.summary_workers = SummaryWorkerPool(self.summary_agent)
+        await self.summary_workers.start()
+        await load_shedder.start()
+        await daily_spend.start()
+        decision_cache.purge_expired()
+
+        logger.info(
+            f"LLM registry started: pool max={settings.llm_pool_max_connections}, "
+            f"keepalive={settings.llm_pool_max_keepalive}"
+        )
+
+    async def close(self):
+        """Stop workers and close pooled connections on shutdown."""
+        await load_shedder.stop()
+        if self.summary_workers is not None:
+            await self.summary_workers.stop()
+        await daily_spend.stop()  # write out spend buffered since the last flush
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+        logger.info("LLM registry closed")
+
+    async def _prewarm(self):
+        """Open keep-alive connections up front so the first answers skip the TLS handshake."""
+        count = min(settings.llm_prewarm_connections, settings.llm_pool_max_keepalive)
+        if count <= 0:
+            return
+
+        url = settings.anthropic_base_url or DEFAULT_ANTHROPIC_BASE_URL
+
+        async def _touch():
+            try:
+                await self.http_client.head(url)
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Connection pre-warm failed: {e}")
+                return False
+
+        # Concurrent requests so each one checks out its own connection
+        warmed = sum(await asyncio.gather(*(_touch() for _ in range(count))))
+
+        logger.info(f"Pre-warmed {warmed}/{count} LLM connections to {url}")
+
+
+def get_llm_registry(request: Request) -> LLMRegistry:
+    return request.app.state.llm_registry
+
+
+def get_followup_agent(request: Request) -> FollowUpAgent:
+    return get_llm_registry(request).followup_agent
+
+
+def get_summary_agent(request: Request) -> SummaryAgent:
+    return get_llm_registry(request).summary_agent
+
+
+def get_summary_workers(request: Request) -> SummaryWorkerPool:
+    return get_llm_registry(request).summary_workers
@@ -0,0 +1,148 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import time
+
+from app.config import settings
+from app.services.llm_governor import llm_governor
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Degradation levels, each including everything shed by the ones below it
+NORMAL = 0
+SKIP_SUMMARIES = 1
+CAP_PROBES = 2  # at most one follow-up per question
+NO_PROBING = 3
+LEVEL_NAMES = ["normal", "skip_summaries", "cap_probes", "no_probing"]
+
+# Tags recorded on sessions.load_shed, one count per shed decision
+SKIP_SUMMARY_TAG = "skip_summary"
+PROBE_CAP_TAG = "probe_cap"
+NO_PROBE_TAG = "no_probe"
+
+
+class LoadShedder:
+    """
+    Admission control for the answer path.
+
+    Pressure is the worst of three ratios against their limits: LLM calls
+    in flight, the age of the oldest call waiting in the rate governor, and
+    event-loop lag. Pressure at or above each of `steps` raises the level by
+    one; escalation is immediate, recovery steps down one level after
+    pressure has stayed below the current step for `recovery_seconds`.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_in_flight: int,
+        max_queue_wait_seconds: float,
+        max_loop_lag_seconds: float,
+        steps: List[float],
+        recovery_seconds: float,
+        lag_interval_seconds: float = 0.1
+    ):
+        self.enabled = enabled
+        self.max_in_flight = max_in_flight
+        self.max_queue_wait_seconds = max_queue_wait_seconds
+        self.max_loop_lag_seconds = max_loop_lag_seconds
+        self.steps = sorted(steps)[:NO_PROBING]
+        self.recovery_seconds = recovery_seconds
+        self.lag_interval_seconds = lag_interval_seconds
+
+        self.current_level = NORMAL
+        self._calm_since: Optional[float] = None
+        self.loop_lag = 0.0  # smoothed, seconds
+        self._monitor: Optional[asyncio.Task] = None
+        self.shed: Dict[str, int] = {}
+        self.transitions: Dict[str, int] = {}
+
+    async def start(self):
+        """Start the event-loop lag monitor (which also drives recovery)."""
+        if self.enabled and self._monitor is None:
+            self._monitor = asyncio.create_task(self._measure_lag(), name="loop-lag-monitor")
+
+    async def stop(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            await asyncio.gather(self._monitor, return_exceptions=True)
+            self._monitor = None
+
+    def level(self) -> int:
+        """Degradation level for the answer being admitted now."""
+        if not self.enabled:
+            return NORMAL
+
+        pressure = self.pressure()
+        target = sum(1 for step in self.steps if pressure >= step)
+        now = time.monotonic()
+
+        if target > self.current_level:
+            self._set_level(target, pressure)
+            self._calm_since = None
+        elif target < self.current_level:
+            if self._calm_since is None:
+                self._calm_since = now
+            elif now - self._calm_since >= self.recovery_seconds:
+                self._set_level(self.current_level - 1, pressure)
+                self._calm_since = now
+        else:
+            self._calm_since = None
+
+        return self.current_level
+
+    def pressure(self) -> float:
+        return max(self._signals().values())
+
+    def record(self, tag: str):
+        self.shed[tag] = self.shed.get(tag, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "level": self.current_level,
+            "mode": LEVEL_NAMES[self.current_level],
+            "pressure": {name: round(value, 3) for name, value in self._signals().items()},
+            "in_flight": llm_governor.in_flight,
+            "oldest_queue_wait_seconds": round(llm_governor.oldest_wait(), 3),
+            "loop_lag_ms": round(self.loop_lag * 1000, 1),
+            "shed": dict(self.shed),
+            "transitions": dict(self.transitions)
+        }
+
+    def _signals(self) -> Dict[str, float]:
+        return {
+            "in_flight": llm_governor.in_flight / self.max_in_flight if self.max_in_flight > 0 else 0.0,
+            "queue_wait": llm_governor.oldest_wait() / self.max_queue_wait_seconds if self.max_queue_wait_seconds > 0 else 0.0,
+            "loop_lag": self.loop_lag / self.max_loop_lag_seconds if self.max_loop_lag_seconds > 0 else 0.0,
+        }
+
+    def _set_level(self, level: int, pressure: float):
+        key = f"{LEVEL_NAMES[self.current_level]}->{LEVEL_NAMES[level]}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        log = logger.warning if level > self.current_level else logger.info
+        log(f"Load shedding {key} (pressure {pressure:.2f})")
+        self.current_level = level
+
+    async def _measure_lag(self):
+        """
+        How late a short sleep wakes up is how long callbacks wait for the
+        loop. Re-evaluating the level on every tick lets it recover while no
+        answers are arriving.
+        """
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.lag_interval_seconds)
+            lag = max(0.0, time.monotonic() - started - self.lag_interval_seconds)
+            self.loop_lag = 0.7 * self.loop_lag + 0.3 * lag
+            self.level()
+
+
+load_shedder = LoadShedder(
+    enabled=settings.load_shed_enabled,
+    max_in_flight=settings.load_shed_max_in_flight,
+    max_queue_wait_seconds=settings.load_shed_max_queue_wait_seconds,
+    max_loop_lag_seconds=settings.load_shed_max_loop_lag_ms / 1000,
+    steps=settings.load_shed_level_steps,
+    recovery_seconds=settings.load_shed_recovery_seconds
+)
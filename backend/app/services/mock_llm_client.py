@@ -1,10 +1,12 @@
 import json
 import random
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator
 from sqlalchemy.orm import Session
+from app.config import settings
 from app.utils.logger import setup_logger
 from app.models import ModelCall
+from app.utils.deadline import Deadline
 
 logger = setup_logger(__name__)
 
@@ -35,22 +37,27 @@ class MockLLMClient:
         temperature: float = 0.7,
         agent_type: str = "unknown",
         session_id: Optional[str] = None,
-        db: Optional[Session] = None
+        db: Optional[Session] = None,
+        deadline: Optional[Deadline] = None,
+        route: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Mock LLM completion - returns realistic predefined responses.
         Simulates latency and token usage.
         """
         
-        # Simulate API latency (50-150ms)
+        if deadline:
+            deadline.check()
+        
+        # Simulate API latency (50-150ms, or MOCK_LLM_LATENCY_MS for the model)
         start_time = time.time()
-        await self._simulate_latency()
+        await self._simulate_latency(model)
         latency_ms = int((time.time() - start_time) * 1000)
         
         logger.info(f"🎭 Mock LLM call: agent={agent_type}, model={model}")
         
         # Generate mock response based on agent type
-        if agent_type == "follow_up":
+        if agent_type.startswith("follow_up"):  # live and precomputed decisions
             response_text = self._mock_followup_response(messages)
             input_tokens = self._estimate_tokens(messages[0]["content"]) if messages else 200
             output_tokens = self._estimate_tokens(response_text)
@@ -69,6 +76,7 @@ class MockLLMClient:
                 session_id=session_id,
                 agent_type=agent_type,
                 model_name=model,
+                route=route,
                 provider="mock",
                 prompt_text=messages[0]["content"] if messages else "",
                 system_prompt=system,
@@ -79,10 +87,10 @@ class MockLLMClient:
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 latency_ms=latency_ms,
-                cost_usd=0.0
+                cost_usd=0,
+                cost_micro_usd=0
             )
-            db.add(model_call)
-            db.flush()
+            db.add(model_call)  # Flushed with the caller's commit
         
         logger.info(
             f"🎭 Mock response: tokens={input_tokens}/{output_tokens}, "
@@ -99,11 +107,34 @@ class MockLLMClient:
             "cost_usd": 0.0
         }
     
-    async def _simulate_latency(self):
+    async def stream(
+        self,
+        model: str,
+        system: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7,
+        agent_type: str = "unknown",
+        session_id: Optional[str] = None,
+        db: Optional[Session] = None,
+        deadline: Optional[Deadline] = None,
+        route: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """Mock streaming completion: the complete() response in small chunks."""
+        import asyncio
+        response = await self.complete(
+            model, system, messages, max_tokens, temperature, agent_type, session_id, db, deadline, route
+        )
+        text = response["content"][0]["text"]
+        for i in range(0, len(text), 8):
+            await asyncio.sleep(0.005)
+            yield text[i:i + 8]
+    
+    async def _simulate_latency(self, model: str):
         """Simulate realistic API latency."""
         import asyncio
-        latency = random.uniform(0.05, 0.15)  # 50-150ms
-        await asyncio.sleep(latency)
+        low_ms, high_ms = settings.mock_llm_latency_ms.get(model, (50, 150))
+        await asyncio.sleep(random.uniform(low_ms, high_ms) / 1000)
     
     def _estimate_tokens(self, text: str) -> int:
         """Rough token estimation (4 chars ≈ 1 token)."""
@@ -183,17 +214,17 @@ class MockLLMClient:
             return json.dumps({
                 "action": "ask_followup",
                 "followup_question": question,
-                "reason": reason,
+                "probe_count": current_probe + 1,
                 "confidence": confidence,
-                "probe_count": current_probe + 1
+                "reason": reason
             })
         else:
             return json.dumps({
                 "action": "move_on",
                 "followup_question": None,
-                "reason": reason,
+                "probe_count": current_probe,
                 "confidence": confidence,
-                "probe_count": current_probe
+                "reason": reason
             })
     
     def _mock_summary_response(self, messages: List[Dict[str, str]]) -> str:
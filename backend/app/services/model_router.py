@@ -0,0 +1,181 @@
+from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import threading
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import ModelCall
+from app.services.cost_ledger import MICRO
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+FIXED = "fixed"
+ROUTED = "routed"
+CASCADE = "cascade"
+ROUTING_MODES = (FIXED, ROUTED, CASCADE)
+
+# Route names recorded on ModelCall.route
+PINNED_ROUTE = "pinned"  # the question's probing policy names a tier
+FIXED_ROUTE = "fixed"
+LARGE_ROUTE = "large"
+SMALL_ROUTE = "small:{reason}"
+CASCADE_SMALL_ROUTE = "cascade:small"
+CASCADE_ESCALATED_ROUTE = "cascade:escalated"
+
+
+@dataclass(frozen=True)
+class RouteFeatures:
+    """Cheap per-call signals, all known before the model is called."""
+    question_type: str
+    answer_words: int
+    probe_count: int
+    fast_path_confidence: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class Route:
+    name: str
+    model: str
+    escalate_to: Optional[str] = None  # cascade: model for decisions the small model isn't sure of
+
+
+class ModelRouter:
+    """
+    Picks the model for each follow-up decision.
+
+    "fixed" sends every call to the default tier. "routed" sends a call to
+    the small tier when the fast path was fairly sure of the answer (but
+    below its own threshold), when the question has already been probed
+    `small_from_probe` times, or for short answers to `small_question_types`;
+    everything else goes to the large tier. "cascade" asks the small tier
+    first and escalates to the large tier unless its stated confidence is
+    in `accept_confidence`. A tier pinned by the question's probing policy
+    always wins.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        small_tier: str,
+        large_tier: str,
+        short_answer_words: int,
+        small_question_types: List[str],
+        small_from_probe: int,
+        fast_path_confidence: float,
+        accept_confidence: List[str]
+    ):
+        if mode not in ROUTING_MODES:
+            logger.error(f"Unknown follow-up routing mode '{mode}', using '{FIXED}'")
+            mode = FIXED
+        self.mode = mode
+        self.small_tier = small_tier
+        self.large_tier = large_tier
+        self.short_answer_words = short_answer_words
+        self.small_question_types = frozenset(small_question_types)
+        self.small_from_probe = small_from_probe
+        self.fast_path_confidence = fast_path_confidence
+        self.accept_confidence = frozenset(accept_confidence)
+        self._lock = threading.Lock()
+        self.routes: Dict[str, int] = {}
+        self.cascade: Dict[str, int] = {"accepted": 0, "escalated_low_confidence": 0, "escalated_error": 0}
+
+    def route(self, features: RouteFeatures, pinned_model: Optional[str] = None) -> Route:
+        if pinned_model:
+            route = Route(PINNED_ROUTE, pinned_model)
+        elif self.mode == CASCADE:
+            route = Route(CASCADE_SMALL_ROUTE, self._model(self.small_tier), escalate_to=self._model(self.large_tier))
+        elif self.mode == ROUTED:
+            reason = self._small_reason(features)
+            route = Route(SMALL_ROUTE.format(reason=reason), self._model(self.small_tier)) if reason \
+                else Route(LARGE_ROUTE, self._model(self.large_tier))
+        else:
+            route = Route(FIXED_ROUTE, self._model(settings.followup_default_model_tier))
+        self._count(self.routes, route.name)
+        return route
+
+    def accepts(self, decision: Dict[str, Any]) -> bool:
+        """Whether a cascade's small-model decision stands without escalation."""
+        return decision.get("confidence") in self.accept_confidence
+
+    def record_cascade(self, outcome: str):
+        self._count(self.cascade, outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            decided = sum(self.cascade.values())
+            return {
+                "mode": self.mode,
+                "routes": dict(self.routes),
+                "cascade": {
+                    **self.cascade,
+                    "acceptance_rate": round(self.cascade["accepted"] / decided, 4) if decided else None
+                }
+            }
+
+    def _small_reason(self, features: RouteFeatures) -> Optional[str]:
+        if features.fast_path_confidence is not None and features.fast_path_confidence >= self.fast_path_confidence:
+            return "fast_path"
+        if features.probe_count >= self.small_from_probe:
+            return "late_probe"
+        if features.question_type in self.small_question_types and features.answer_words <= self.short_answer_words:
+            return "short_answer"
+        return None
+
+    def _model(self, tier: str) -> str:
+        return settings.followup_model_tiers[tier]
+
+    def _count(self, counts: Dict[str, int], key: str):
+        with self._lock:
+            counts[key] = counts.get(key, 0) + 1
+
+
+def route_metrics(db: Session, hours: float = 24.0) -> List[Dict[str, Any]]:
+    """Follow-up calls per route and model over the last `hours`, from model_calls."""
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    rows = db.query(
+        ModelCall.route,
+        ModelCall.model_name,
+        func.count().label("calls"),
+        func.avg(ModelCall.latency_ms).label("avg_latency_ms"),
+        func.max(ModelCall.latency_ms).label("max_latency_ms"),
+        func.sum(ModelCall.input_tokens).label("input_tokens"),
+        func.sum(ModelCall.output_tokens).label("output_tokens"),
+        func.sum(ModelCall.cache_read_input_tokens).label("cache_read_tokens"),
+        func.sum(ModelCall.cache_creation_input_tokens).label("cache_write_tokens"),
+        func.sum(ModelCall.cost_micro_usd).label("cost_micro_usd")
+    ).filter(
+        ModelCall.agent_type == "follow_up",
+        ModelCall.created_at >= since
+    ).group_by(ModelCall.route, ModelCall.model_name).order_by(func.count().desc()).all()
+
+    return [
+        {
+            "route": row.route or "unrecorded",  # calls logged before routing existed
+            "model": row.model_name,
+            "calls": row.calls,
+            "avg_latency_ms": round(row.avg_latency_ms) if row.avg_latency_ms is not None else None,
+            "max_latency_ms": row.max_latency_ms,
+            "input_tokens": row.input_tokens or 0,
+            "output_tokens": row.output_tokens or 0,
+            "cache_read_tokens": row.cache_read_tokens or 0,
+            "cache_write_tokens": row.cache_write_tokens or 0,
+            "cost_usd": (row.cost_micro_usd or 0) / MICRO,
+            "avg_cost_usd": (row.cost_micro_usd or 0) / MICRO / row.calls
+        }
+        for row in rows
+    ]
+
+
+model_router = ModelRouter(
+    mode=settings.followup_routing_mode,
+    small_tier=settings.followup_route_small_tier,
+    large_tier=settings.followup_route_large_tier,
+    short_answer_words=settings.followup_route_short_answer_words,
+    small_question_types=settings.followup_route_small_question_types,
+    small_from_probe=settings.followup_route_small_from_probe,
+    fast_path_confidence=settings.followup_route_fast_path_confidence,
+    accept_confidence=settings.followup_cascade_accept_confidence
+)
@@ -0,0 +1,88 @@
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Keys of a question's "probing" block:
+#   probe               false: never ask follow-ups (demographics, screeners)
+#   max_probes          follow-ups allowed on this question (default MAX_FOLLOWUP_PROBES)
+#   model_tier          key of FOLLOWUP_MODEL_TIERS used for the decision
+#   include_in_summary  false: the question's exchanges stay out of the session summary
+POLICY_KEYS = ("probe", "max_probes", "model_tier", "include_in_summary")
+
+
+class ProbingPolicyError(ValueError):
+    """Invalid probing policy in a survey definition."""
+
+
+@dataclass(frozen=True)
+class ProbingPolicy:
+    """Compiled probing policy for one question; the defaults are today's behaviour."""
+    probe: bool = True
+    max_probes: Optional[int] = None
+    model_tier: Optional[str] = None
+    include_in_summary: bool = True
+
+    def allows_probe(self, probe_count: int) -> bool:
+        """Whether the follow-up agent may be consulted at this probe count."""
+        if not self.probe:
+            return False
+        limit = self.max_probes if self.max_probes is not None else settings.max_followup_probes
+        return probe_count < limit
+
+    @property
+    def model(self) -> Optional[str]:
+        """Model pinned by `model_tier`, or None to let the model router choose."""
+        return settings.followup_model_tiers[self.model_tier] if self.model_tier else None
+
+
+DEFAULT_POLICY = ProbingPolicy()
+
+
+def compile_probing_policy(definition: Optional[Dict[str, Any]], where: str = "question") -> ProbingPolicy:
+    """Validate a question's "probing" block; raises ProbingPolicyError."""
+    if not definition:
+        return DEFAULT_POLICY
+    if not isinstance(definition, dict):
+        raise ProbingPolicyError(f"{where}: probing must be an object")
+
+    unknown = set(definition) - set(POLICY_KEYS)
+    if unknown:
+        raise ProbingPolicyError(f"{where}: unknown probing keys {sorted(unknown)}")
+
+    probe = definition.get("probe", True)
+    include_in_summary = definition.get("include_in_summary", True)
+    if not isinstance(probe, bool) or not isinstance(include_in_summary, bool):
+        raise ProbingPolicyError(f"{where}: probe and include_in_summary must be true or false")
+
+    max_probes = definition.get("max_probes")
+    if max_probes is not None and (isinstance(max_probes, bool) or not isinstance(max_probes, int) or max_probes < 0):
+        raise ProbingPolicyError(f"{where}: max_probes must be a non-negative integer")
+
+    model_tier = definition.get("model_tier")
+    if model_tier is not None and model_tier not in settings.followup_model_tiers:
+        raise ProbingPolicyError(
+            f"{where}: unknown model_tier '{model_tier}' "
+            f"(configured: {sorted(settings.followup_model_tiers)})"
+        )
+
+    if max_probes == 0:
+        probe = False
+
+    return ProbingPolicy(
+        probe=probe,
+        max_probes=max_probes,
+        model_tier=model_tier,
+        include_in_summary=include_in_summary
+    )
+
+
+def compile_probing_policies(questions: List[Dict[str, Any]]) -> Tuple[ProbingPolicy, ...]:
+    """Compile every question's policy, indexed by position."""
+    return tuple(
+        compile_probing_policy(q.get("probing"), where=f"question {q.get('id') or i}")
+        for i, q in enumerate(questions)
+    )
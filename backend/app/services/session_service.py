@@ -1,47 +1,56 @@
 import uuid
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 from datetime import datetime, timezone
 from ..models import (
-    Session as SessionModel, 
-    Response, 
-    ConversationTurn, 
-    Question,
-    Survey,
-    SurveyVersion,
-    SessionSummary  # ADD THIS LINE
-
+    Session as SessionModel,
+    Response,
+    ConversationTurn,
+    SessionSummary
 )
-from ..schemas import SessionStartResponse, QuestionResponse, QuestionOption, NextQuestionResponse
+from ..schemas import SessionStartResponse, NextQuestionResponse, SurveyMetadata
 from ..utils.logger import setup_logger
-from ..config import settings  # ADD THIS
-from ..services.llm_client import LLMClient  # ADD THIS
-from ..services.mock_llm_client import MockLLMClient  # ADD THIS
-from ..agents.followup_agent import FollowUpAgent  # ADD THIS
-from ..agents.summary_agent import SummaryAgent  # ADD THIS
+from ..config import settings
+from ..agents.followup_agent import FollowUpAgent, EventCallback
+from ..services.summary_queue import SummaryWorkerPool, enqueue_summary, release_deferred
+from ..services.survey_cache import survey_cache, CachedSurveyVersion
+from ..services.decision_cache import decision_cache
+from ..services.followup_precompute import precomputed_followups
+from ..services.session_state import session_state_store, SessionState
+from ..utils.db_metrics import db_metrics
+from ..utils.deadline import Deadline
+from ..services.load_shedder import (
+    load_shedder,
+    SKIP_SUMMARIES,
+    CAP_PROBES,
+    NO_PROBING,
+    SKIP_SUMMARY_TAG,
+    PROBE_CAP_TAG,
+    NO_PROBE_TAG
+)
 
 logger = setup_logger(__name__)
 
+# Versions ingested before summary_every_n existed get the same default as new ones
+DEFAULT_SUMMARY_EVERY_N = SurveyMetadata.model_fields["summary_every_n"].default
+
 
 class SessionService:
     """Service for managing survey sessions."""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        followup_agent: Optional[FollowUpAgent] = None,
+        summary_workers: Optional[SummaryWorkerPool] = None
+    ):
         self.db = db
 
-        # ADD THIS - Initialize LLM client based on settings
-        if settings.use_mock_llm:
-            logger.info("Using MockLLMClient")
-            llm_client = MockLLMClient()
-        else:
-            logger.info("Using real LLMClient with Anthropic API")
-            llm_client = LLMClient()
-        
-        # Initialize agents
-        self.followup_agent = FollowUpAgent(llm_client)
-        self.summary_agent = SummaryAgent(llm_client)
+        # Shared process-wide (see LLMRegistry) and injected per request
+        self.followup_agent = followup_agent
+        self.summary_workers = summary_workers
+
     def start_session(
         self,
         survey_id: str,
@@ -56,31 +65,16 @@ class SessionService:
         if not respondent_id:
             respondent_id = respondent_id or anonymous_id or self._generate_respondent_id()
         
-        # Find survey by name
-        survey = self.db.query(Survey).filter(Survey.name == survey_id).first()
-        if not survey:
-            raise ValueError(f"Survey '{survey_id}' not found")
-        
-        # Get current survey version
-        version = self.db.query(SurveyVersion).filter(
-            SurveyVersion.survey_id == survey.id,
-            SurveyVersion.is_current == True
-        ).first()
-        
-        if not version:
-            raise ValueError(f"No active version found for survey '{survey_id}'")
-        
-        # Get questions
-        questions = self.db.query(Question).filter(
-            Question.survey_version_id == version.id
-        ).order_by(Question.position).all()
+        # Current version with its questions (cached per version)
+        version = survey_cache.get_current(self.db, survey_id)
+        questions = version.questions
         
         if not questions:
             raise ValueError(f"No questions found for survey '{survey_id}'")
         
         # Create session - REMOVE id parameter, let DB auto-generate
         session = SessionModel(
-            survey_version_id=version.id,
+            survey_version_id=version.version_id,
             respondent_id=respondent_id,
             current_question_index=0
         )
@@ -94,7 +88,7 @@ class SessionService:
         return SessionStartResponse(
             session_id=session.id,  # Use the auto-generated integer ID
             total_questions=len(questions),
-            first_question=self._format_question(first_question)
+            first_question=first_question.response
         )
     
     async def submit_answer(
@@ -104,34 +98,82 @@ class SessionService:
         answer_type: str,
         text: Optional[str] = None,
         selected_option_id: Optional[str] = None,
-        parent_message_id: Optional[UUID] = None
+        parent_message_id: Optional[UUID] = None,
+        deadline: Optional[Deadline] = None,
+        on_event: Optional[EventCallback] = None
+    ) -> NextQuestionResponse:
+        """
+        Submit an answer and get next question or follow-up. The follow-up
+        decision must fit in `deadline` (default: FOLLOWUP_DEADLINE_SECONDS
+        from now); otherwise the next survey question is returned. Under
+        load, summaries and probing are shed per the load shedder's level.
+        `on_event` receives the follow-up agent's streaming events.
+        """
+        if deadline is None:
+            deadline = Deadline.from_settings(settings.followup_deadline_seconds)
+        shed_level = load_shedder.level()
+        with db_metrics.track("submit_answer") as count:
+            result = await self._submit_answer(
+                session_id, question_id, answer_type, text, selected_option_id,
+                deadline, shed_level, on_event
+            )
+        logger.info(
+            f"Answer for session {session_id}: {count.commits} commit(s), "
+            f"{count.statements} statement(s)"
+        )
+        return result
+    
+    async def _submit_answer(
+        self,
+        session_id: int,
+        question_id: Optional[UUID],
+        answer_type: str,
+        text: Optional[str],
+        selected_option_id: Optional[str],
+        deadline: Optional[Deadline],
+        shed_level: int,
+        on_event: Optional[EventCallback]
     ) -> NextQuestionResponse:
-        """Submit an answer and get next question or follow-up."""
+        """
+        One unit of work per answer: rows are collected while the answer is
+        processed and written in a single transaction at the end. The
+        follow-up LLM call runs with no transaction open.
+        """
+        state = self._load_state(session_id)
+        version = survey_cache.get_version(self.db, state.survey_version_id)
         
-        session = self.db.query(SessionModel).filter(SessionModel.id == session_id).first()
-        if not session:
-            raise ValueError(f"Session {session_id} not found")
+        rows = []  # inserted together in the final commit
+        exchanges = []  # summary jobs, queued in the same commit
         
         # Get current question
         question = None
         if question_id:
-            question = self.db.query(Question).filter(Question.id == question_id).first()
+            question = version.questions_by_id.get(question_id)
+            if question and question.position != state.current_question_index:
+                # Cached state may be stale if another worker served this session
+                state = self._load_state(session_id, refresh=True)
         
         # Handle follow-up answers
         if answer_type == "follow_up_answer":
+            # Follow-up answers belong to the session's current question, which
+            # the server tracks (the web client sends no question_id), so the
+            # probe count, probe cap and probing policy apply to further probes
+            if question is None and state.current_question_index < len(version.questions):
+                question = version.questions[state.current_question_index]
+            
             # Save the follow-up conversation turn (use 'message' not 'message_text')
             if text:
-                turn = ConversationTurn(
+                rows.append(ConversationTurn(
                     session_id=session_id,
-                    respondent_id=session.respondent_id,
+                    question_id=self._current_question_id(state, version),
+                    respondent_id=state.respondent_id,
                     speaker="user",
-                    message_text=text  # 
-                )
-                self.db.add(turn)
-                self.db.commit()
-            
-            # After follow-up, move to next question
-            session.current_question_index += 1
+                    message_text=text
+                ))
+                state.history.append({"role": "user", "content": text})
+                exchange = self._followup_exchange(state, version, text)
+                if exchange:
+                    exchanges.append(exchange)
             
         else:
             # Regular answer - save it
@@ -139,53 +181,67 @@ class SessionService:
                 response = Response(
                     session_id=session_id,
                     question_id=question_id,
-                    respondent_id=session.respondent_id,
-                    answer=text or selected_option_id or ""
+                    respondent_id=state.respondent_id,
+                    answer=text or selected_option_id or "",
+                    selected_option_id=selected_option_id
                 )
-                self.db.add(response)
-                self.db.commit()
+                rows.append(response)
+                state.base_answer = response.answer
+                state.base_option_id = selected_option_id
+        
+        # Don't hold a pooled connection (or an open transaction) across the LLM call
+        self._end_read()
             
         # Check if we should ask a follow-up using the LLM agent
         if question and answer_type != "prefer_not_to_answer":
             # Get selected option text if applicable FIRST
             selected_option_text = None
             if selected_option_id and question.question_type == "single_choice":
-                # Need to load options relationship
-                from sqlalchemy.orm import joinedload
-                question_with_options = self.db.query(Question).options(
-                    joinedload(Question.options)
-                ).filter(Question.id == question_id).first()
-                
-                if question_with_options:
-                    option = next((opt for opt in question_with_options.options if str(opt.id) == selected_option_id), None)
-                    if option:
-                        selected_option_text = option.option_text
+                selected_option_text = question.option_text(selected_option_id)
             
             # Now check if we have any answer (text OR selected option)
             user_answer = text or selected_option_text
             
-            if user_answer:  # Only proceed if we have some answer
-                # Get conversation history for this question
-                conversation_history = self.db.query(ConversationTurn).filter(
-                    ConversationTurn.session_id == session_id
-                ).order_by(ConversationTurn.timestamp).all()
-                
-                probe_count = len([t for t in conversation_history if t.speaker == "assistant"])
-                
+            probe_count = state.probes_for(question.position)
+            if shed_level >= NO_PROBING:
+                shed_tag = NO_PROBE_TAG
+            elif shed_level >= CAP_PROBES and probe_count >= 1:
+                shed_tag = PROBE_CAP_TAG
+            else:
+                shed_tag = None
+            
+            if user_answer and not question.probing.allows_probe(probe_count):
+                # The question's probing policy rules out a follow-up: no agent, cache or LLM work
+                logger.info(f"Session {session_id}: no probing on question {question.position} (policy)")
+            
+            elif user_answer and shed_tag:
+                # Shedding load: no follow-up decision for this answer
+                self._shed(state, shed_tag)
+            
+            elif user_answer:  # Only proceed if we have some answer
                 # Call the follow-up agent
                 try:
+                    precomputed = None
+                    if probe_count == 0:
+                        precomputed = precomputed_followups.get(
+                            self.db, version, question, selected_option_id, user_answer
+                        )
                     followup_decision = await self.followup_agent.should_ask_followup(
                         question_text=question.question_text,
                         question_type=question.question_type,
                         user_answer=user_answer,
                         selected_option_text=selected_option_text,
-                        conversation_history=[
-                            {"role": t.speaker, "content": t.message_text}
-                            for t in conversation_history
-                        ],
+                        conversation_history=state.history,
                         probe_count=probe_count,
                         session_id=str(session_id),
-                        db=self.db
+                        db=self.db,
+                        deadline=deadline,
+                        on_event=on_event,
+                        question_id=str(question.id),
+                        use_cache=decision_cache.enabled_for(version, question),
+                        precomputed=precomputed,
+                        max_probes=question.probing.max_probes,
+                        model=question.probing.model
                     )
                     
                     logger.info(f"Follow-up decision: {followup_decision['action']}")
@@ -196,14 +252,19 @@ class SessionService:
                         
                         if followup_question:
                             # Save the follow-up question
-                            turn = ConversationTurn(
+                            rows.append(ConversationTurn(
                                 session_id=session_id,
-                                respondent_id=session.respondent_id,
+                                question_id=question.id,
+                                respondent_id=state.respondent_id,
                                 speaker="assistant",
                                 message_text=followup_question
-                            )
-                            self.db.add(turn)
-                            self.db.commit()
+                            ))
+                            self._commit_answer(state, version, rows, exchanges, advance_position=False)
+                            
+                            state.history.append({"role": "assistant", "content": followup_question})
+                            state.last_followup_question = followup_question
+                            state.probe_counts[str(question.position)] = probe_count + 1
+                            session_state_store.save(state)
                             
                             return NextQuestionResponse(
                                 message_type="follow_up_question",
@@ -213,79 +274,87 @@ class SessionService:
                 except Exception as e:
                     # Log error but don't fail - just continue to next question
                     logger.error(f"Follow-up agent error: {e}")
-                
-                # Update summary (save to SessionSummary table, not Session.summary)
-                try:
-                    followup_q = [t.message_text for t in conversation_history if t.speaker == "assistant"]
-                    followup_a = [t.message_text for t in conversation_history if t.speaker == "user"]
-                    
-                    summary_result = await self.summary_agent.update_summary(
-                        current_summary="",  # Get from SessionSummary if exists
-                        question_text=question.question_text,
-                        user_answer=user_answer,
-                        followup_questions=followup_q,
-                        followup_answers=followup_a,
-                        session_id=str(session_id),
-                        db=self.db
-                    )
-                    
-                    # Save to SessionSummary table
-                    existing_summary = self.db.query(SessionSummary).filter(
-                        SessionSummary.session_id == session_id
-                    ).first()
-                    
-                    if existing_summary:
-                        existing_summary.summary_text = summary_result.get("summary", "")
-                        existing_summary.key_themes = summary_result.get("key_themes", [])
-                    else:
-                        new_summary = SessionSummary(
-                            session_id=session_id,
-                            summary_text=summary_result.get("summary", ""),
-                            key_themes=summary_result.get("key_themes", [])
-                        )
-                        self.db.add(new_summary)
-                    
-                    self.db.commit()
-                    
-                except Exception as e:
-                    logger.error(f"Summary agent error: {e}")
             
-        # Move to next question
-        if answer_type != "follow_up_answer":
-            session.current_question_index += 1
+            if user_answer and question.probing.include_in_summary and answer_type != "follow_up_answer":
+                # Queue the summary update; the worker pool writes SessionSummary
+                # off the response path. Follow-up exchanges for this question
+                # are queued when the follow-up answer arrives (above).
+                exchanges.append({
+                    "question_text": question.question_text,
+                    "user_answer": user_answer,
+                    "followup_questions": [],
+                    "followup_answers": []
+                })
+        
+        if exchanges and shed_level >= SKIP_SUMMARIES:
+            self._shed(state, SKIP_SUMMARY_TAG)
+            exchanges = []
+            
+        # Move to next question (compiled skip logic, O(1) lookup), only now
+        # that no follow-up is being asked; the session row moves with it
+        if answer_type == "follow_up_answer":
+            # After follow-up, route on the original answer's skip logic
+            state.advance(version.next_index(
+                state.current_question_index,
+                option_id=state.base_option_id,
+                answer=state.base_answer
+            ))
+        else:
+            state.advance(version.next_index(
+                question.position if question else state.current_question_index,
+                option_id=selected_option_id,
+                answer=text,
+                prefer_not=answer_type == "prefer_not_to_answer"
+            ))
         
         # Get next question
-        questions = self.db.query(Question).filter(
-            Question.survey_version_id == session.survey_version_id
-        ).order_by(Question.position).all()
+        questions = version.questions
         
-        if session.current_question_index >= len(questions):
+        if state.current_question_index >= len(questions):
             # Survey completed
-            session.completed_at = datetime.now(timezone.utc)
-            session.status = "completed"
-            self.db.commit()
+            state.status = "completed"
+            self._commit_answer(
+                state, version, rows, exchanges,
+                completed_at=datetime.now(timezone.utc)
+            )
+            session_state_store.save(state)
+            
+            # Give the workers a moment to fold in the last exchanges
+            if self.summary_workers:
+                self.summary_workers.notify()
+                await self.summary_workers.wait_for_session(
+                    session_id, timeout=settings.summary_completion_wait_seconds
+                )
             
-            # Get final summary
-            final_summary = self.db.query(SessionSummary).filter(
-                SessionSummary.session_id == session_id
-            ).first()
+            # Final summary: kept in the session state by the workers
+            cached = session_state_store.get(session_id)
+            final_summary = cached.last_summary if cached else None
+            if final_summary is None:
+                summary_row = self.db.query(SessionSummary).filter(
+                    SessionSummary.session_id == session_id
+                ).first()
+                final_summary = summary_row.summary_text if summary_row else ""
+            session_state_store.discard(session_id)
             
             return NextQuestionResponse(
                 message_type="completed",
                 summary={
-                    "questions_answered": session.current_question_index,
-                    "duration_seconds": (datetime.now(timezone.utc) - session.started_at).total_seconds(),
-                    "session_summary": final_summary.summary_text if final_summary else ""
+                    "questions_answered": state.current_question_index,
+                    "duration_seconds": (datetime.now(timezone.utc) - state.started_at).total_seconds(),
+                    "session_summary": final_summary
                 }
             )
         
-        self.db.commit()
+        self._commit_answer(state, version, rows, exchanges)
+        session_state_store.save(state)
+        if self.summary_workers and exchanges:
+            self.summary_workers.notify()
         
         # Return next question
-        next_question = questions[session.current_question_index]
+        next_question = questions[state.current_question_index]
         return NextQuestionResponse(
             message_type="survey_question",
-            question=self._format_question(next_question)
+            question=next_question.response
         )
 
     def end_session(self, session_id: int, reason: str = "user_requested") -> Dict[str, Any]:
@@ -295,7 +364,12 @@ class SessionService:
             raise ValueError(f"Session {session_id} not found")
         
         session.completed_at = datetime.now(timezone.utc)
+        release_deferred(self.db, session_id)
         self.db.commit()
+        session_state_store.discard(session_id)
+        
+        if self.summary_workers:
+            self.summary_workers.notify()
         
         return {
             "message_type": "completed",
@@ -306,26 +380,149 @@ class SessionService:
         }
     
     
+    def _load_state(self, session_id: int, refresh: bool = False) -> SessionState:
+        """Hot session state from the cache, rebuilt from Postgres on a miss."""
+        if not refresh:
+            state = session_state_store.get(session_id)
+            if state is not None:
+                return state
+        
+        session = self.db.query(SessionModel).filter(SessionModel.id == session_id).first()
+        if not session:
+            raise ValueError(f"Session {session_id} not found")
+        
+        version = survey_cache.get_version(self.db, session.survey_version_id)
+        state = SessionState(
+            session_id=session.id,
+            survey_version_id=session.survey_version_id,
+            respondent_id=session.respondent_id,
+            started_at=session.started_at,
+            current_question_index=session.current_question_index or 0,
+            status=session.status or "in_progress"
+        )
+        
+        # Restore a pending follow-up on the current question, if any
+        if state.current_question_index < len(version.questions):
+            question = version.questions[state.current_question_index]
+            base_response = self.db.query(Response).filter(
+                Response.session_id == session_id,
+                Response.question_id == question.id
+            ).order_by(Response.id.desc()).first()
+            
+            if base_response:
+                state.base_answer = base_response.answer
+                state.base_option_id = base_response.selected_option_id
+                # Range scan on (session_id, question_id, id): this question's turns only
+                turns = self.db.query(ConversationTurn).filter(
+                    ConversationTurn.session_id == session_id,
+                    ConversationTurn.question_id == question.id,
+                    ConversationTurn.timestamp >= base_response.answered_at
+                ).order_by(ConversationTurn.id).all()
+                state.history = [{"role": t.speaker, "content": t.message_text} for t in turns]
+                assistant_turns = [t for t in turns if t.speaker == "assistant"]
+                if assistant_turns:
+                    state.last_followup_question = assistant_turns[-1].message_text
+                    state.probe_counts[str(question.position)] = len(assistant_turns)
+        
+        # Rebuilt from Postgres, so drop any stale store-owned fields too
+        state.running_cost_micro_usd = session.cost_micro_usd or 0
+        state.load_shed = dict(session.load_shed or {})
+        session_state_store.discard(session_id)
+        session_state_store.save(state)
+        
+        return state
+    
+    def _end_read(self):
+        """Release the connection checked out by reads, keeping unflushed rows pending."""
+        if self.db.in_transaction() and not (self.db.new or self.db.dirty or self.db.deleted):
+            self.db.commit()
+    
+    def _commit_answer(
+        self,
+        state: SessionState,
+        version: CachedSurveyVersion,
+        rows: List[Any],
+        exchanges: List[Dict[str, Any]],
+        advance_position: bool = True,
+        **extra
+    ):
+        """
+        Write everything produced by one answer in a single transaction:
+        new rows (batched per table by the ORM flush), any ModelCall rows the
+        LLM client added, summary jobs and the session position.
+        """
+        try:
+            self.db.add_all(rows)
+            for exchange in exchanges:
+                self._queue_summary(state, version, exchange)
+            if advance_position:
+                self._write_through(state, **extra)
+                if state.status == "completed":
+                    release_deferred(self.db, state.session_id)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            session_state_store.discard(state.session_id)
+            raise
+    
+    def _write_through(self, state: SessionState, **extra):
+        """Mirror the state's durable fields onto the sessions row (committed by the caller)."""
+        self.db.query(SessionModel).filter(SessionModel.id == state.session_id).update(
+            {
+                "current_question_index": state.current_question_index,
+                "status": state.status,
+                "load_shed": state.load_shed or None,
+                **extra
+            },
+            synchronize_session=False
+        )
+    
+    def _shed(self, state: SessionState, tag: str):
+        """Count a load-shedding decision on the session (written through with the answer)."""
+        state.load_shed[tag] = state.load_shed.get(tag, 0) + 1
+        load_shedder.record(tag)
+        logger.info(f"Session {state.session_id}: shed {tag} under load")
+    
+    def _queue_summary(
+        self,
+        state: SessionState,
+        version: CachedSurveyVersion,
+        exchange: Dict[str, Any]
+    ):
+        """Queue an exchange using the survey's summary strategy (committed by the caller)."""
+        enqueue_summary(
+            self.db,
+            state.session_id,
+            exchange,
+            strategy=version.survey_meta.get("summary_strategy", "per_answer"),
+            every_n=version.survey_meta.get("summary_every_n", DEFAULT_SUMMARY_EVERY_N)
+        )
+    
+    def _followup_exchange(
+        self,
+        state: SessionState,
+        version: CachedSurveyVersion,
+        followup_answer: str
+    ) -> Optional[Dict[str, Any]]:
+        """The completed follow-up exchange for the current question."""
+        if state.current_question_index >= len(version.questions):
+            return None
+        question = version.questions[state.current_question_index]
+        if not question.probing.include_in_summary:
+            return None
+        
+        return {
+            "question_text": question.question_text,
+            "user_answer": state.base_answer or "",
+            "followup_questions": [state.last_followup_question] if state.last_followup_question else [],
+            "followup_answers": [followup_answer]
+        }
+    
+    def _current_question_id(self, state: SessionState, version: CachedSurveyVersion) -> Optional[UUID]:
+        if state.current_question_index >= len(version.questions):
+            return None
+        return version.questions[state.current_question_index].id
+    
     def _generate_respondent_id(self) -> str:
         """Generate a unique respondent ID."""
         return f"resp_{uuid.uuid4().hex[:16]}"
-    
-    def _format_question(self, question: Question) -> QuestionResponse:
-        """Format a question for the API response."""
-        options = None
-        if question.question_type == "single_choice":
-            options = [
-                QuestionOption(
-                    option_id=str(opt.id),
-                    text=opt.option_text
-                )
-                for opt in question.options
-            ]
-        
-        return QuestionResponse(
-            question_id=question.id,
-            question_type=question.question_type,
-            question_text=question.question_text,
-            position=question.position,
-            options=options
-        )
\ No newline at end of file
@@ -0,0 +1,222 @@
+from typing import Dict, Any, List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from uuid import UUID
+import copy
+import threading
+
+from app.config import settings
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Fields owned by the store itself (updated by the LLM client and summary
+# workers while a request holds its own copy), never overwritten by save().
+STORE_OWNED_FIELDS = ("running_cost_micro_usd", "last_summary")
+
+
+@dataclass
+class SessionState:
+    """Hot per-session state needed to answer without re-reading the session."""
+    session_id: int
+    survey_version_id: UUID
+    respondent_id: str
+    started_at: datetime
+    current_question_index: int = 0
+    status: str = "in_progress"
+    probe_counts: Dict[str, int] = field(default_factory=dict)  # question position -> probes asked
+    history: List[Dict[str, str]] = field(default_factory=list)  # follow-up turns for the current question
+    base_answer: Optional[str] = None  # stored answer to the current question
+    base_option_id: Optional[str] = None  # option chosen in that answer; skip logic routes on it after follow-ups
+    last_followup_question: Optional[str] = None
+    running_cost_micro_usd: int = 0  # mirrors sessions.cost_micro_usd
+    last_summary: Optional[str] = None
+    load_shed: Dict[str, int] = field(default_factory=dict)  # mirrors sessions.load_shed
+
+    def probes_for(self, position: int) -> int:
+        return self.probe_counts.get(str(position), 0)
+
+    def advance(self, next_index: int):
+        """Move to another question and drop the per-question scratch state."""
+        self.current_question_index = next_index
+        self.history = []
+        self.base_answer = None
+        self.base_option_id = None
+        self.last_followup_question = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionState":
+        return cls(**copy.deepcopy(data))
+
+
+class SessionStateBackend(ABC):
+    """Shared state tier (e.g. Redis) behind the in-process LRU."""
+
+    @abstractmethod
+    def get(self, session_id: int) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, session_id: int, data: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: int):
+        ...
+
+
+class LocalSessionStateBackend(SessionStateBackend):
+    """In-process stand-in for a shared backend; fine for a single API worker."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._data.get(session_id)
+            return copy.deepcopy(data) if data is not None else None
+
+    def set(self, session_id: int, data: Dict[str, Any]):
+        with self._lock:
+            self._data[session_id] = copy.deepcopy(data)
+            self._data.move_to_end(session_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, session_id: int):
+        with self._lock:
+            self._data.pop(session_id, None)
+
+
+BACKENDS = {
+    "local": LocalSessionStateBackend,
+}
+
+
+class SessionStateStore:
+    """
+    Bounded in-process LRU of SessionState in front of a pluggable shared
+    backend. Postgres stays the source of truth: SessionService writes every
+    change through to the sessions table and rebuilds state from it on a miss.
+    Callers always get their own copy; save() publishes it back.
+    """
+
+    def __init__(self, max_entries: int, backend: Optional[SessionStateBackend] = None):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._lru: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+
+    def get(self, session_id: int) -> Optional[SessionState]:
+        with self._lock:
+            data = self._lru.get(session_id)
+            if data is not None:
+                self._lru.move_to_end(session_id)
+                self.hits += 1
+                return SessionState.from_dict(data)
+
+        data = self.backend.get(session_id) if self.backend else None
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.backend_hits += 1
+            self._put_local(session_id, data)
+        return SessionState.from_dict(data)
+
+    def save(self, state: SessionState):
+        data = state.to_dict()
+        with self._lock:
+            existing = self._lru.get(state.session_id)
+        if existing is None and self.backend:
+            existing = self.backend.get(state.session_id)
+        with self._lock:
+            if existing is not None:
+                for key in STORE_OWNED_FIELDS:
+                    data[key] = existing[key]
+            self._put_local(state.session_id, data)
+        if self.backend:
+            self.backend.set(state.session_id, data)
+
+    def add_cost(self, session_id: int, cost_micro_usd: int):
+        self._update(session_id, lambda data: data.update(
+            running_cost_micro_usd=data["running_cost_micro_usd"] + cost_micro_usd
+        ))
+
+    def set_summary(self, session_id: int, summary_text: str):
+        self._update(session_id, lambda data: data.update(last_summary=summary_text))
+
+    def cost_for(self, session_id: int) -> Optional[int]:
+        """Running LLM cost (micro-dollars) for a cached session, or None if not cached."""
+        with self._lock:
+            data = self._lru.get(session_id)
+            return data["running_cost_micro_usd"] if data is not None else None
+
+    def discard(self, session_id: int):
+        with self._lock:
+            self._lru.pop(session_id, None)
+        if self.backend:
+            self.backend.delete(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.backend_hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "backend_hits": self.backend_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.backend_hits) / lookups, 4) if lookups else None
+            }
+
+    def _update(self, session_id: int, apply):
+        with self._lock:
+            cached = session_id in self._lru
+        if not cached:
+            data = self.backend.get(session_id) if self.backend else None
+            if data is None:
+                return
+            with self._lock:
+                self._lru.setdefault(session_id, data)
+
+        with self._lock:
+            data = self._lru.get(session_id)
+            if data is None:
+                return
+            apply(data)
+            snapshot = copy.deepcopy(data)
+        if self.backend:
+            self.backend.set(session_id, snapshot)
+
+    def _put_local(self, session_id: int, data: Dict[str, Any]):
+        self._lru[session_id] = data
+        self._lru.move_to_end(session_id)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+
+def _build_backend() -> Optional[SessionStateBackend]:
+    backend_cls = BACKENDS.get(settings.session_state_backend)
+    if backend_cls is None:
+        logger.warning(f"Unknown session state backend '{settings.session_state_backend}', using LRU only")
+        return None
+    return backend_cls(max_entries=settings.session_state_backend_max_entries)
+
+
+session_state_store = SessionStateStore(
+    max_entries=settings.session_state_cache_size,
+    backend=_build_backend()
+)
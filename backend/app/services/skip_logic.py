@@ -0,0 +1,225 @@
+from typing import Dict, Any, List, Optional, Tuple
+from dataclasses import dataclass, field
+import ast
+import re
+
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+END_TARGET = "end"
+
+# Supported conditions:
+#   always
+#   prefer_not_to_answer
+#   answer == "Very negative"          answer != "Neutral"
+#   answer in ["Very negative", ...]   answer not in [...]
+#   score >= 4                         (==, !=, >, >=, <, <=)
+CONDITION_RE = re.compile(
+    r"^\s*(?P<subject>answer|score)\s*(?P<op>==|!=|>=|<=|>|<|not\s+in|in)\s*(?P<value>.+?)\s*$"
+)
+
+SCORE_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+class SkipLogicError(ValueError):
+    """Invalid skip logic in a survey definition."""
+
+
+@dataclass(frozen=True)
+class Condition:
+    kind: str  # 'always', 'prefer_not_to_answer', 'compare'
+    subject: Optional[str] = None  # 'answer' or 'score'
+    op: Optional[str] = None
+    value: Any = None
+
+
+@dataclass(frozen=True)
+class Transition:
+    """Precomputed routing for one question: every lookup is a dict hit."""
+    default: int
+    by_option: Dict[int, int] = field(default_factory=dict)  # option position -> next index
+    by_answer: Dict[str, int] = field(default_factory=dict)  # normalized free-text answer -> next index
+    on_prefer_not: Optional[int] = None
+
+    def next_index(
+        self,
+        option_position: Optional[int] = None,
+        answer: Optional[str] = None,
+        prefer_not: bool = False
+    ) -> int:
+        if prefer_not:
+            return self.on_prefer_not if self.on_prefer_not is not None else self.default
+        if option_position is not None:
+            return self.by_option.get(option_position, self.default)
+        if answer and self.by_answer:
+            return self.by_answer.get(normalize_answer(answer), self.default)
+        return self.default
+
+
+def normalize_answer(text: str) -> str:
+    return " ".join(text.split()).casefold()
+
+
+def parse_condition(text: str) -> Condition:
+    """Parse a skip logic condition string."""
+    stripped = (text or "").strip()
+    if stripped == "always":
+        return Condition(kind="always")
+    if stripped == "prefer_not_to_answer":
+        return Condition(kind="prefer_not_to_answer")
+
+    match = CONDITION_RE.match(stripped)
+    if not match:
+        raise SkipLogicError(f"Unrecognized skip logic condition: {text!r}")
+
+    subject = match.group("subject")
+    op = " ".join(match.group("op").split())
+
+    try:
+        value = ast.literal_eval(match.group("value"))
+    except (ValueError, SyntaxError):
+        raise SkipLogicError(f"Invalid value in skip logic condition: {text!r}")
+
+    if op in ("in", "not in"):
+        if not isinstance(value, (list, tuple)) or not value:
+            raise SkipLogicError(f"'{op}' needs a non-empty list: {text!r}")
+        if subject == "score":
+            raise SkipLogicError(f"'score' only supports comparison operators: {text!r}")
+    elif subject == "score" and not isinstance(value, (int, float)):
+        raise SkipLogicError(f"'score' must be compared with a number: {text!r}")
+    elif subject == "answer" and op not in ("==", "!="):
+        raise SkipLogicError(f"'answer' only supports ==, !=, in, not in: {text!r}")
+    elif subject == "answer" and not isinstance(value, str):
+        raise SkipLogicError(f"'answer' must be compared with a string: {text!r}")
+
+    return Condition(kind="compare", subject=subject, op=op, value=value)
+
+
+def compile_skip_logic(questions: List[Dict[str, Any]]) -> Tuple[Transition, ...]:
+    """
+    Compile per-question skip logic into a transition table indexed by
+    question position. `questions` are definition dicts in survey order
+    (QuestionDefinition.dict() / SurveyVersion.json_definition["questions"]).
+    Index len(questions) means the survey is complete.
+    """
+    end_index = len(questions)
+    positions_by_id: Dict[str, int] = {}
+    for idx, q in enumerate(questions):
+        qid = q.get("id")
+        if qid is None:
+            continue
+        if qid in positions_by_id:
+            raise SkipLogicError(f"Duplicate question id '{qid}'")
+        if qid == END_TARGET:
+            raise SkipLogicError(f"'{END_TARGET}' is reserved and cannot be a question id")
+        positions_by_id[qid] = idx
+
+    transitions = []
+    for idx, q in enumerate(questions):
+        default = idx + 1
+        rule = q.get("skip_logic")
+        if not rule:
+            transitions.append(Transition(default=default))
+            continue
+
+        label = q.get("id") or f"#{idx}"
+        try:
+            condition = parse_condition(rule.get("condition"))
+        except SkipLogicError as e:
+            raise SkipLogicError(f"Question {label}: {e}")
+
+        target = _resolve_target(rule.get("target_question"), idx, end_index, positions_by_id, label)
+        transitions.append(_compile_question(q, condition, target, default, label))
+
+    return tuple(transitions)
+
+
+def _resolve_target(
+    target: Optional[str],
+    idx: int,
+    end_index: int,
+    positions_by_id: Dict[str, int],
+    label: str
+) -> int:
+    if not target:
+        raise SkipLogicError(f"Question {label}: skip logic needs a target_question")
+    if target == END_TARGET:
+        return end_index
+    if target not in positions_by_id:
+        raise SkipLogicError(f"Question {label}: unknown target_question '{target}'")
+
+    position = positions_by_id[target]
+    if position <= idx:
+        # Forward-only jumps keep every interview finite
+        raise SkipLogicError(f"Question {label}: target_question '{target}' must come later in the survey")
+    return position
+
+
+def _compile_question(
+    q: Dict[str, Any],
+    condition: Condition,
+    target: int,
+    default: int,
+    label: str
+) -> Transition:
+    if condition.kind == "always":
+        return Transition(default=target)
+
+    if condition.kind == "prefer_not_to_answer":
+        if not q.get("allow_prefer_not_to_answer"):
+            logger.warning(f"Question {label}: prefer_not_to_answer skip on a question that doesn't allow it")
+        return Transition(default=default, on_prefer_not=target)
+
+    if q.get("type") == "single_choice":
+        options = q.get("options") or []
+        if not options:
+            raise SkipLogicError(f"Question {label}: single_choice skip logic needs options")
+
+        if condition.subject == "answer":
+            wanted = condition.value if condition.op in ("in", "not in") else [condition.value]
+            known = {normalize_answer(opt["text"]) for opt in options}
+            for text in wanted:
+                if normalize_answer(str(text)) not in known:
+                    raise SkipLogicError(f"Question {label}: '{text}' is not one of the options")
+        elif all(opt.get("score") is None for opt in options):
+            raise SkipLogicError(f"Question {label}: score condition but no option has a score")
+
+        by_option = {
+            opt["position"]: target
+            for opt in options
+            if _option_matches(condition, opt)
+        }
+        return Transition(default=default, by_option=by_option)
+
+    # Free text: only exact matches can be precomputed
+    if condition.subject != "answer" or condition.op not in ("==", "in"):
+        raise SkipLogicError(
+            f"Question {label}: {q.get('type')} questions only support answer ==/in conditions"
+        )
+    values = condition.value if condition.op == "in" else [condition.value]
+    return Transition(
+        default=default,
+        by_answer={normalize_answer(str(v)): target for v in values}
+    )
+
+
+def _option_matches(condition: Condition, option: Dict[str, Any]) -> bool:
+    if condition.subject == "score":
+        score = option.get("score")
+        return score is not None and SCORE_OPS[condition.op](score, condition.value)
+
+    text = normalize_answer(option["text"])
+    if condition.op == "==":
+        return text == normalize_answer(condition.value)
+    if condition.op == "!=":
+        return text != normalize_answer(condition.value)
+    values = {normalize_answer(str(v)) for v in condition.value}
+    return (text in values) if condition.op == "in" else (text not in values)
@@ -0,0 +1,320 @@
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models import SummaryJob, SessionSummary
+from app.agents.summary_agent import SummaryAgent
+from app.services.session_state import session_state_store
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+SUMMARY_STRATEGIES = ("per_answer", "every_n", "on_completion")
+
+# Sessions considered per claim when the oldest ones are taken by other workers
+CLAIM_CANDIDATES = 10
+
+
+def enqueue_summary(
+    db: Session,
+    session_id: int,
+    exchange: Dict[str, Any],
+    strategy: str = "per_answer",
+    every_n: int = 1
+) -> SummaryJob:
+    """
+    Queue an exchange for summarization. Does not commit - the job is
+    written in the caller's transaction so it is durable with the answer.
+    """
+    if strategy not in SUMMARY_STRATEGIES:
+        logger.warning(f"Unknown summary strategy '{strategy}', using per_answer")
+        strategy = "per_answer"
+
+    job = SummaryJob(
+        session_id=session_id,
+        status="pending" if strategy == "per_answer" else "deferred",
+        exchange=exchange,
+        attempts=0
+    )
+    db.add(job)
+    db.flush()
+
+    if strategy == "every_n":
+        deferred = db.query(SummaryJob).filter(
+            SummaryJob.session_id == session_id,
+            SummaryJob.status == "deferred"
+        ).count()
+        if deferred >= every_n:
+            release_deferred(db, session_id)
+
+    return job
+
+
+def release_deferred(db: Session, session_id: int) -> int:
+    """Make a session's deferred jobs runnable (N reached or session finished)."""
+    return db.query(SummaryJob).filter(
+        SummaryJob.session_id == session_id,
+        SummaryJob.status == "deferred"
+    ).update({"status": "pending"}, synchronize_session=False)
+
+
+def has_outstanding(db: Session, session_id: int) -> bool:
+    return db.query(SummaryJob.id).filter(
+        SummaryJob.session_id == session_id,
+        SummaryJob.status.in_(("pending", "running"))
+    ).first() is not None
+
+
+class SummaryWorkerPool:
+    """
+    In-process asyncio workers draining the summary_jobs table.
+    Jobs are claimed with SKIP LOCKED so several API processes can share
+    the queue; all pending jobs for a session are coalesced into one call,
+    and a session is summarized by one worker at a time. Jobs left running
+    by a crashed worker are requeued every SUMMARY_REQUEUE_INTERVAL_SECONDS.
+    """
+
+    def __init__(self, summary_agent: SummaryAgent, worker_count: Optional[int] = None):
+        self.summary_agent = summary_agent
+        self.worker_count = worker_count or settings.summary_worker_count
+        self._tasks: List[asyncio.Task] = []
+        self._requeue_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._session_done: Dict[int, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._requeue_stale()
+        self._tasks = [
+            asyncio.create_task(self._run(i), name=f"summary-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+        self._requeue_task = asyncio.create_task(self._requeue_loop(), name="summary-requeue")
+        logger.info(f"Summary worker pool started with {self.worker_count} workers")
+
+    async def stop(self):
+        self._stopping = True
+        tasks = self._tasks + ([self._requeue_task] if self._requeue_task else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._requeue_task = None
+        logger.info("Summary worker pool stopped")
+
+    def notify(self):
+        """Wake idle workers. Safe to call from sync routes running in a threadpool."""
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError:
+            pass  # loop already closed during shutdown
+
+    async def wait_for_session(self, session_id: int, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for a session's queued summaries to finish."""
+        deadline = time.monotonic() + timeout
+        event = self._session_done.setdefault(session_id, asyncio.Event())
+        try:
+            while True:
+                db = SessionLocal()
+                try:
+                    if not has_outstanding(db, session_id):
+                        return True
+                finally:
+                    db.close()
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                try:
+                    # Re-check the table periodically in case another process drained it
+                    await asyncio.wait_for(event.wait(), timeout=min(remaining, 0.25))
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+        finally:
+            self._session_done.pop(session_id, None)
+
+    async def _run(self, worker_id: int):
+        while not self._stopping:
+            try:
+                processed = await self._process_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Summary worker {worker_id} error: {e}")
+                processed = False
+
+            if not processed:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=settings.summary_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def _process_next(self) -> bool:
+        db = SessionLocal()
+        try:
+            batch = self._claim_batch(db)
+            if not batch:
+                return False
+
+            session_id, job_ids, exchanges = batch
+            existing = db.query(SessionSummary).filter(
+                SessionSummary.session_id == session_id
+            ).first()
+            current_summary = existing.summary_text if existing else ""
+            db.commit()
+
+            result = await self.summary_agent.summarize_exchanges(
+                current_summary=current_summary,
+                exchanges=exchanges,
+                session_id=str(session_id),
+                db=db
+            )
+
+            jobs = db.query(SummaryJob).filter(SummaryJob.id.in_(job_ids))
+            if result.get("error") == "circuit_open":
+                # Nothing was sent: hand the jobs back without using up an attempt
+                # and idle until the next poll rather than spinning on the queue
+                jobs.update(
+                    {"status": "pending", "attempts": SummaryJob.attempts - 1},
+                    synchronize_session=False
+                )
+                db.commit()
+                return False
+            elif result.get("error"):
+                jobs.filter(SummaryJob.attempts >= settings.summary_job_max_attempts).update(
+                    {"status": "failed", "last_error": result["error"]}, synchronize_session=False
+                )
+                jobs.filter(SummaryJob.status == "running").update(
+                    {"status": "pending", "last_error": result["error"]}, synchronize_session=False
+                )
+                db.commit()
+                logger.warning(f"Summary batch for session {session_id} failed ({result['error']})")
+            else:
+                self._save_summary(db, session_id, result)
+                jobs.update(
+                    {"status": "done", "completed_at": datetime.now(timezone.utc)},
+                    synchronize_session=False
+                )
+                db.commit()
+                session_state_store.set_summary(session_id, result.get("summary", ""))
+                logger.info(f"Summarized {len(job_ids)} exchange(s) for session {session_id}")
+
+            self._signal_session(session_id)
+            return True
+
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _claim_batch(self, db: Session) -> Optional[Tuple[int, List[int], List[Dict[str, Any]]]]:
+        """
+        Claim all pending jobs of the session with the oldest pending job,
+        skipping sessions that already have a job running: two batches for
+        one session would both start from the same current_summary and the
+        later write would drop the other's exchanges. On Postgres the
+        check-and-claim holds a transaction-level advisory lock on the
+        session id, so workers in other processes can't claim it in between.
+        """
+        running = select(SummaryJob.session_id).where(SummaryJob.status == "running")
+        candidates = db.query(SummaryJob.session_id).filter(
+            SummaryJob.status == "pending",
+            SummaryJob.session_id.not_in(running)
+        ).group_by(SummaryJob.session_id).order_by(func.min(SummaryJob.id)).limit(CLAIM_CANDIDATES).all()
+
+        for (session_id,) in candidates:
+            if not self._lock_session(db, session_id):
+                continue  # another worker is claiming it right now
+
+            # Re-check under the lock: a claim may have committed since the candidate query
+            if db.query(SummaryJob.id).filter(
+                SummaryJob.session_id == session_id,
+                SummaryJob.status == "running"
+            ).first() is not None:
+                continue
+
+            jobs = db.query(SummaryJob).filter(
+                SummaryJob.session_id == session_id,
+                SummaryJob.status == "pending"
+            ).order_by(SummaryJob.id).with_for_update(skip_locked=True).all()
+            if not jobs:
+                continue
+
+            batch = (session_id, [job.id for job in jobs], [job.exchange for job in jobs])
+
+            now = datetime.now(timezone.utc)
+            for job in jobs:
+                job.status = "running"
+                job.claimed_at = now
+                job.attempts = (job.attempts or 0) + 1
+            db.commit()  # also releases the advisory lock
+            return batch
+
+        db.rollback()
+        return None
+
+    def _lock_session(self, db: Session, session_id: int) -> bool:
+        """Try the session's advisory lock (Postgres; held until the claim commits)."""
+        if db.bind.dialect.name != "postgresql":
+            return True
+        return bool(db.execute(select(func.pg_try_advisory_xact_lock(session_id))).scalar())
+
+    def _save_summary(self, db: Session, session_id: int, result: Dict[str, Any]):
+        existing = db.query(SessionSummary).filter(
+            SessionSummary.session_id == session_id
+        ).first()
+
+        if existing:
+            existing.summary_text = result.get("summary", "")
+            existing.key_themes = result.get("key_themes", [])
+        else:
+            db.add(SessionSummary(
+                session_id=session_id,
+                summary_text=result.get("summary", ""),
+                key_themes=result.get("key_themes", [])
+            ))
+
+    def _signal_session(self, session_id: int):
+        event = self._session_done.get(session_id)
+        if event is not None:
+            event.set()
+
+    async def _requeue_loop(self):
+        while not self._stopping:
+            await asyncio.sleep(settings.summary_requeue_interval_seconds)
+            if self._requeue_stale():
+                self.notify()
+
+    def _requeue_stale(self) -> int:
+        """Return jobs left 'running' by a crashed worker or process to the queue."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.summary_job_stale_seconds)
+        db = SessionLocal()
+        try:
+            count = db.query(SummaryJob).filter(
+                SummaryJob.status == "running",
+                SummaryJob.claimed_at < cutoff
+            ).update({"status": "pending"}, synchronize_session=False)
+            db.commit()
+            if count:
+                logger.warning(f"Requeued {count} stale summary jobs")
+            return count
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to requeue stale summary jobs: {e}")
+            return 0
+        finally:
+            db.close()
@@ -0,0 +1,280 @@
+from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from uuid import UUID
+import threading
+import time
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import settings
+from app.models import Survey, SurveyVersion, Question
+from app.schemas import QuestionResponse, QuestionOption
+from app.services.skip_logic import Transition, SkipLogicError, compile_skip_logic, normalize_answer
+from app.services.probing_policy import ProbingPolicy, ProbingPolicyError, DEFAULT_POLICY, compile_probing_policy
+from app.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedOption:
+    id: UUID
+    text: str
+    position: int
+    score: Optional[int]
+
+
+@dataclass(frozen=True)
+class CachedQuestion:
+    id: UUID
+    question_type: str
+    question_text: str
+    position: int
+    options: Tuple[CachedOption, ...]
+    skip_logic: Optional[Dict[str, Any]]
+    metadata: Optional[Dict[str, Any]]
+    response: QuestionResponse  # Prebuilt API payload - never mutate
+    definition_id: Optional[str] = None  # 'id' from the survey JSON, if set
+    probing: ProbingPolicy = DEFAULT_POLICY  # Compiled "probing" block
+    options_by_id: Dict[str, CachedOption] = field(default_factory=dict, repr=False)
+    options_by_text: Dict[str, CachedOption] = field(default_factory=dict, repr=False)
+
+    def option_text(self, option_id: Optional[str]) -> Optional[str]:
+        option = self.options_by_id.get(option_id) if option_id else None
+        return option.text if option else None
+
+    def option_position(self, option_id: Optional[str] = None, text: Optional[str] = None) -> Optional[int]:
+        """Position of the chosen option, by id or (for stored answers) by text."""
+        option = self.options_by_id.get(option_id) if option_id else None
+        if option is None and text:
+            option = self.options_by_text.get(normalize_answer(text))
+        return option.position if option else None
+
+
+@dataclass(frozen=True)
+class CachedSurveyVersion:
+    version_id: UUID
+    survey_id: UUID
+    survey_name: str
+    version_number: int
+    survey_meta: Dict[str, Any]
+    questions: Tuple[CachedQuestion, ...]
+    transitions: Tuple[Transition, ...]  # Compiled skip logic, indexed by question position
+    questions_by_id: Dict[UUID, CachedQuestion] = field(default_factory=dict, repr=False)
+
+    def next_index(
+        self,
+        position: int,
+        option_id: Optional[str] = None,
+        answer: Optional[str] = None,
+        prefer_not: bool = False
+    ) -> int:
+        """Index of the question to ask after answering the one at `position`."""
+        if position >= len(self.transitions):
+            return position + 1
+        question = self.questions[position]
+        option_position = None
+        if question.question_type == "single_choice":
+            option_position = question.option_position(option_id, answer)
+        return self.transitions[position].next_index(
+            option_position=option_position,
+            answer=answer,
+            prefer_not=prefer_not
+        )
+
+
+class SurveyDefinitionCache:
+    """
+    Process-wide cache of immutable survey versions (questions, options and
+    preformatted QuestionResponse payloads).
+
+    Versions never change once ingested, so they are cached until evicted
+    (LRU, bounded by max_versions). The survey name -> current version
+    mapping is what changes on ingest: it is invalidated in-process by
+    SurveyService.ingest_survey and re-resolved after current_ttl_seconds
+    so ingests from another process (load_survey.py) are picked up too.
+    """
+
+    def __init__(self, max_versions: int, current_ttl_seconds: float):
+        self.max_versions = max_versions
+        self.current_ttl_seconds = current_ttl_seconds
+        self._versions: "OrderedDict[UUID, CachedSurveyVersion]" = OrderedDict()
+        self._current: Dict[str, Tuple[UUID, float]] = {}
+        self._lock = threading.Lock()
+        self.version_hits = 0
+        self.version_misses = 0
+        self.current_hits = 0
+        self.current_misses = 0
+        self.evictions = 0
+
+    def get_current(self, db: Session, survey_name: str) -> CachedSurveyVersion:
+        """Resolve the current version of a survey by name."""
+        with self._lock:
+            entry = self._current.get(survey_name)
+            if entry and time.monotonic() - entry[1] < self.current_ttl_seconds:
+                self.current_hits += 1
+                version_id = entry[0]
+            else:
+                self.current_misses += 1
+                version_id = None
+
+        if version_id is None:
+            row = db.query(SurveyVersion.id).join(
+                Survey, Survey.id == SurveyVersion.survey_id
+            ).filter(
+                Survey.name == survey_name,
+                SurveyVersion.is_current.is_(True)
+            ).first()
+
+            if not row:
+                raise ValueError(f"No active version found for survey '{survey_name}'")
+
+            version_id = row.id
+            with self._lock:
+                self._current[survey_name] = (version_id, time.monotonic())
+
+        return self.get_version(db, version_id)
+
+    def get_version(self, db: Session, version_id: UUID) -> CachedSurveyVersion:
+        """Get a survey version by id, loading it on first use."""
+        with self._lock:
+            cached = self._versions.get(version_id)
+            if cached is not None:
+                self._versions.move_to_end(version_id)
+                self.version_hits += 1
+                return cached
+            self.version_misses += 1
+
+        cached = self._load_version(db, version_id)
+
+        with self._lock:
+            self._versions[version_id] = cached
+            self._versions.move_to_end(version_id)
+            while len(self._versions) > self.max_versions:
+                self._versions.popitem(last=False)
+                self.evictions += 1
+
+        return cached
+
+    def invalidate(self, survey_name: Optional[str] = None):
+        """Drop the current-version mapping for one survey (or all surveys)."""
+        with self._lock:
+            if survey_name is None:
+                self._current.clear()
+            else:
+                self._current.pop(survey_name, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.version_hits + self.version_misses
+            return {
+                "versions_cached": len(self._versions),
+                "max_versions": self.max_versions,
+                "version_hits": self.version_hits,
+                "version_misses": self.version_misses,
+                "current_hits": self.current_hits,
+                "current_misses": self.current_misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.version_hits / lookups, 4) if lookups else None
+            }
+
+    def _load_version(self, db: Session, version_id: UUID) -> CachedSurveyVersion:
+        version = db.query(SurveyVersion).options(
+            selectinload(SurveyVersion.survey)
+        ).filter(SurveyVersion.id == version_id).first()
+
+        if not version:
+            raise ValueError(f"Survey version {version_id} not found")
+
+        questions = db.query(Question).options(
+            selectinload(Question.options)
+        ).filter(
+            Question.survey_version_id == version_id
+        ).order_by(Question.position).all()
+
+        question_defs = (version.json_definition or {}).get("questions", [])
+        cached_questions = tuple(
+            self._build_question(q, question_defs[q.position] if q.position < len(question_defs) else {})
+            for q in questions
+        )
+        transitions = self._compile_transitions(version, len(cached_questions))
+
+        logger.info(
+            f"Cached survey '{version.survey.name}' v{version.version_number} "
+            f"({len(cached_questions)} questions)"
+        )
+
+        return CachedSurveyVersion(
+            version_id=version.id,
+            survey_id=version.survey_id,
+            survey_name=version.survey.name,
+            version_number=version.version_number,
+            survey_meta=dict((version.json_definition or {}).get("survey", {})),
+            questions=cached_questions,
+            transitions=transitions,
+            questions_by_id={q.id: q for q in cached_questions}
+        )
+
+    def _compile_transitions(self, version: SurveyVersion, question_count: int) -> Tuple[Transition, ...]:
+        question_defs = (version.json_definition or {}).get("questions", [])
+        try:
+            if len(question_defs) != question_count:
+                raise SkipLogicError("definition and question rows disagree")
+            return compile_skip_logic(question_defs)
+        except SkipLogicError as e:
+            # Versions ingested before validation existed fall back to linear order
+            logger.error(f"Ignoring skip logic for survey version {version.id}: {e}")
+            return tuple(Transition(default=i + 1) for i in range(question_count))
+
+    def _compile_probing(self, question: Question, definition: Dict[str, Any]) -> ProbingPolicy:
+        try:
+            return compile_probing_policy(definition.get("probing"), where=f"question {question.id}")
+        except ProbingPolicyError as e:
+            # e.g. a model tier removed from FOLLOWUP_MODEL_TIERS since ingest
+            logger.error(f"Ignoring probing policy: {e}")
+            return DEFAULT_POLICY
+
+    def _build_question(self, question: Question, definition: Dict[str, Any]) -> CachedQuestion:
+        options = tuple(
+            CachedOption(
+                id=opt.id,
+                text=opt.option_text,
+                position=opt.position,
+                score=opt.score
+            )
+            for opt in sorted(question.options, key=lambda o: o.position)
+        )
+
+        response_options = None
+        if question.question_type == "single_choice":
+            response_options = [
+                QuestionOption(option_id=str(opt.id), text=opt.text)
+                for opt in options
+            ]
+
+        return CachedQuestion(
+            id=question.id,
+            question_type=question.question_type,
+            question_text=question.question_text,
+            position=question.position,
+            options=options,
+            skip_logic=question.skip_logic,
+            metadata=question.metadata_json,
+            response=QuestionResponse(
+                question_id=question.id,
+                question_type=question.question_type,
+                question_text=question.question_text,
+                position=question.position,
+                options=response_options
+            ),
+            definition_id=definition.get("id"),
+            probing=self._compile_probing(question, definition),
+            options_by_id={str(opt.id): opt for opt in options},
+            options_by_text={normalize_answer(opt.text): opt for opt in options}
+        )
+
+
+survey_cache = SurveyDefinitionCache(
+    max_versions=settings.survey_cache_max_versions,
+    current_ttl_seconds=settings.survey_cache_current_ttl_seconds
+)
@@ -5,6 +5,9 @@ from sqlalchemy import func
 
 from app.models import Survey, SurveyVersion, Question, QuestionOption
 from app.schemas import SurveyDefinition
+from app.services.survey_cache import survey_cache
+from app.services.skip_logic import compile_skip_logic
+from app.services.probing_policy import compile_probing_policies
 from app.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -17,6 +20,11 @@ class SurveyService:
     def ingest_survey(self, survey_def: SurveyDefinition) -> UUID:
         """Ingest a survey definition and persist to database."""
         try:
+            # Validate skip logic and probing policies up front; both raise ValueErrors
+            question_defs = [q.dict() for q in survey_def.questions]
+            compile_skip_logic(question_defs)
+            policies = compile_probing_policies(question_defs)
+            
             survey = self.db.query(Survey).filter(
                 Survey.name == survey_def.survey.name
             ).first()
@@ -80,9 +88,14 @@ class SurveyService:
                         self.db.add(option)
             
             self.db.commit()
+            
+            # is_current just flipped - drop the cached name -> version mapping
+            survey_cache.invalidate(survey.name)
+            
             logger.info(
                 f"Survey ingested: {survey.name} v{survey_version.version_number} "
-                f"with {len(survey_def.questions)} questions"
+                f"with {len(survey_def.questions)} questions "
+                f"({sum(1 for p in policies if not p.probe)} never probed)"
             )
             
             return survey_version.id
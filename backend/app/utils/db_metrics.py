@@ -0,0 +1,80 @@
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryCount:
+    statements: int = 0
+    commits: int = 0
+
+
+_current: ContextVar[Optional[QueryCount]] = ContextVar("db_query_count", default=None)
+
+
+class DBMetrics:
+    """
+    Counts statements (round trips) and commits on an engine, process-wide
+    and per unit of work (see track()).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.statements = 0
+        self.commits = 0
+        self.units: Dict[str, Dict[str, int]] = {}
+
+    def install(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    @contextmanager
+    def track(self, unit: str):
+        """Count the statements and commits issued inside the block under `unit`."""
+        count = QueryCount()
+        token = _current.set(count)
+        try:
+            yield count
+        finally:
+            _current.reset(token)
+            with self._lock:
+                totals = self.units.setdefault(unit, {"count": 0, "statements": 0, "commits": 0})
+                totals["count"] += 1
+                totals["statements"] += count.statements
+                totals["commits"] += count.commits
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "statements": self.statements,
+                "commits": self.commits,
+                "per_unit": {
+                    unit: {
+                        "count": totals["count"],
+                        "statements_avg": round(totals["statements"] / totals["count"], 2),
+                        "commits_avg": round(totals["commits"] / totals["count"], 2)
+                    }
+                    for unit, totals in self.units.items()
+                }
+            }
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        with self._lock:
+            self.statements += 1
+        count = _current.get()
+        if count is not None:
+            count.statements += 1
+
+    def _on_commit(self, conn):
+        with self._lock:
+            self.commits += 1
+        count = _current.get()
+        if count is not None:
+            count.commits += 1
+
+
+db_metrics = DBMetrics()
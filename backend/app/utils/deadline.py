@@ -0,0 +1,37 @@
+from typing import Optional
+import time
+
+
+class DeadlineExceeded(Exception):
+    """The time budget for a request ran out before the work finished."""
+
+
+class Deadline:
+    """
+    Absolute point in (monotonic) time by which a request must be answered.
+    Created once where the request enters and passed down, so every layer
+    spends from the same budget instead of applying its own timeout.
+    """
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(time.monotonic() + seconds)
+
+    @classmethod
+    def from_settings(cls, seconds: float) -> Optional["Deadline"]:
+        """A deadline `seconds` from now, or None when the budget is disabled (<= 0)."""
+        return cls.after(seconds) if seconds > 0 else None
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded("Request deadline exceeded")
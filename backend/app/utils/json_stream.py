@@ -0,0 +1,169 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import re
+
+# Parser states
+_START = "start"          # before the opening brace (preamble, code fences)
+_KEY_OR_END = "key_or_end"
+_KEY = "key"
+_IN_KEY = "in_key"
+_COLON = "colon"
+_VALUE = "value"
+_IN_STRING = "in_string"
+_IN_SCALAR = "in_scalar"  # number, true, false, null
+_IN_NESTED = "in_nested"  # array or object, parsed whole once closed
+_AFTER_VALUE = "after_value"
+_DONE = "done"
+
+_SCALAR_END = re.compile(r"[\s,}]")
+# A trailing escape that hasn't fully arrived yet: "\" or "\u" plus up to three hex digits
+_PARTIAL_ESCAPE = re.compile(r"(?<!\\)(?:\\\\)*\\(?:u[0-9a-fA-F]{0,3})?$")
+
+
+class IncrementalJSONParser:
+    """
+    Parses one JSON object from text that arrives in pieces, e.g. a streamed
+    completion. feed() returns each top-level member as soon as its value is
+    complete, so a caller can act on the first fields without waiting for
+    the rest of the object. While a string value is being read, `key` and
+    `partial` expose the member and the decoded text received so far.
+
+    Anything before the opening brace is skipped. Malformed input raises
+    json.JSONDecodeError, like json.loads.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.values: Dict[str, Any] = {}
+        self.key: Optional[str] = None  # member whose value is being read
+        self._pos = 0
+        self._state = _START
+        self._start = 0  # buffer index where the current token began
+        self._depth = 0
+        self._escape = False
+        self._nested_string = False
+
+    @property
+    def done(self) -> bool:
+        """The closing brace has been read."""
+        return self._state == _DONE
+
+    @property
+    def partial(self) -> Optional[str]:
+        """Decoded prefix of the string value being read, or None."""
+        if self._state != _IN_STRING:
+            return None
+        raw = _PARTIAL_ESCAPE.sub("", self.buffer[self._start:self._pos])
+        text = self._decode(raw)
+        if text and "\ud800" <= text[-1] <= "\udbff":
+            text = text[:-1]  # first half of a surrogate pair
+        return text
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """Consume more text; returns the (key, value) members it completed."""
+        self.buffer += text
+        completed = []
+
+        while self._pos < len(self.buffer) and self._state != _DONE:
+            char = self.buffer[self._pos]
+            state = self._state
+
+            if state == _START:
+                if char == "{":
+                    self._state = _KEY_OR_END
+
+            elif state in (_KEY_OR_END, _KEY):
+                if char == '"':
+                    self._start = self._pos + 1
+                    self._state = _IN_KEY
+                elif char == "}" and state == _KEY_OR_END:
+                    self._state = _DONE
+                elif not char.isspace():
+                    self._fail("Expecting property name enclosed in double quotes")
+
+            elif state in (_IN_KEY, _IN_STRING):
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    value = self._decode(self.buffer[self._start:self._pos])
+                    if state == _IN_KEY:
+                        self.key = value
+                        self._state = _COLON
+                    else:
+                        completed.append(self._complete(value))
+
+            elif state == _COLON:
+                if char == ":":
+                    self._state = _VALUE
+                elif not char.isspace():
+                    self._fail("Expecting ':' delimiter")
+
+            elif state == _VALUE:
+                if char == '"':
+                    self._start = self._pos + 1
+                    self._state = _IN_STRING
+                elif char in "{[":
+                    self._start = self._pos
+                    self._depth = 1
+                    self._state = _IN_NESTED
+                elif not char.isspace():
+                    self._start = self._pos
+                    self._state = _IN_SCALAR
+
+            elif state == _IN_SCALAR:
+                if _SCALAR_END.match(char):
+                    completed.append(self._complete(self._load(self.buffer[self._start:self._pos])))
+                    continue  # the delimiter is read again as _AFTER_VALUE
+
+            elif state == _IN_NESTED:
+                if self._nested_string:
+                    if self._escape:
+                        self._escape = False
+                    elif char == "\\":
+                        self._escape = True
+                    elif char == '"':
+                        self._nested_string = False
+                elif char == '"':
+                    self._nested_string = True
+                elif char in "{[":
+                    self._depth += 1
+                elif char in "}]":
+                    self._depth -= 1
+                    if self._depth == 0:
+                        completed.append(self._complete(self._load(self.buffer[self._start:self._pos + 1])))
+
+            elif state == _AFTER_VALUE:
+                if char == ",":
+                    self._state = _KEY
+                elif char == "}":
+                    self._state = _DONE
+                elif not char.isspace():
+                    self._fail("Expecting ',' delimiter")
+
+            self._pos += 1
+
+        return completed
+
+    def _complete(self, value: Any) -> Tuple[str, Any]:
+        key = self.key
+        self.values[key] = value
+        self.key = None
+        self._state = _AFTER_VALUE
+        return key, value
+
+    def _decode(self, raw: str) -> str:
+        try:
+            return json.loads(f'"{raw}"')
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(e.msg, self.buffer, self._start + max(0, e.pos - 1))
+
+    def _load(self, raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise json.JSONDecodeError(e.msg, self.buffer, self._start + e.pos)
+
+    def _fail(self, message: str):
+        raise json.JSONDecodeError(message, self.buffer, self._pos)
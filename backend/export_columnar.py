@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Write analytics exports as Parquet (default) or Arrow IPC stream files.
+
+    python export_columnar.py --out exports/
+    python export_columnar.py --out exports/ --tables responses model_calls --format arrow
+    python export_columnar.py --out exports/ --matrix <survey_version_id>
+"""
+from uuid import UUID
+import argparse
+import os
+
+from app.database import SessionLocal
+from app.services.columnar_export import TABLES, FORMATS, iter_table_export, iter_response_matrix
+
+
+def write(path, chunks):
+    size = 0
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+            size += len(chunk)
+    print(f'✅ {path} ({size / 1024:.1f} KiB)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar export of survey data")
+    parser.add_argument("--out", default="exports", help="output directory")
+    parser.add_argument("--format", choices=list(FORMATS), default="parquet")
+    parser.add_argument("--tables", nargs="*", choices=list(TABLES), default=None,
+                        help="tables to export (default: all)")
+    parser.add_argument("--matrix", action="append", default=[], metavar="SURVEY_VERSION_ID",
+                        help="also write the respondent x question matrix of a survey version")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    extension = FORMATS[args.format][0]
+    tables = list(TABLES) if args.tables is None else args.tables
+
+    db = SessionLocal()
+    try:
+        for table in tables:
+            write(os.path.join(args.out, f"{table}.{extension}"), iter_table_export(db, table, args.format))
+        for version_id in args.matrix:
+            write(
+                os.path.join(args.out, f"matrix_{version_id}.{extension}"),
+                iter_response_matrix(db, UUID(version_id), args.format)
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
+from app.config import settings
 from app.database import SessionLocal
 from app.services.survey_service import SurveyService
 from app.schemas import SurveyDefinition
+from precompute_followups import generate, print_report
+import asyncio
 import json
 
 db = SessionLocal()
@@ -12,7 +15,17 @@ try:
     service = SurveyService(db)
     version_id = service.ingest_survey(survey_def)
     print(f'✅ Survey loaded: {version_id}')
+    if not settings.followup_precompute_on_ingest:
+        print(f'ℹ️  Precompute first-probe follow-ups with: python precompute_followups.py {version_id}')
 except Exception as e:
     print(f'ℹ️  Survey may already exist: {e}')
+    version_id = None
 finally:
-    db.close()
\ No newline at end of file
+    db.close()
+
+# Opt-in (FOLLOWUP_PRECOMPUTE_ON_INGEST): one paid LLM call per single-choice option
+if version_id and settings.followup_precompute_on_ingest:
+    try:
+        print_report(asyncio.run(generate(version_id)))
+    except Exception as e:
+        print(f'⚠️  Precomputing follow-ups failed (rerun precompute_followups.py {version_id}): {e}')
\ No newline at end of file
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Generate the first-probe follow-up decision for every single-choice option
+of a survey version, or report what is stored and the latency it saves.
+
+    python precompute_followups.py <survey_version_id>
+    python precompute_followups.py <survey_version_id> --concurrency 8
+    python precompute_followups.py <survey_version_id> --report
+"""
+from uuid import UUID
+import argparse
+import asyncio
+
+from app.config import settings
+from app.database import SessionLocal
+from app.agents.followup_agent import FollowUpAgent
+from app.services.llm_client import LLMClient
+from app.services.mock_llm_client import MockLLMClient
+from app.services.followup_precompute import precompute_version, load_report
+from app.services.cost_ledger import daily_spend
+
+
+def print_report(report):
+    for entry in report:
+        if "error" in entry:
+            outcome = f"— {entry['error']}"
+        elif entry["decision"]["action"] == "ask_followup":
+            outcome = f"ask: {entry['decision'].get('followup_question')}"
+        else:
+            outcome = "move on"
+        latency = f"{entry['latency_ms']:>6} ms" if entry.get("latency_ms") is not None else " " * 9
+        print(f"  Q{entry['question_position'] + 1} {entry['option_text'][:40]:<40} {latency}  {outcome}")
+
+    latencies = sorted(entry["latency_ms"] for entry in report if entry.get("latency_ms") is not None)
+    print(f'✅ {len(latencies)}/{len(report)} options precomputed')
+    if latencies:
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        print(
+            f'⏱️  Latency saved per first probe served: avg {sum(latencies) / len(latencies):.0f} ms, '
+            f'p95 {p95} ms (served counts: /api/v1/admin/metrics)'
+        )
+
+
+async def generate(version_id: UUID, concurrency: int = None):
+    llm_client = MockLLMClient() if settings.use_mock_llm else LLMClient()
+    try:
+        return await precompute_version(FollowUpAgent(llm_client), version_id, concurrency)
+    finally:
+        daily_spend.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute first-probe follow-ups for a survey version")
+    parser.add_argument("version_id", type=UUID, help="survey version id")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help=f"parallel LLM calls (default: {settings.followup_precompute_concurrency})")
+    parser.add_argument("--report", action="store_true", help="report stored decisions without regenerating")
+    args = parser.parse_args()
+
+    if args.report:
+        db = SessionLocal()
+        try:
+            report = load_report(db, args.version_id)
+        finally:
+            db.close()
+    else:
+        report = asyncio.run(generate(args.version_id, args.concurrency))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Incremental export for warehouse syncs: writes rows changed since the last
+run as NDJSON (one file per entity) and stores the new watermark.
+
+    python sync_changes.py --out exports/changes --watermark-file .export_watermark
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+
+from app.database import SessionLocal
+from app.services.change_feed import FEEDS, decode_watermark, encode_watermark, read_changes
+
+
+def save_watermark(path, token):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        f.write(token)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export rows changed since the last watermark")
+    parser.add_argument("--out", default="exports/changes", help="output directory")
+    parser.add_argument("--watermark-file", default=".export_watermark")
+    parser.add_argument("--entities", nargs="*", choices=list(FEEDS), default=None)
+    args = parser.parse_args()
+
+    token = None
+    if os.path.exists(args.watermark_file):
+        with open(args.watermark_file) as f:
+            token = f.read().strip() or None
+    watermark = decode_watermark(token)
+
+    run_dir = os.path.join(args.out, datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+    os.makedirs(run_dir, exist_ok=True)
+    counts = {}
+
+    db = SessionLocal()
+    try:
+        has_more = True
+        while has_more:
+            changes, watermark, has_more = read_changes(db, watermark, args.entities)
+            for name, rows in changes.items():
+                if not rows:
+                    continue
+                with open(os.path.join(run_dir, f"{name}.ndjson"), "a") as f:
+                    for row in rows:
+                        f.write(json.dumps(row) + "\n")
+                counts[name] = counts.get(name, 0) + len(rows)
+            db.commit()
+            # Advance only after the page is on disk
+            save_watermark(args.watermark_file, encode_watermark(watermark))
+    finally:
+        db.close()
+
+    print(f'✅ {sum(counts.values())} changed rows written to {run_dir}: {counts}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+A local stand-in for the Anthropic Messages API, so LLMClient and the
+agents can be exercised over real HTTP without network access or cost.
+"""
+from typing import Any, Callable, Dict, List, Optional, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+
+MOVE_ON = {
+    "action": "move_on",
+    "followup_question": None,
+    "probe_count": 0,
+    "confidence": "high",
+    "reason": "The answer gives both a position and the reasoning behind it."
+}
+
+ASK_FOLLOWUP = {
+    "action": "ask_followup",
+    "followup_question": "What makes that matter most to you?",
+    "probe_count": 1,
+    "confidence": "low",
+    "reason": "The answer states a position without the motivation behind it."
+}
+
+SUMMARY = {"summary": "The respondent explained their view.", "key_themes": ["economy"]}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # concurrency tests connect many clients at once
+
+
+class AnthropicStub:
+    """
+    Serves POST /v1/messages (plain and streamed) from a background thread.
+
+    `reply(body)` picks the JSON the "model" answers with (a summary for
+    the summary agent, MOVE_ON otherwise). `latency` is the time per
+    response in seconds, either one number or a dict keyed by substrings
+    of the model name. Set `fail_with` to an HTTP status to fail every
+    request. Every request's headers and body are kept in `requests`, and
+    `connections` counts TCP connections accepted.
+    """
+
+    def __init__(
+        self,
+        reply: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+        latency: Union[float, Dict[str, float]] = 0.0
+    ):
+        self.reply = reply or default_reply
+        self.latency = latency
+        self.fail_with: Optional[int] = None
+        self.requests: List[Dict[str, Any]] = []
+        self.connections = 0
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "AnthropicStub":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def bodies(self, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [r["body"] for r in self.requests if model is None or r["body"]["model"] == model]
+
+    def _delay(self, model: str) -> float:
+        if isinstance(self.latency, dict):
+            return next((s for key, s in self.latency.items() if key in model), 0.0)
+        return self.latency
+
+    def _usage(self, headers, body: Dict[str, Any]) -> Dict[str, int]:
+        """Emulate prompt caching: a cache_control'd system prefix is written once, then read."""
+        system = body.get("system")
+        usage = {"input_tokens": 120, "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+        if isinstance(system, list) and system and system[-1].get("cache_control") \
+                and headers.get("anthropic-beta", "").startswith("prompt-caching"):
+            prefix = json.dumps(system)
+            tokens = sum(len(block["text"]) for block in system) // 4
+            with self._lock:
+                hit = prefix in self._cached_prefixes
+                self._cached_prefixes.add(prefix)
+            usage["cache_read_input_tokens" if hit else "cache_creation_input_tokens"] = tokens
+        return usage
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append({"headers": dict(self.headers), "body": body})
+                time.sleep(stub._delay(body["model"]))
+
+                if stub.fail_with:
+                    self._json(stub.fail_with, {"type": "error", "error": {"type": "api_error", "message": "stub failure"}})
+                    return
+
+                text = json.dumps(stub.reply(body))
+                usage = stub._usage(self.headers, body)
+                if body.get("stream"):
+                    self._stream(body["model"], text, usage)
+                else:
+                    self._json(200, {
+                        "id": "msg_stub", "type": "message", "role": "assistant", "model": body["model"],
+                        "content": [{"type": "text", "text": text}],
+                        "stop_reason": "end_turn", "stop_sequence": None,
+                        "usage": {**usage, "output_tokens": 40}
+                    })
+
+            def _json(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _stream(self, model: str, text: str, usage: Dict[str, int]):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def event(name: str, data: Dict[str, Any]):
+                    chunk = f"event: {name}\ndata: {json.dumps({'type': name, **data})}\n\n".encode()
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+
+                event("message_start", {"message": {
+                    "id": "msg_stub", "type": "message", "role": "assistant", "content": [], "model": model,
+                    "stop_reason": None, "stop_sequence": None, "usage": {**usage, "output_tokens": 1}
+                }})
+                event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+                for i in range(0, len(text), 8):
+                    event("content_block_delta", {"index": 0, "delta": {"type": "text_delta", "text": text[i:i + 8]}})
+                event("content_block_stop", {"index": 0})
+                event("message_delta", {
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": len(text) // 4}
+                })
+                event("message_stop", {})
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def default_reply(body: Dict[str, Any]) -> Dict[str, Any]:
+    return SUMMARY if "summar" in json.dumps(body.get("system")).lower() else MOVE_ON
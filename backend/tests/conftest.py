@@ -0,0 +1,122 @@
+"""
+Test configuration, applied before the app (and its settings) is imported.
+
+Tests run against TEST_DATABASE_URL when it is set (Postgres, as in
+production) and against a throwaway SQLite file otherwise; tests that
+depend on Postgres locking skip on SQLite. The LLM is always the mock or
+a local stub, never the Anthropic API.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or (
+    f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='polling-survey-tests-'), 'test.db')}"
+)
+os.environ["ANTHROPIC_API_KEY"] = "test-key"
+os.environ["USE_MOCK_LLM"] = "true"
+os.environ["APP_ENV"] = "test"
+os.environ["LOG_LEVEL"] = "WARNING"
+# Tests make calls back to back; keep the governor's rate limits out of the way
+os.environ["LLM_REQUESTS_PER_MINUTE"] = "1000000"
+os.environ["LLM_TOKENS_PER_MINUTE"] = "1000000000"
+
+from datetime import timezone
+from typing import Any, Dict, List
+
+import pytest
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.dialects.sqlite.base import DATETIME as SQLiteDateTime
+from sqlalchemy.ext.compiler import compiles
+
+from app.config import settings
+
+IS_SQLITE = settings.database_url.startswith("sqlite")
+
+requires_postgres = pytest.mark.skipif(IS_SQLITE, reason="needs TEST_DATABASE_URL (Postgres)")
+
+if IS_SQLITE:
+    # The models use Postgres types; give SQLite close enough equivalents
+    @compiles(PGUUID, "sqlite")
+    def _compile_uuid(type_, compiler, **kw):
+        return "CHAR(32)"
+
+    _datetime_result_processor = SQLiteDateTime.result_processor
+
+    def _aware_result_processor(self, dialect, coltype):
+        # timestamptz columns come back aware on Postgres; match that
+        process = _datetime_result_processor(self, dialect, coltype)
+
+        def to_aware(value):
+            value = process(value) if process else value
+            if value is not None and value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            return value
+
+        return to_aware
+
+    SQLiteDateTime.result_processor = _aware_result_processor
+
+from app.database import Base, SessionLocal, engine
+from app import models  # noqa: F401  (registers the tables)
+from app.schemas import SurveyDefinition
+from app.services.circuit_breaker import circuit_breakers
+from app.services.decision_cache import decision_cache
+from app.services.session_state import session_state_store
+from app.services.survey_cache import survey_cache
+from app.services.survey_service import SurveyService
+
+from tests.anthropic_stub import AnthropicStub
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _schema():
+    Base.metadata.create_all(engine)
+    yield
+    Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_process_state():
+    """Each test starts with empty in-process caches and closed circuits."""
+    yield
+    circuit_breakers._breakers.clear()
+    decision_cache._entries.clear()
+    session_state_store._lru.clear()
+    if session_state_store.backend is not None:
+        session_state_store.backend._data.clear()
+    survey_cache._versions.clear()
+    survey_cache.invalidate()
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
+
+
+@pytest.fixture
+def anthropic_stub(monkeypatch):
+    """A running AnthropicStub that new LLMClients are pointed at."""
+    stub = AnthropicStub().start()
+    monkeypatch.setattr(settings, "anthropic_base_url", stub.url)
+    yield stub
+    stub.stop()
+
+
+@pytest.fixture
+def ingest_survey(db):
+    """Ingest a survey built from question dicts; returns its name (the survey_id to start)."""
+    def ingest(questions: List[Dict[str, Any]], name: str = "Test Survey", summary_strategy: str = "on_completion") -> str:
+        definition = SurveyDefinition(
+            survey={"name": name, "summary_strategy": summary_strategy},
+            questions=questions
+        )
+        SurveyService(db).ingest_survey(definition)
+        return name
+    return ingest
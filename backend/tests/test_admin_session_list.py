@@ -0,0 +1,116 @@
+"""
+Admin session list: one query per page with keyset pagination, so a page
+deep into a large table costs the same as the first. BENCH_SESSIONS sets
+the table size (BENCH_SESSIONS=1000000 for the full-size benchmark).
+"""
+from datetime import datetime, timedelta, timezone
+import os
+import time
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app.api.admin import _encode_cursor
+from app.database import engine
+from app.main import app
+from app.models import Session as SessionModel, SessionMessage
+from app.services.survey_cache import survey_cache
+from app.utils.db_metrics import db_metrics
+
+BENCH_SESSIONS = int(os.environ.get("BENCH_SESSIONS", "20000"))
+BATCH = 10000
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def started_at(session_id: int) -> datetime:
+    return EPOCH + timedelta(seconds=session_id)
+
+
+@pytest.fixture
+def sessions(db, ingest_survey):
+    """BENCH_SESSIONS sessions, one a second; every tenth has three messages."""
+    version_id = survey_cache.get_current(db, ingest_survey([{"type": "free_text", "prompt": "Why?"}])).version_id
+    with engine.begin() as conn:
+        for first in range(1, BENCH_SESSIONS + 1, BATCH):
+            ids = range(first, min(first + BATCH, BENCH_SESSIONS + 1))
+            conn.execute(insert(SessionModel), [
+                {
+                    "id": i,
+                    "survey_version_id": version_id,
+                    "respondent_id": f"r{i}",
+                    "started_at": started_at(i),
+                    "status": "completed" if i % 2 else "in_progress",
+                    "cost_micro_usd": 0
+                }
+                for i in ids
+            ])
+            conn.execute(insert(SessionMessage), [
+                {"id": uuid.uuid4(), "session_id": i, "sequence_number": n, "message_type": "user", "message_text": "hi"}
+                for i in ids if i % 10 == 0
+                for n in range(3)
+            ])
+    return BENCH_SESSIONS
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def get_page(client, **params):
+    """One page of the list: (items, next cursor, statements issued, seconds)."""
+    statements = db_metrics.statements
+    start = time.perf_counter()
+    response = client.get("/api/v1/admin/sessions", params=params)
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.text
+    return response.json(), response.headers.get("X-Next-Cursor"), db_metrics.statements - statements, elapsed
+
+
+def test_pages_follow_each_other_without_gaps_or_repeats(client, sessions):
+    ids = []
+    cursor = None
+    for _ in range(3):
+        items, cursor, _, _ = get_page(client, limit=100, **({"cursor": cursor} if cursor else {}))
+        ids.extend(item["session_id"] for item in items)
+
+    assert ids == list(range(sessions, sessions - 300, -1))
+
+
+def test_page_carries_survey_name_and_message_counts(client, sessions):
+    items, _, _, _ = get_page(client, limit=10)
+
+    assert {item["survey_name"] for item in items} == {"Test Survey"}
+    assert {item["session_id"]: item["message_count"] for item in items} == {
+        i: 3 if i % 10 == 0 else 0 for i in range(sessions, sessions - 10, -1)
+    }
+
+
+def test_status_filter_pages_through_matching_sessions_only(client, sessions):
+    items, cursor, _, _ = get_page(client, limit=50, status="completed")
+    more, _, _, _ = get_page(client, limit=50, status="completed", cursor=cursor)
+
+    assert {item["status"] for item in items + more} == {"completed"}
+    assert len({item["session_id"] for item in items + more}) == 100
+
+
+def test_deep_page_costs_the_same_as_the_first(client, sessions):
+    deep = sessions // 10  # 90% of the way through the list
+    deep_cursor = _encode_cursor(started_at(deep), deep)
+
+    first_times, deep_times = [], []
+    for _ in range(3):
+        items, _, first_statements, seconds = get_page(client, limit=50)
+        first_times.append(seconds)
+        deep_items, _, deep_statements, seconds = get_page(client, limit=50, cursor=deep_cursor)
+        deep_times.append(seconds)
+
+    print(
+        f"\n{sessions} sessions: first page {min(first_times) * 1000:.1f}ms, "
+        f"page at 90% {min(deep_times) * 1000:.1f}ms"
+    )
+    assert first_statements == deep_statements == 1  # no per-session queries
+    assert deep_items[0]["session_id"] == deep - 1
+    assert min(deep_times) < min(first_times) * 3
@@ -0,0 +1,80 @@
+"""
+/answer/stream relays the follow-up decision as Server-Sent Events ahead
+of the final result.
+"""
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from tests.anthropic_stub import ASK_FOLLOWUP, MOVE_ON
+
+
+@pytest.fixture
+def client(anthropic_stub, monkeypatch):
+    monkeypatch.setattr(settings, "use_mock_llm", False)
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def started(client, ingest_survey):
+    survey_id = ingest_survey([
+        {"type": "free_text", "prompt": "What matters most to you?"},
+        {"type": "free_text", "prompt": "Anything else?"},
+    ])
+    return client.post("/api/v1/sessions/start", json={"survey_id": survey_id}).json()
+
+
+def events(response):
+    """(event, data) pairs from an SSE body."""
+    parsed = []
+    for block in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def stream_answer(client, started, **answer):
+    response = client.post(f"/api/v1/sessions/{started['session_id']}/answer/stream", json=answer)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    return events(response)
+
+
+def test_follow_up_question_streams_before_the_result(client, started, anthropic_stub):
+    anthropic_stub.reply = lambda body: ASK_FOLLOWUP
+
+    received = stream_answer(
+        client, started,
+        question_id=started["first_question"]["question_id"], answer_type="free_text", text="Jobs"
+    )
+
+    names = [name for name, _ in received]
+    assert names[-1] == "result"
+    assert set(names[:-1]) == {"followup_delta"}
+    assert len(names) > 2  # the question arrives in pieces as it is generated
+    assert "".join(data["text"] for name, data in received[:-1]) == ASK_FOLLOWUP["followup_question"]
+    assert received[-1][1]["message_type"] == "follow_up_question"
+    assert received[-1][1]["question_text"] == ASK_FOLLOWUP["followup_question"]
+
+
+def test_moving_on_is_announced_before_the_next_question(client, started, anthropic_stub):
+    anthropic_stub.reply = lambda body: MOVE_ON
+
+    received = stream_answer(
+        client, started,
+        question_id=started["first_question"]["question_id"], answer_type="free_text", text="Jobs and fair wages"
+    )
+
+    assert [name for name, _ in received] == ["moving_on", "result"]
+    assert received[-1][1]["message_type"] == "survey_question"
+    assert received[-1][1]["question"]["position"] == 1
+
+
+def test_errors_are_reported_as_an_event(client):
+    received = stream_answer(client, {"session_id": 999999}, answer_type="free_text", text="Jobs")
+
+    assert received == [("error", {"detail": "Session 999999 not found"})]
@@ -0,0 +1,139 @@
+"""
+Each answer is one unit of work: its rows are written in a single
+transaction, and no transaction is open while the LLM is called.
+"""
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import event
+
+from app.agents.followup_agent import FollowUpAgent
+from app.database import engine
+from app.models import ConversationTurn, ModelCall, Response
+from app.services.llm_client import LLMClient
+from app.services.session_service import SessionService
+from tests.anthropic_stub import ASK_FOLLOWUP, MOVE_ON
+
+WRITES = ("INSERT", "UPDATE", "DELETE")
+
+
+class TransactionLog:
+    """Statements and commits on the engine, with the writes in each committed transaction."""
+
+    def __init__(self):
+        self.statements = 0
+        self.commits = 0
+        self.write_transactions = []  # writes per committed transaction that wrote
+        self._writes = 0
+
+    def on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements += 1
+        if statement.lstrip().upper().startswith(WRITES):
+            self._writes += 1
+
+    def on_commit(self, conn):
+        self.commits += 1
+        if self._writes:
+            self.write_transactions.append(self._writes)
+        self._writes = 0
+
+    def on_rollback(self, conn):
+        self._writes = 0
+
+
+@pytest.fixture
+def transactions():
+    log = TransactionLog()
+    listeners = [("before_cursor_execute", log.on_execute), ("commit", log.on_commit), ("rollback", log.on_rollback)]
+    for name, fn in listeners:
+        event.listen(engine, name, fn)
+    yield log
+    for name, fn in listeners:
+        event.remove(engine, name, fn)
+
+
+@pytest_asyncio.fixture
+async def agent(anthropic_stub):
+    async with httpx.AsyncClient() as http_client:
+        yield FollowUpAgent(LLMClient(http_client=http_client))
+
+
+@pytest.fixture
+def survey(db, ingest_survey):
+    survey_id = ingest_survey([
+        {"type": "free_text", "prompt": "What matters most to you?"},
+        {"type": "free_text", "prompt": "Anything else?"},
+    ])
+    return SessionService(db).start_session(survey_id)
+
+
+async def answer(db, agent, transactions, session_id, **kwargs):
+    """Submit an answer; returns (response, statements, commits, write transactions) for it."""
+    statements, commits, writes = transactions.statements, transactions.commits, len(transactions.write_transactions)
+    result = await SessionService(db, agent).submit_answer(session_id=session_id, **kwargs)
+    return (
+        result,
+        transactions.statements - statements,
+        transactions.commits - commits,
+        transactions.write_transactions[writes:]
+    )
+
+
+@pytest.mark.asyncio
+async def test_each_answer_commits_its_rows_in_one_transaction(db, agent, survey, transactions, anthropic_stub):
+    anthropic_stub.reply = lambda body: ASK_FOLLOWUP
+    result, _, _, writes = await answer(
+        db, agent, transactions, survey.session_id,
+        question_id=survey.first_question.question_id, answer_type="free_text", text="Jobs"
+    )
+    assert result.message_type == "follow_up_question"
+    assert len(writes) == 1
+
+    anthropic_stub.reply = lambda body: MOVE_ON
+    result, _, _, writes = await answer(
+        db, agent, transactions, survey.session_id,
+        question_id=None, answer_type="follow_up_answer", text="Wages in my town have not kept up"
+    )
+    assert result.message_type == "survey_question"
+    assert len(writes) == 1
+
+    assert db.query(Response).count() == 1
+    assert db.query(ConversationTurn).count() == 2
+    assert db.query(ModelCall).count() == 2
+
+
+@pytest.mark.asyncio
+async def test_warm_answer_round_trips(db, agent, survey, transactions):
+    first, *_ = await answer(
+        db, agent, transactions, survey.session_id,
+        question_id=survey.first_question.question_id, answer_type="free_text", text="Jobs and wages"
+    )
+    result, statements, commits, writes = await answer(
+        db, agent, transactions, survey.session_id,
+        question_id=first.question.question_id, answer_type="free_text", text="Nothing more to add"
+    )
+
+    print(f"\nwarm answer: {statements} statements, {commits} commit(s)")
+    assert result.message_type == "completed"
+    assert commits == 1  # session state is cached: no read transaction before the write
+    assert len(writes) == 1
+
+
+@pytest.mark.asyncio
+async def test_no_transaction_is_open_during_the_llm_call(db, agent, survey, anthropic_stub):
+    open_during_call = []
+
+    def reply(body):
+        open_during_call.append(db.in_transaction())
+        return MOVE_ON
+
+    anthropic_stub.reply = reply
+    await SessionService(db, agent).submit_answer(
+        session_id=survey.session_id,
+        question_id=survey.first_question.question_id,
+        answer_type="free_text",
+        text="Jobs"
+    )
+
+    assert open_during_call == [False]
+
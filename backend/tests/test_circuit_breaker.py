@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+from anthropic import APIError
+
+from app.agents.followup_agent import FollowUpAgent
+from app.config import settings
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, circuit_breakers
+from app.services.llm_client import LLMClient
+
+MODEL = "claude-3-haiku-20240307"
+
+
+def breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        failure_rate=0.5, slow_call_rate=0.8, slow_call_seconds=1.0,
+        min_calls=4, window_seconds=60, open_seconds=0.05, probes=2
+    )
+    options.update(overrides)
+    return CircuitBreaker(MODEL, **options)
+
+
+def record(circuit: CircuitBreaker, failed: bool = False, latency: float = 0.01):
+    circuit.on_result(circuit.before_call(), failed=failed, latency_seconds=latency)
+
+
+def test_opens_once_the_window_reaches_the_failure_rate():
+    circuit = breaker()
+    for failed in (True, False, True):
+        record(circuit, failed)
+    assert circuit.state == CLOSED  # below min_calls
+
+    record(circuit, failed=False)
+
+    assert circuit.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        circuit.check()
+
+
+def test_opens_on_slow_calls():
+    circuit = breaker()
+    for _ in range(4):
+        record(circuit, latency=2.0)
+
+    assert circuit.state == OPEN
+
+
+def test_half_open_probes_close_the_circuit_when_they_succeed():
+    circuit = breaker()
+    for _ in range(4):
+        record(circuit, failed=True)
+    time.sleep(0.06)
+
+    first, second = circuit.before_call(), circuit.before_call()
+    assert circuit.state == HALF_OPEN and first and second
+    with pytest.raises(CircuitOpenError):
+        circuit.before_call()  # only `probes` calls go through
+
+    circuit.on_result(first, failed=False, latency_seconds=0.01)
+    circuit.on_result(second, failed=False, latency_seconds=0.01)
+    assert circuit.state == CLOSED
+
+
+def test_failed_probe_reopens_the_circuit():
+    circuit = breaker()
+    for _ in range(4):
+        record(circuit, failed=True)
+    time.sleep(0.06)
+
+    record(circuit, failed=True)
+
+    assert circuit.state == OPEN
+    assert circuit.stats()["transitions"] == {"closed->open": 1, "open->half_open": 1, "half_open->open": 1}
+
+
+@pytest.fixture
+def failing_stub(anthropic_stub, monkeypatch):
+    anthropic_stub.fail_with = 500
+    monkeypatch.setattr(settings, "llm_circuit_min_calls", 3)
+    monkeypatch.setattr(settings, "llm_circuit_open_seconds", 0.2)
+    monkeypatch.setattr(settings, "llm_circuit_half_open_probes", 1)
+
+    async def no_backoff(self, wait_time, deadline):
+        pass
+
+    monkeypatch.setattr(LLMClient, "_backoff", no_backoff)
+    return anthropic_stub
+
+
+@pytest_asyncio.fixture
+async def client(failing_stub):
+    async with httpx.AsyncClient() as http_client:
+        yield LLMClient(http_client=http_client)
+
+
+async def complete(client: LLMClient):
+    return await client.complete(
+        model=MODEL, system="You are a survey moderator.",
+        messages=[{"role": "user", "content": "Answer: jobs"}], max_retries=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_server_errors_open_the_circuit_and_stop_api_calls(client, failing_stub):
+    for _ in range(3):
+        with pytest.raises(APIError):
+            await complete(client)
+    assert circuit_breakers.get(MODEL).state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await complete(client)
+    assert len(failing_stub.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_circuit_closes_once_the_backend_recovers(client, failing_stub):
+    for _ in range(3):
+        with pytest.raises(APIError):
+            await complete(client)
+
+    failing_stub.fail_with = None
+    await asyncio.sleep(0.25)
+    await complete(client)
+
+    assert circuit_breakers.get(MODEL).state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_followup_agent_moves_on_while_the_circuit_is_open(client, failing_stub):
+    for _ in range(3):
+        with pytest.raises(APIError):
+            await complete(client)
+    sent = len(failing_stub.requests)
+
+    decision = await FollowUpAgent(client).should_ask_followup(
+        question_text="Why?", question_type="free_text", user_answer="jobs",
+        selected_option_text=None, conversation_history=[], probe_count=0,
+        session_id=None, db=None, model=MODEL
+    )
+
+    assert decision["action"] == "move_on"
+    assert decision["reason"] == "System temporarily unavailable"
+    assert len(failing_stub.requests) == sent
@@ -0,0 +1,95 @@
+"""
+LLM calls must not block the event loop: with a slow backend, N answers
+submitted at once finish in about the time of one.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.agents.followup_agent import FollowUpAgent
+from app.database import SessionLocal
+from app.models import ModelCall
+from app.services.llm_client import LLMClient
+from app.services.session_service import SessionService
+
+LATENCY = 0.5
+CONCURRENT = 10
+
+QUESTIONS = [
+    {"type": "free_text", "prompt": "What matters most to you in immigration policy?"},
+    {"type": "free_text", "prompt": "Anything else?"},
+]
+
+
+@pytest.fixture
+def slow_stub(anthropic_stub):
+    anthropic_stub.latency = LATENCY
+    return anthropic_stub
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Worst delay seen by a 10ms ticker while the calls run."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        worst = max(worst, time.perf_counter() - start - 0.01)
+    return worst
+
+
+@pytest.mark.asyncio
+async def test_concurrent_completions_overlap(slow_stub):
+    async with httpx.AsyncClient() as http_client:
+        client = LLMClient(http_client=http_client)
+        stop = asyncio.Event()
+        lag = asyncio.create_task(_loop_lag(stop))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            client.complete(
+                model="claude-3-haiku-20240307",
+                system="You are a neutral survey moderator.",
+                messages=[{"role": "user", "content": f"Answer {i}"}],
+                agent_type="follow_up"
+            )
+            for i in range(CONCURRENT)
+        ))
+        elapsed = time.perf_counter() - start
+        stop.set()
+
+    print(f"\n{CONCURRENT} concurrent completions: {elapsed:.2f}s, worst loop lag {await lag * 1000:.1f}ms")
+    assert elapsed < LATENCY * 2  # serial calls would take LATENCY * CONCURRENT
+    assert await lag < LATENCY / 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_answers_finish_in_about_one_call(slow_stub, db, ingest_survey):
+    survey_id = ingest_survey(QUESTIONS)
+    starts = [SessionService(db).start_session(survey_id) for _ in range(CONCURRENT)]
+
+    async with httpx.AsyncClient() as http_client:
+        agent = FollowUpAgent(LLMClient(http_client=http_client))
+
+        async def answer(i: int, start_response):
+            session_db = SessionLocal()
+            try:
+                return await SessionService(session_db, agent).submit_answer(
+                    session_id=start_response.session_id,
+                    question_id=start_response.first_question.question_id,
+                    answer_type="free_text",
+                    text=f"Jobs for my family in town number {i}, and fair wages for everyone"
+                )
+            finally:
+                session_db.close()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(answer(i, s) for i, s in enumerate(starts)))
+        elapsed = time.perf_counter() - start
+
+    print(f"\n{CONCURRENT} concurrent answers: {elapsed:.2f}s with {LATENCY}s per LLM call")
+    assert [r.message_type for r in results] == ["survey_question"] * CONCURRENT
+    assert len(slow_stub.requests) == CONCURRENT
+    assert db.query(ModelCall).count() == CONCURRENT
+    assert elapsed < LATENCY * 2
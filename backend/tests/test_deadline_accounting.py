@@ -0,0 +1,86 @@
+"""
+A call abandoned at the deadline is charged the estimated input of a
+request still in flight, and nothing when no request was out; complete()
+and stream() follow the same rule.
+"""
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.models import ModelCall, Session as SessionModel
+from app.services.llm_client import LLMClient
+from app.services.session_service import SessionService
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+MODEL = "claude-3-haiku-20240307"
+SYSTEM = "You are a survey moderator."
+MESSAGES = [{"role": "user", "content": "Answer: jobs"}]
+
+
+@pytest_asyncio.fixture
+async def client(anthropic_stub):
+    async with httpx.AsyncClient() as http_client:
+        yield LLMClient(http_client=http_client)
+
+
+@pytest.fixture
+def session_id(db, ingest_survey):
+    survey_id = ingest_survey([{"type": "free_text", "prompt": "What matters most to you?"}])
+    return SessionService(db).start_session(survey_id).session_id
+
+
+async def call_complete(client, db, session_id, deadline):
+    await client.complete(
+        model=MODEL, system=SYSTEM, messages=MESSAGES, agent_type="follow_up",
+        session_id=str(session_id), db=db, deadline=deadline
+    )
+
+
+async def call_stream(client, db, session_id, deadline):
+    async for _ in client.stream(
+        model=MODEL, system=SYSTEM, messages=MESSAGES, agent_type="follow_up",
+        session_id=str(session_id), db=db, deadline=deadline
+    ):
+        pass
+
+
+@pytest.fixture(params=[call_complete, call_stream], ids=["complete", "stream"])
+def call(request):
+    return request.param
+
+
+async def abandoned(db, client, session_id, call, deadline):
+    with pytest.raises(DeadlineExceeded):
+        await call(client, db, session_id, deadline)
+    db.commit()
+    return db.query(ModelCall).one()
+
+
+@pytest.mark.asyncio
+async def test_request_in_flight_at_the_deadline_is_charged_its_estimated_input(db, client, session_id, call, anthropic_stub):
+    anthropic_stub.latency = 1.0
+
+    logged = await abandoned(db, client, session_id, call, Deadline.after(0.2))
+
+    estimate = client._estimate_input_tokens(SYSTEM, MESSAGES)
+    assert (logged.finish_reason, logged.input_tokens) == ("deadline_exceeded", estimate)
+    assert logged.cost_micro_usd == client._calculate_cost_micro(MODEL, estimate, 0) > 0
+    assert db.get(SessionModel, session_id).cost_micro_usd == logged.cost_micro_usd
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_charged_when_no_request_was_sent(db, client, session_id, call, anthropic_stub):
+    logged = await abandoned(db, client, session_id, call, Deadline.after(-1))
+
+    assert anthropic_stub.requests == []
+    assert (logged.input_tokens, logged.cost_micro_usd) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_request_before_the_deadline_is_not_charged(db, client, session_id, call, anthropic_stub):
+    anthropic_stub.fail_with = 500  # the retry's backoff would outlast the deadline
+
+    logged = await abandoned(db, client, session_id, call, Deadline.after(0.5))
+
+    assert len(anthropic_stub.requests) == 1
+    assert (logged.input_tokens, logged.cost_micro_usd) == (0, 0)
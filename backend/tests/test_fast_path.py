@@ -0,0 +1,113 @@
+import pytest
+
+from app.services.fast_path import (
+    ASK_FOLLOWUP,
+    MOVE_ON,
+    DecisionInput,
+    FastPathClassifier,
+    FastPathDecision,
+    LogisticModel,
+    ModelStage,
+    PreDecisionStage,
+    RuleStage,
+    features
+)
+
+
+@pytest.fixture
+def rules():
+    return RuleStage(long_answer_words=20)
+
+
+@pytest.fixture
+def classifier(rules):
+    return FastPathClassifier(stages=[rules], min_confidence=0.85)
+
+
+def free_text(answer: str, history=(), probe_count: int = 0) -> DecisionInput:
+    return DecisionInput("free_text", answer, conversation_history=tuple(history), probe_count=probe_count)
+
+
+@pytest.mark.parametrize("answer", ["", "  ", "IDK", "not sure.", "Nothing!", "n/a"])
+def test_non_answers_move_on(rules, answer):
+    decision = rules.decide(free_text(answer))
+
+    assert (decision.action, decision.source) == (MOVE_ON, "rule:non_answer")
+
+
+@pytest.mark.parametrize("option", ["None", "Not sure", "Somewhat positive"])
+def test_bare_option_answers_go_to_the_llm(rules, option):
+    inp = DecisionInput("single_choice", option, selected_option_text=option)
+
+    assert rules.decide(inp) is None
+
+
+def test_repeating_the_previous_answer_moves_on(rules):
+    history = [("user", "Jobs and the economy"), ("assistant", "What about jobs matters most?")]
+
+    decision = rules.decide(free_text("the economy and jobs", history, probe_count=1))
+
+    assert decision.source == "rule:repetition"
+
+
+def test_the_current_follow_up_answer_is_not_compared_with_itself(rules):
+    # Session history already ends with the answer being decided on
+    history = [
+        ("user", "Jobs"),
+        ("assistant", "What about jobs matters most?"),
+        ("user", "Wages have not kept up with rent in my town"),
+    ]
+
+    assert rules.decide(free_text("Wages have not kept up with rent in my town", history, probe_count=1)) is None
+
+
+def test_long_answers_move_on(rules):
+    decision = rules.decide(free_text(" ".join(["word"] * 20)))
+
+    assert decision.source == "rule:long_answer"
+
+
+def test_ordinary_answers_go_to_the_llm(classifier):
+    assert classifier.decide(free_text("Mostly the economy")) == (None, None)
+    assert classifier.stats()["decisions"] == {"escalated": 1}
+
+
+def test_confidence_comes_from_the_first_stage_with_an_opinion():
+    class Unsure(PreDecisionStage):
+        def decide(self, inp):
+            return FastPathDecision(MOVE_ON, 0.6, "unsure")
+
+    class Sure(PreDecisionStage):
+        def decide(self, inp):
+            return FastPathDecision(MOVE_ON, 0.99, "sure")
+
+    decision, confidence = FastPathClassifier(stages=[Unsure(), Sure()], min_confidence=0.85).decide(free_text("x"))
+
+    assert decision.source == "sure"
+    assert confidence == 0.6
+
+
+def test_confident_ask_without_a_question_escalates():
+    model = LogisticModel(bias=5.0)  # always predicts "ask"
+    classifier = FastPathClassifier(stages=[ModelStage(model)], min_confidence=0.85)
+
+    decision, confidence = classifier.decide(free_text("Mostly the economy"))
+
+    assert decision is None
+    assert confidence > 0.99
+
+
+def test_disabled_classifier_has_no_opinion(rules):
+    classifier = FastPathClassifier(stages=[rules], min_confidence=0.85, enabled=False)
+
+    assert classifier.decide(free_text("idk")) == (None, None)
+
+
+def test_logistic_model_learns_a_separable_signal():
+    examples = [(features(free_text("idk why")), 0), (features(free_text("jobs jobs")), 1)] * 50
+
+    model = LogisticModel.train(examples, epochs=30)
+
+    assert model.predict(features(free_text("jobs jobs"))) > 0.8
+    assert model.predict(features(free_text("idk why"))) < 0.2
+    assert ModelStage(model).decide(free_text("jobs jobs")).action == ASK_FOLLOWUP
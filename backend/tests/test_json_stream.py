@@ -0,0 +1,144 @@
+import json
+import random
+
+import pytest
+
+from app.agents.followup_agent import FollowUpAgent
+from app.utils.json_stream import IncrementalJSONParser
+from tests.anthropic_stub import ASK_FOLLOWUP, MOVE_ON
+
+DOCUMENTS = [
+    MOVE_ON,
+    ASK_FOLLOWUP,
+    {"text": 'quote " backslash \\ newline \n tab \t', "unicode": "café \U0001F600 ☃"},
+    {"nested": {"a": [1, {"b": "}]"}], "c": None}, "list": ["x", "{", "]"], "empty": {}},
+    {"int": -12, "float": 3.5e-2, "yes": True, "no": False, "nothing": None},
+    {},
+]
+
+
+def feed_in_chunks(text: str, sizes) -> IncrementalJSONParser:
+    parser = IncrementalJSONParser()
+    position = 0
+    for size in sizes:
+        parser.feed(text[position:position + size])
+        position += size
+    parser.feed(text[position:])
+    return parser
+
+
+@pytest.mark.parametrize("document", DOCUMENTS)
+def test_any_chunking_parses_like_json_loads(document):
+    text = json.dumps(document)
+    rng = random.Random(7)
+
+    for sizes in ([1] * len(text), [rng.randint(1, 9) for _ in range(len(text))], [len(text)]):
+        parser = feed_in_chunks(text, sizes)
+        assert parser.done
+        assert parser.values == json.loads(text)
+
+
+def test_members_are_returned_as_soon_as_their_value_is_complete():
+    parser = IncrementalJSONParser()
+
+    assert parser.feed('{"action": "move_on", "follow') == [("action", "move_on")]
+    assert parser.feed('up_question": null, "probe_count": 0') == [("followup_question", None)]
+    assert parser.feed(',') == [("probe_count", 0)]  # a number ends at its delimiter
+    assert not parser.done
+
+
+def test_partial_exposes_the_decoded_prefix_of_a_string_value():
+    parser = IncrementalJSONParser()
+    parser.feed('{"followup_question": "What \\"matters\\" to you, caf\\u00')
+
+    assert parser.key == "followup_question"
+    assert parser.partial == 'What "matters" to you, caf'  # the half-read escape is held back
+
+    parser.feed('e9')
+    assert parser.partial == 'What "matters" to you, café'
+
+
+def test_partial_holds_back_half_of_a_surrogate_pair():
+    parser = IncrementalJSONParser()
+    parser.feed('{"q": "smile \\ud83d')
+    assert parser.partial == "smile "
+
+    parser.feed('\\ude00')
+    assert parser.partial == "smile \U0001F600"
+
+
+def test_preamble_and_code_fences_are_skipped():
+    parser = IncrementalJSONParser()
+    parser.feed('Here is the decision:\n```json\n{"action": "move_on"}\n```')
+
+    assert parser.done
+    assert parser.values == {"action": "move_on"}
+
+
+@pytest.mark.parametrize("text", [
+    '{"action" "move_on"}',
+    '{action: "move_on"}',
+    '{"action": "move_on" "reason": "x"}',
+    '{"probe_count": 1x}',
+])
+def test_malformed_input_raises_like_json_loads(text):
+    with pytest.raises(json.JSONDecodeError):
+        IncrementalJSONParser().feed(text)
+
+
+class ScriptedStream:
+    """LLM client whose stream() yields a fixed completion in small pieces."""
+
+    def __init__(self, decision, chunk: int = 4):
+        text = json.dumps(decision)
+        self.chunks = [text[i:i + chunk] for i in range(0, len(text), chunk)]
+        self.sent = 0
+        self.closed = False
+
+    async def stream(self, **request):
+        try:
+            for chunk in self.chunks:
+                self.sent += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+async def decide(client: ScriptedStream):
+    return await FollowUpAgent(client).decide(
+        question_text="Why?", question_type="free_text", user_answer="jobs",
+        selected_option_text=None, conversation_history=[], probe_count=0,
+        session_id=None, db=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_move_on_stops_reading_once_the_action_is_known():
+    client = ScriptedStream(MOVE_ON)
+
+    decision = await decide(client)
+
+    assert decision["action"] == "move_on"
+    assert decision["reason"] is None  # never generated
+    assert client.closed
+    assert client.sent < len(client.chunks) / 2
+
+
+@pytest.mark.asyncio
+async def test_follow_up_stops_reading_once_the_question_is_complete():
+    client = ScriptedStream(ASK_FOLLOWUP)
+
+    decision = await decide(client)
+
+    assert decision["followup_question"] == ASK_FOLLOWUP["followup_question"]
+    assert client.closed
+    assert client.sent < len(client.chunks)
+
+
+@pytest.mark.asyncio
+async def test_truncated_decision_is_a_parse_error():
+    client = ScriptedStream({"followup_question": "What", "action": "ask_followup"})
+    client.chunks = client.chunks[:-2]
+
+    with pytest.raises(json.JSONDecodeError):
+        await decide(client)
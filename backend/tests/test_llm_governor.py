@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_governor import LLMGovernor, TokenBucket
+
+MODEL = "claude-3-haiku-20240307"
+
+
+async def admit_in_order(governor: LLMGovernor, agent_types, pause: float, stagger: float = 0.0):
+    """Queue one call per agent type behind a paused lane; returns the order they were admitted in."""
+    governor.rate_limited(MODEL, retry_after=pause)
+    admitted = []
+
+    async def call(agent_type: str):
+        async with governor.admit(MODEL, agent_type, estimated_tokens=10):
+            admitted.append(agent_type)
+
+    tasks = []
+    for agent_type in agent_types:
+        tasks.append(asyncio.create_task(call(agent_type)))
+        await asyncio.sleep(stagger)
+    await asyncio.gather(*tasks)
+    return admitted
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(60)
+
+    assert bucket.wait_time(3) == pytest.approx(3.0)
+    bucket.refill(bucket.updated + 1.5)
+    assert bucket.tokens == pytest.approx(1.5)
+    assert bucket.wait_time(1) == 0.0
+
+
+def test_requests_larger_than_the_bucket_wait_for_a_full_bucket():
+    bucket = TokenBucket(per_minute=600)
+    bucket.take(600)
+
+    assert bucket.wait_time(10000) == pytest.approx(60.0)
+
+
+@pytest.mark.asyncio
+async def test_queued_calls_are_admitted_by_priority_class():
+    governor = LLMGovernor(requests_per_minute=1200, tokens_per_minute=1000000, aging_seconds=0)
+
+    admitted = await admit_in_order(governor, ["batch", "summary", "follow_up"], pause=0.05)
+
+    assert admitted == ["follow_up", "summary", "batch"]
+
+
+@pytest.mark.asyncio
+async def test_long_queued_batch_work_ages_ahead_of_newer_follow_ups():
+    governor = LLMGovernor(requests_per_minute=1200, tokens_per_minute=1000000, aging_seconds=0.02)
+
+    admitted = await admit_in_order(governor, ["batch", "follow_up"], pause=0.15, stagger=0.1)
+
+    assert admitted == ["batch", "follow_up"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_pauses_the_whole_lane():
+    governor = LLMGovernor(requests_per_minute=1000000, tokens_per_minute=1000000)
+
+    start = time.monotonic()
+    await admit_in_order(governor, ["follow_up", "follow_up"], pause=0.2)
+
+    assert time.monotonic() - start >= 0.2
+    assert governor.stats()["models"][MODEL]["rate_limited"] == 1
+
+
+@pytest.mark.asyncio
+async def test_token_budget_is_corrected_by_reported_usage():
+    governor = LLMGovernor(requests_per_minute=1000, tokens_per_minute=60000)
+
+    async with governor.admit(MODEL, "follow_up", estimated_tokens=1000) as settle:
+        settle(200)
+
+    assert governor.stats()["models"][MODEL]["tokens_available"] == pytest.approx(59800, abs=5)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    governor = LLMGovernor(requests_per_minute=1000, tokens_per_minute=60000)
+    governor.rate_limited(MODEL, retry_after=10)
+
+    async def call():
+        async with governor.admit(MODEL, "batch", estimated_tokens=10):
+            pass
+
+    task = asyncio.create_task(call())
+    await asyncio.sleep(0.01)
+    assert governor.stats()["models"][MODEL]["queue_depth"] == 1
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert governor.stats()["models"][MODEL]["queue_depth"] == 0
@@ -0,0 +1,76 @@
+"""
+One pooled LLM client per process (LLMRegistry) versus a client per
+request, measured against the local Anthropic stub.
+"""
+import statistics
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.llm_client import LLMClient
+from app.services.llm_registry import LLMRegistry
+
+MODEL = "claude-3-haiku-20240307"
+ANSWERS = 20
+
+
+async def _timed_call(client: LLMClient) -> float:
+    start = time.perf_counter()
+    await client.complete(
+        model=MODEL,
+        system="You are a neutral survey moderator.",
+        messages=[{"role": "user", "content": "Respondent answered: jobs and the economy"}],
+        agent_type="follow_up"
+    )
+    return time.perf_counter() - start
+
+
+def _report(label: str, latencies):
+    print(
+        f"\n{label}: median {statistics.median(latencies) * 1000:.2f}ms, "
+        f"max {max(latencies) * 1000:.2f}ms over {len(latencies)} answers"
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_per_request_opens_a_connection_per_answer(anthropic_stub):
+    latencies = []
+    for _ in range(ANSWERS):
+        client = LLMClient()
+        latencies.append(await _timed_call(client))
+        await client.client.close()
+
+    _report("client per request", latencies)
+    assert anthropic_stub.connections == ANSWERS
+
+
+@pytest.mark.asyncio
+async def test_shared_client_reuses_one_keep_alive_connection(anthropic_stub):
+    async with httpx.AsyncClient() as http_client:
+        client = LLMClient(http_client=http_client)
+        latencies = [await _timed_call(client) for _ in range(ANSWERS)]
+
+    _report("shared pooled client", latencies)
+    assert anthropic_stub.connections == 1
+    assert len(anthropic_stub.requests) == ANSWERS
+
+
+@pytest.mark.asyncio
+async def test_registry_prewarms_the_pool_and_shares_it(anthropic_stub, monkeypatch):
+    monkeypatch.setattr(settings, "use_mock_llm", False)
+    monkeypatch.setattr(settings, "llm_prewarm_connections", 2)
+    registry = LLMRegistry()
+    await registry.start()
+    try:
+        assert anthropic_stub.connections == 2
+        assert registry.followup_agent.llm_client is registry.llm_client
+        assert registry.summary_agent.llm_client is registry.llm_client
+
+        await _timed_call(registry.llm_client)
+
+        assert anthropic_stub.connections == 2  # served from a pre-warmed connection
+    finally:
+        await registry.close()
+    assert registry.http_client is None
@@ -0,0 +1,109 @@
+"""
+In cascade mode the small model decides first and the large model is only
+called when the small one is unsure or fails.
+"""
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.agents.followup_agent import FollowUpAgent
+from app.config import settings
+from app.database import SessionLocal
+from app.models import ModelCall
+from app.services.llm_client import LLMClient
+from app.services.model_router import CASCADE, CASCADE_ESCALATED_ROUTE, CASCADE_SMALL_ROUTE, model_router
+from app.services.session_service import SessionService
+from tests.anthropic_stub import ASK_FOLLOWUP, MOVE_ON
+
+SMALL = settings.followup_model_tiers["fast"]
+LARGE = settings.followup_model_tiers["standard"]
+
+
+@pytest.fixture(autouse=True)
+def cascade(monkeypatch):
+    monkeypatch.setattr(model_router, "mode", CASCADE)
+    monkeypatch.setattr(model_router, "cascade", {"accepted": 0, "escalated_low_confidence": 0, "escalated_error": 0})
+
+
+@pytest_asyncio.fixture
+async def agent(anthropic_stub):
+    async with httpx.AsyncClient() as http_client:
+        yield FollowUpAgent(LLMClient(http_client=http_client))
+
+
+@pytest.fixture
+def survey(db, ingest_survey):
+    survey_id = ingest_survey([
+        {"type": "free_text", "prompt": "What matters most to you?"},
+        {"type": "free_text", "prompt": "Anything else?"},
+    ])
+    return SessionService(db).start_session(survey_id)
+
+
+def by_model(small, large):
+    return lambda body: small if body["model"] == SMALL else large
+
+
+async def answer(db, agent, survey, text: str = "Jobs"):
+    return await SessionService(db, agent).submit_answer(
+        session_id=survey.session_id,
+        question_id=survey.first_question.question_id,
+        answer_type="free_text",
+        text=text
+    )
+
+
+@pytest.mark.asyncio
+async def test_confident_small_model_decision_stands(db, agent, survey, anthropic_stub):
+    anthropic_stub.reply = by_model(MOVE_ON, ASK_FOLLOWUP)
+
+    result = await answer(db, agent, survey)
+
+    assert result.message_type == "survey_question"
+    assert anthropic_stub.bodies(LARGE) == []
+    assert model_router.stats()["cascade"]["accepted"] == 1
+    assert [c.route for c in db.query(ModelCall).all()] == [CASCADE_SMALL_ROUTE]
+
+
+@pytest.mark.asyncio
+async def test_unsure_small_model_escalates_to_the_large_model(db, agent, survey, anthropic_stub):
+    anthropic_stub.reply = by_model(ASK_FOLLOWUP, MOVE_ON)
+
+    result = await answer(db, agent, survey)
+
+    assert result.message_type == "survey_question"  # the large model's decision
+    assert len(anthropic_stub.bodies(SMALL)) == len(anthropic_stub.bodies(LARGE)) == 1
+    assert model_router.stats()["cascade"]["escalated_low_confidence"] == 1
+    routes = {c.model_name: c.route for c in db.query(ModelCall).all()}
+    assert routes == {SMALL: CASCADE_SMALL_ROUTE, LARGE: CASCADE_ESCALATED_ROUTE}
+
+
+@pytest.mark.asyncio
+async def test_small_model_call_is_committed_before_escalating(db, agent, survey, anthropic_stub):
+    visible_to_others = []
+
+    def reply(body):
+        if body["model"] == SMALL:
+            return ASK_FOLLOWUP
+        other = SessionLocal()
+        try:
+            visible_to_others.append(other.query(ModelCall).filter(ModelCall.route == CASCADE_SMALL_ROUTE).count())
+        finally:
+            other.close()
+        return MOVE_ON
+
+    anthropic_stub.reply = reply
+    await answer(db, agent, survey)
+
+    assert visible_to_others == [1]
+
+
+@pytest.mark.asyncio
+async def test_small_model_failure_escalates(db, agent, survey, anthropic_stub):
+    anthropic_stub.reply = by_model({"note": "no decision here"}, MOVE_ON)
+
+    result = await answer(db, agent, survey)
+
+    assert result.message_type == "survey_question"
+    assert model_router.stats()["cascade"]["escalated_error"] == 1
+    assert len(anthropic_stub.bodies(LARGE)) == 1
@@ -0,0 +1,95 @@
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.agents.followup_agent import FollowUpAgent
+from app.config import settings
+from app.schemas import QuestionDefinition
+from app.services.llm_client import LLMClient
+from app.services.session_service import SessionService
+from app.services.probing_policy import (
+    DEFAULT_POLICY,
+    ProbingPolicyError,
+    compile_probing_policies,
+    compile_probing_policy
+)
+
+
+def question(**probing):
+    return QuestionDefinition(type="free_text", prompt="Why?", probing=probing)
+
+
+def test_misspelled_probing_key_is_rejected_at_validation():
+    with pytest.raises(ValidationError, match="max_probs"):
+        question(max_probs=5)
+
+
+def test_probing_definition_accepts_every_policy_key():
+    definition = question(probe=True, max_probes=2, model_tier="fast", include_in_summary=False)
+
+    assert definition.probing.model_dump() == {
+        "probe": True, "max_probes": 2, "model_tier": "fast", "include_in_summary": False
+    }
+
+
+def test_negative_max_probes_is_rejected_at_validation():
+    with pytest.raises(ValidationError):
+        question(max_probes=-1)
+
+
+def test_ingested_question_compiles_to_its_policy():
+    definition = question(max_probes=1, model_tier="fast").model_dump()
+
+    policy = compile_probing_policy(definition["probing"])
+
+    assert policy.max_probes == 1
+    assert policy.model == settings.followup_model_tiers["fast"]
+    assert policy.allows_probe(0)
+    assert not policy.allows_probe(1)
+
+
+def test_missing_block_is_the_default_policy():
+    assert compile_probing_policy(None) is DEFAULT_POLICY
+    assert DEFAULT_POLICY.model is None  # the model router chooses
+    assert DEFAULT_POLICY.allows_probe(settings.max_followup_probes - 1)
+    assert not DEFAULT_POLICY.allows_probe(settings.max_followup_probes)
+
+
+def test_zero_max_probes_disables_probing():
+    policy = compile_probing_policy({"max_probes": 0})
+
+    assert not policy.probe
+    assert not policy.allows_probe(0)
+
+
+def test_unknown_model_tier_names_the_question():
+    questions = [{"id": "q1"}, {"id": "age", "probing": {"model_tier": "huge"}}]
+
+    with pytest.raises(ProbingPolicyError, match="question age: unknown model_tier 'huge'"):
+        compile_probing_policies(questions)
+
+
+def test_unknown_keys_are_rejected_when_compiling_raw_definitions():
+    with pytest.raises(ProbingPolicyError, match="unknown probing keys"):
+        compile_probing_policy({"max_probs": 5})
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("probing, limit", [({"max_probes": 1}, 1), ({"max_probes": 5}, 5), ({}, settings.max_followup_probes)])
+async def test_model_is_told_the_questions_probe_limit(db, ingest_survey, anthropic_stub, probing, limit):
+    survey_id = ingest_survey([
+        {"type": "free_text", "prompt": "What matters most to you?", "probing": probing},
+        {"type": "free_text", "prompt": "Anything else?"},
+    ])
+    started = SessionService(db).start_session(survey_id)
+
+    async with httpx.AsyncClient() as http_client:
+        await SessionService(db, FollowUpAgent(LLMClient(http_client=http_client))).submit_answer(
+            session_id=started.session_id,
+            question_id=started.first_question.question_id,
+            answer_type="free_text",
+            text="Jobs"
+        )
+
+    prompt = anthropic_stub.requests[0]["body"]["messages"][0]["content"]
+    assert f"CURRENT PROBE COUNT: 0/{limit}" in prompt
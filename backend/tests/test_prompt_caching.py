@@ -0,0 +1,73 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.config import settings
+from app.models import ModelCall
+from app.services.llm_client import LLMClient
+
+MODEL = "claude-3-haiku-20240307"
+SYSTEM = "You are a survey moderator. " * 200
+
+
+@pytest_asyncio.fixture
+async def http_client(anthropic_stub):
+    async with httpx.AsyncClient() as http_client:
+        yield http_client
+
+
+async def complete(client: LLMClient, db=None):
+    return await client.complete(
+        model=MODEL, system=SYSTEM, messages=[{"role": "user", "content": "Answer: jobs"}],
+        agent_type="follow_up", db=db
+    )
+
+
+@pytest.mark.asyncio
+async def test_system_prompt_is_sent_as_a_cache_breakpoint(http_client, anthropic_stub):
+    await complete(LLMClient(http_client=http_client))
+
+    request = anthropic_stub.requests[0]
+    assert request["headers"]["anthropic-beta"] == settings.llm_prompt_cache_beta
+    assert request["body"]["system"] == [{"type": "text", "text": SYSTEM, "cache_control": {"type": "ephemeral"}}]
+
+
+@pytest.mark.asyncio
+async def test_repeat_calls_read_the_cached_prefix(http_client):
+    client = LLMClient(http_client=http_client)
+
+    first = await complete(client)
+    second = await complete(client)
+
+    assert first["usage"]["cache_creation_input_tokens"] > 0
+    assert first["usage"]["cache_read_input_tokens"] == 0
+    assert second["usage"]["cache_read_input_tokens"] == first["usage"]["cache_creation_input_tokens"]
+    assert second["cost_usd"] < first["cost_usd"]
+
+
+@pytest.mark.asyncio
+async def test_cached_tokens_are_billed_at_cache_prices(db, http_client):
+    client = LLMClient(http_client=http_client)
+
+    await complete(client, db)
+    await complete(client, db)
+    db.commit()
+
+    write, read = sorted(db.query(ModelCall).all(), key=lambda call: call.cache_read_input_tokens)
+    cached = write.cache_creation_input_tokens
+    assert (write.cache_read_input_tokens, read.cache_creation_input_tokens) == (0, 0)
+    assert read.cache_read_input_tokens == cached > 0
+    assert write.cost_micro_usd == round(write.input_tokens * 0.25 + write.output_tokens * 1.25 + cached * 0.30)
+    assert read.cost_micro_usd == round(read.input_tokens * 0.25 + read.output_tokens * 1.25 + cached * 0.03)
+
+
+@pytest.mark.asyncio
+async def test_caching_can_be_turned_off(http_client, anthropic_stub, monkeypatch):
+    monkeypatch.setattr(settings, "llm_prompt_caching", False)
+
+    result = await complete(LLMClient(http_client=http_client))
+
+    request = anthropic_stub.requests[0]
+    assert "anthropic-beta" not in request["headers"]
+    assert request["body"]["system"] == SYSTEM
+    assert result["usage"]["cache_creation_input_tokens"] == result["usage"]["cache_read_input_tokens"] == 0
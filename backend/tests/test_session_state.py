@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.services.session_state import LocalSessionStateBackend, SessionState, SessionStateBackend, SessionStateStore
+
+
+def test_partial_backend_fails_when_created():
+    class GetOnly(SessionStateBackend):
+        def get(self, session_id):
+            return None
+
+    with pytest.raises(TypeError, match="delete"):
+        GetOnly()
+
+
+def test_state_evicted_from_the_lru_is_served_by_the_backend():
+    store = SessionStateStore(max_entries=1, backend=LocalSessionStateBackend(max_entries=10))
+    for session_id in (1, 2):
+        store.save(SessionState(session_id, uuid4(), f"respondent-{session_id}", datetime.now(timezone.utc)))
+
+    state = store.get(1)
+
+    assert state.respondent_id == "respondent-1"
+    assert store.stats()["backend_hits"] == 1
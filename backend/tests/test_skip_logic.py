@@ -0,0 +1,154 @@
+"""
+Compiled skip logic: routing is a table lookup, so the cost of picking the
+next question doesn't grow with the survey or with how far in it is.
+"""
+import time
+
+import httpx
+import pytest
+
+from app.agents.followup_agent import FollowUpAgent
+from app.services.llm_client import LLMClient
+from app.services.session_service import SessionService
+from app.services.session_state import session_state_store
+from app.services.skip_logic import SkipLogicError, compile_skip_logic
+from app.services.survey_cache import survey_cache
+from app.utils.db_metrics import db_metrics
+from tests.anthropic_stub import ASK_FOLLOWUP, MOVE_ON
+
+LOOKUPS = 20000
+
+
+def branching_questions(count: int):
+    """single_choice questions where "Skip ahead" jumps over the next question."""
+    questions = []
+    for i in range(count):
+        question = {
+            "id": f"q{i}",
+            "type": "single_choice",
+            "prompt": f"Question {i}?",
+            "options": [{"text": "Continue", "position": 0}, {"text": "Skip ahead", "position": 1}],
+            "probing": {"probe": False}
+        }
+        if i + 2 < count:
+            question["skip_logic"] = {"condition": 'answer == "Skip ahead"', "target_question": f"q{i + 2}"}
+        questions.append(question)
+    return questions
+
+
+def lookup_seconds(version, positions) -> float:
+    """Best-of-5 time per next_index() lookup over `positions`."""
+    skip_ids = {p: str(version.questions[p].options[1].id) for p in positions}
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for i in range(LOOKUPS):
+            position = positions[i % len(positions)]
+            version.next_index(position, option_id=skip_ids[position])
+        best = min(best, (time.perf_counter() - start) / LOOKUPS)
+    return best
+
+
+def test_skip_option_jumps_and_other_options_fall_through():
+    transitions = compile_skip_logic(branching_questions(5))
+
+    assert transitions[0].next_index(option_position=1) == 2
+    assert transitions[0].next_index(option_position=0) == 1
+    assert transitions[4].next_index(option_position=1) == 5  # last question ends the survey
+
+
+def test_free_text_conditions_compile_to_exact_answer_lookups():
+    transitions = compile_skip_logic([
+        {"type": "free_text", "prompt": "Anything?", "skip_logic": {"condition": 'answer in ["no", "nothing"]', "target_question": "end"}},
+        {"type": "free_text", "prompt": "Tell us more"},
+    ])
+
+    assert transitions[0].next_index(answer="  Nothing ") == 2
+    assert transitions[0].next_index(answer="quite a lot") == 1
+
+
+@pytest.mark.parametrize("rule, error", [
+    ({"condition": 'answer == "Maybe"', "target_question": "q1"}, "not one of the options"),
+    ({"condition": 'answer == "Skip ahead"', "target_question": "q0"}, "must come later"),
+    ({"condition": 'answer == "Skip ahead"', "target_question": "q9"}, "unknown target_question"),
+    ({"condition": "answer ~ 3", "target_question": "q1"}, "Unrecognized"),
+])
+def test_invalid_skip_logic_is_rejected_at_compile_time(rule, error):
+    questions = branching_questions(2)
+    questions[0]["skip_logic"] = rule
+
+    with pytest.raises(SkipLogicError, match=error):
+        compile_skip_logic(questions)
+
+
+def test_routing_time_is_flat_in_survey_size_and_position(db, ingest_survey):
+    small = survey_cache.get_current(db, ingest_survey(branching_questions(50), name="Branching 50"))
+    large = survey_cache.get_current(db, ingest_survey(branching_questions(500), name="Branching 500"))
+
+    small_time = lookup_seconds(small, range(0, 48))
+    early_time = lookup_seconds(large, range(0, 48))
+    late_time = lookup_seconds(large, range(450, 498))
+
+    print(
+        f"\nnext_index: 50 questions {small_time * 1e6:.2f}us, 500 questions "
+        f"{early_time * 1e6:.2f}us (start) / {late_time * 1e6:.2f}us (end)"
+    )
+    assert early_time < small_time * 3
+    assert late_time < early_time * 3
+
+
+@pytest.mark.asyncio
+async def test_answers_late_in_a_long_survey_cost_the_same_queries(db, ingest_survey):
+    survey_id = ingest_survey(branching_questions(500), name="Branching 500")
+    version = survey_cache.get_current(db, survey_id)
+    session_id = SessionService(db).start_session(survey_id).session_id
+
+    statements = {}
+    position = 0
+    while position < len(version.questions):
+        question = version.questions[position]
+        before = db_metrics.statements
+        result = await SessionService(db).submit_answer(
+            session_id=session_id,
+            question_id=question.id,
+            answer_type="single_choice",
+            selected_option_id=str(question.options[1].id)
+        )
+        statements[position] = db_metrics.statements - before
+        position = result.question.position if result.question else len(version.questions)
+
+    answered = sorted(statements)
+    assert answered == list(range(0, 499, 2)) + [499]  # every answer but the last two skipped a question
+    print(f"\nstatements per answer: first {statements[answered[1]]}, last {statements[answered[-2]]}")
+    assert statements[answered[1]] == statements[answered[-2]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cached_state", [True, False])
+async def test_probed_answer_still_takes_its_skip_after_the_follow_up(db, ingest_survey, anthropic_stub, cached_state):
+    questions = branching_questions(3)
+    questions[0]["probing"] = {"probe": True}
+    survey_id = ingest_survey(questions)
+    question = survey_cache.get_current(db, survey_id).questions[0]
+    session_id = SessionService(db).start_session(survey_id).session_id
+
+    async with httpx.AsyncClient() as http_client:
+        service = SessionService(db, FollowUpAgent(LLMClient(http_client=http_client)))
+        anthropic_stub.reply = lambda body: ASK_FOLLOWUP
+        followup = await service.submit_answer(
+            session_id=session_id,
+            question_id=question.id,
+            answer_type="single_choice",
+            text="Mostly the cost",
+            selected_option_id=str(question.options[1].id)
+        )
+        assert followup.message_type == "follow_up_question"
+
+        if not cached_state:
+            session_state_store.discard(session_id)  # rebuilt from the database
+        anthropic_stub.reply = lambda body: MOVE_ON
+        result = await service.submit_answer(
+            session_id=session_id, question_id=None, answer_type="follow_up_answer", text="Rent went up"
+        )
+
+    assert result.question.position == 2
@@ -0,0 +1,144 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app.agents.summary_agent import SummaryAgent
+from app.config import settings
+from app.database import SessionLocal
+from app.models import SessionSummary, SummaryJob
+from app.services.mock_llm_client import MockLLMClient
+from app.services.session_service import SessionService
+from app.services.summary_queue import SummaryWorkerPool, enqueue_summary
+from tests.conftest import requires_postgres
+
+
+def exchange(answer: str):
+    return {"question_text": "Why?", "user_answer": answer, "followup_questions": [], "followup_answers": []}
+
+
+@pytest.fixture
+def session_ids(db, ingest_survey):
+    survey_id = ingest_survey([{"type": "free_text", "prompt": "Why?"}])
+    return [SessionService(db).start_session(survey_id).session_id for _ in range(3)]
+
+
+@pytest.fixture
+def pool():
+    return SummaryWorkerPool(SummaryAgent(MockLLMClient()), worker_count=1)
+
+
+def add_job(db, session_id: int, status: str = "pending", claimed_at=None) -> int:
+    job = SummaryJob(session_id=session_id, status=status, exchange=exchange(f"answer {session_id}"),
+                     attempts=0, claimed_at=claimed_at)
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def statuses(db):
+    db.expire_all()
+    return {job.id: job.status for job in db.query(SummaryJob)}
+
+
+def test_claim_takes_every_pending_job_of_the_oldest_session(db, pool, session_ids):
+    first, second, _ = session_ids
+    jobs = [add_job(db, first), add_job(db, second), add_job(db, first)]
+
+    session_id, job_ids, exchanges = pool._claim_batch(db)
+
+    assert session_id == first
+    assert job_ids == [jobs[0], jobs[2]]
+    assert len(exchanges) == 2
+    assert statuses(db) == {jobs[0]: "running", jobs[1]: "pending", jobs[2]: "running"}
+
+
+def test_claim_skips_sessions_with_a_running_job(db, pool, session_ids):
+    first, second, _ = session_ids
+    add_job(db, first, status="running", claimed_at=datetime.now(timezone.utc))
+    waiting = add_job(db, first)
+    other = add_job(db, second)
+
+    session_id, job_ids, _ = pool._claim_batch(db)
+
+    assert (session_id, job_ids) == (second, [other])
+    assert pool._claim_batch(db) is None  # first's pending job waits for its running batch
+    assert statuses(db)[waiting] == "pending"
+
+
+def test_claim_locks_pending_jobs_with_skip_locked(db, pool, session_ids, monkeypatch):
+    locking = []
+    with_for_update = Query.with_for_update
+
+    def record(query, **kwargs):
+        locked = with_for_update(query, **kwargs)
+        locking.append(str(locked.statement.compile(dialect=postgresql.dialect())))
+        return locked
+
+    monkeypatch.setattr(Query, "with_for_update", record)
+    add_job(db, session_ids[0])
+
+    assert pool._claim_batch(db) is not None
+    assert len(locking) == 1
+    assert locking[0].endswith("FOR UPDATE SKIP LOCKED")
+
+
+@requires_postgres
+def test_claim_passes_over_jobs_another_worker_has_locked(db, pool, session_ids):
+    first, second, _ = session_ids
+    add_job(db, first)
+    other = add_job(db, second)
+
+    claiming = SessionLocal()
+    try:
+        # Another worker is mid-claim on the oldest session's jobs
+        claiming.query(SummaryJob).filter(SummaryJob.session_id == first).with_for_update().all()
+
+        session_id, job_ids, _ = pool._claim_batch(db)
+
+        assert (session_id, job_ids) == (second, [other])
+    finally:
+        claiming.rollback()
+        claiming.close()
+
+
+def test_stale_running_jobs_are_requeued(db, pool, session_ids):
+    now = datetime.now(timezone.utc)
+    stale = add_job(db, session_ids[0], status="running",
+                    claimed_at=now - timedelta(seconds=settings.summary_job_stale_seconds + 60))
+    fresh = add_job(db, session_ids[1], status="running", claimed_at=now)
+
+    assert pool._requeue_stale() == 1
+    assert statuses(db) == {stale: "pending", fresh: "running"}
+
+
+@pytest.mark.asyncio
+async def test_running_pool_requeues_and_finishes_stale_jobs(db, pool, session_ids, monkeypatch):
+    monkeypatch.setattr(settings, "summary_requeue_interval_seconds", 0.05)
+    monkeypatch.setattr(settings, "summary_job_stale_seconds", 1)
+    await pool.start()
+    try:
+        # Left running by a worker that died after the pool started
+        job = add_job(db, session_ids[0], status="running",
+                      claimed_at=datetime.now(timezone.utc) - timedelta(seconds=5))
+
+        for _ in range(100):
+            if statuses(db)[job] == "done":
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        await pool.stop()
+
+    assert statuses(db)[job] == "done"
+    assert db.query(SessionSummary).filter(SessionSummary.session_id == session_ids[0]).count() == 1
+
+
+def test_every_n_strategy_releases_jobs_in_batches(db, session_ids):
+    session_id = session_ids[0]
+    for i in range(3):
+        enqueue_summary(db, session_id, exchange(f"answer {i}"), strategy="every_n", every_n=3)
+        db.commit()
+        expected = "pending" if i == 2 else "deferred"
+        assert set(statuses(db).values()) == {expected}
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Train the fast-path follow-up model from logged ModelCall decisions, and
+evaluate the fast path (rules + model) against historic LLM decisions.
+
+    python train_fast_path.py train [--out fast_path_model.json]
+    python train_fast_path.py evaluate                 # train on older calls, score the newest 20%
+    python train_fast_path.py evaluate --model fast_path_model.json
+"""
+import argparse
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.fast_path import (
+    LogisticModel, ModelStage, build_classifier, load_model, save_model,
+    logged_decisions, training_examples
+)
+
+THRESHOLDS = (0.7, 0.8, 0.85, 0.9, 0.95)
+
+
+def load_decisions():
+    db = SessionLocal()
+    try:
+        return list(logged_decisions(db))
+    finally:
+        db.close()
+
+
+def train(args):
+    decisions = load_decisions()
+    if not decisions:
+        print('ℹ️  No logged follow-up decisions to train on')
+        return
+    model = LogisticModel.train(training_examples(decisions), epochs=args.epochs)
+    save_model(model, args.out)
+    asks = sum(1 for _, action in decisions if action == "ask_followup")
+    print(f'✅ Trained on {len(decisions)} decisions ({asks} ask_followup), {len(model.weights)} features -> {args.out}')
+
+
+def evaluate(args):
+    decisions = load_decisions()
+    if args.model:
+        model = load_model(args.model)
+        if model is None:
+            print(f'ℹ️  No model at {args.model}')
+            return
+        test = decisions
+        print(f'Evaluating {args.model} on {len(test)} logged decisions')
+    else:
+        split = int(len(decisions) * (1 - args.holdout))
+        train_set, test = decisions[:split], decisions[split:]
+        model = LogisticModel.train(training_examples(train_set), epochs=args.epochs) if train_set else None
+        print(f'Trained on the oldest {len(train_set)} decisions, evaluating on the newest {len(test)}')
+    if not test:
+        print('ℹ️  No logged follow-up decisions to evaluate')
+        return
+
+    if model is not None:
+        stage = ModelStage(model)
+        correct = sum(1 for inp, action in test if stage.decide(inp).action == action)
+        print(f'Model alone: {correct / len(test):.1%} agreement on all {len(test)} decisions')
+
+    print(f'\n{"threshold":>9} {"avoided":>8} {"agreement":>10}  by source')
+    for threshold in sorted(set(THRESHOLDS) | {settings.fast_path_min_confidence}):
+        classifier = build_classifier(model_path="", min_confidence=threshold)
+        if model is not None:
+            classifier.stages.append(ModelStage(model))
+        by_source = {}
+        for inp, action in test:
+            decision, _ = classifier.classify(inp)
+            if decision is not None:
+                agreed, total = by_source.get(decision.source, (0, 0))
+                by_source[decision.source] = (agreed + (decision.action == action), total + 1)
+        avoided = sum(total for _, total in by_source.values())
+        agreed = sum(a for a, _ in by_source.values())
+        agreement = f'{agreed / avoided:.1%}' if avoided else '-'
+        sources = ', '.join(f'{name} {a}/{t}' for name, (a, t) in sorted(by_source.items()))
+        marker = ' *' if threshold == settings.fast_path_min_confidence else '  '
+        print(f'{threshold:>9.2f} {avoided / len(test):>8.1%} {agreement:>10}{marker}{sources}')
+    print('\n* FAST_PATH_MIN_CONFIDENCE. "avoided" is the share of LLM calls the fast path would have skipped.')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast-path follow-up classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = sub.add_parser("train", help="train the local model from logged decisions")
+    train_parser.add_argument("--out", default=settings.fast_path_model_path)
+    train_parser.add_argument("--epochs", type=int, default=20)
+
+    eval_parser = sub.add_parser("evaluate", help="agreement with logged LLM decisions and calls avoided")
+    eval_parser.add_argument("--model", default=None, help="evaluate a saved model instead of a holdout split")
+    eval_parser.add_argument("--holdout", type=float, default=0.2, help="newest share of decisions held out")
+    eval_parser.add_argument("--epochs", type=int, default=20)
+
+    args = parser.parse_args()
+    if args.command == "train":
+        train(args)
+    else:
+        evaluate(args)
+
+
+if __name__ == "__main__":
+    main()
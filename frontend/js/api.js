@@ -54,6 +54,61 @@ class SurveyAPI {
         });
     }
 
+    /**
+     * Streaming variant of submitAnswer (Server-Sent Events over fetch, since
+     * EventSource can't POST). Calls onEvent(name, data) for each progress
+     * event ("moving_on", "followup_delta") and resolves with the final
+     * NextQuestionResponse.
+     */
+    async submitAnswerStream(sessionId, answer, onEvent) {
+        const endpoint = `/sessions/${sessionId}/answer/stream`;
+        log('API Request:', 'POST', endpoint);
+
+        const response = await fetch(`${this.baseUrl}${endpoint}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(answer)
+        });
+        if (!response.ok) {
+            const error = await response.json().catch(() => ({}));
+            throw new Error(error.detail || `HTTP ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let data = '';
+                for (const line of block.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                const payload = data ? JSON.parse(data) : {};
+
+                if (event === 'result') {
+                    log('API Response:', payload);
+                    return payload;
+                }
+                if (event === 'error') {
+                    throw new Error(payload.detail || 'Stream error');
+                }
+                onEvent(event, payload);
+            }
+        }
+        throw new Error('Stream ended without a result');
+    }
+
     async endSession(sessionId, reason = 'user_requested') {
         return this.request(`/sessions/${sessionId}/end`, {
             method: 'POST',
@@ -62,11 +117,14 @@ class SurveyAPI {
     }
 
     // Admin endpoints
-    async listSessions(status = null, limit = 50, offset = 0) {
-        let endpoint = `/admin/sessions?limit=${limit}&offset=${offset}`;
+    async listSessions(status = null, limit = 50, cursor = null) {
+        let endpoint = `/admin/sessions?limit=${limit}`;
         if (status) {
             endpoint += `&status=${status}`;
         }
+        if (cursor) {
+            endpoint += `&cursor=${encodeURIComponent(cursor)}`;
+        }
         return this.request(endpoint);
     }
 
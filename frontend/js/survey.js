@@ -63,6 +63,7 @@ class SurveyApp {
         this.isFollowUp = false;
         this.isLoading = false;
         this.messages = []; // { role: "assistant"|"user", text: string }
+        this.streamingMessage = null; // follow-up question being streamed in
         this.minTextLength = 10; // Minimum characters for free-text responses
 
         this.init();
@@ -351,7 +352,7 @@ class SurveyApp {
             document.querySelectorAll(".radio-option").forEach(opt => opt.classList.remove("selected"));
 
             this.showLoading("Reviewing your response...");
-            const response = await api.submitAnswer(this.sessionId, answer);
+            const response = await this.submitWithStreaming(answer);
             this.hideLoading();
             
             // Update session position
@@ -368,6 +369,40 @@ class SurveyApp {
         }
     }
 
+    // Show the follow-up question as it is generated instead of after the whole decision
+    async submitWithStreaming(answer) {
+        if (!window.ReadableStream || !window.TextDecoder) {
+            return api.submitAnswer(this.sessionId, answer);
+        }
+
+        this.streamingMessage = null;
+        try {
+            return await api.submitAnswerStream(this.sessionId, answer, (event, data) => {
+                if (event === "moving_on") {
+                    this.showLoading("Moving on...");
+                } else if (event === "followup_delta") {
+                    if (!this.streamingMessage) {
+                        this.streamingMessage = { role: "assistant", text: "" };
+                        this.messages.push(this.streamingMessage);
+                    }
+                    this.streamingMessage.text += data.text;
+                    this.renderChat();
+                }
+            });
+        } catch (error) {
+            this.discardStreamingMessage();
+            throw error;
+        }
+    }
+
+    discardStreamingMessage() {
+        if (this.streamingMessage) {
+            this.messages = this.messages.filter(m => m !== this.streamingMessage);
+            this.streamingMessage = null;
+            this.renderChat();
+        }
+    }
+
     async submitPreferNotToAnswer() {
         if (this.isLoading) return;
 
@@ -447,6 +482,19 @@ class SurveyApp {
     }
 
     handleResponse(response) {
+        if (response.message_type === "follow_up_question" && this.streamingMessage) {
+            // Already on screen; settle it to the final text
+            this.streamingMessage.text = response.question_text;
+            this.streamingMessage = null;
+            this.isFollowUp = true;
+            this.currentQuestion = { question_type: "free_text", question_text: response.question_text };
+            this.renderChat();
+            this.renderComposer();
+            return;
+        }
+        // A streamed question the server didn't end up asking
+        this.discardStreamingMessage();
+
         if (response.message_type === "completed") {
             this.showCompletion(response);
             return;